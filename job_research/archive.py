@@ -0,0 +1,179 @@
+"""
+Raw Page Archive
+
+Append-only store of the raw pages fetched by the Scraper, so that job pages
+can be re-extracted, re-voted and re-scored (JobSearchAssistant.reprocess)
+after a prompt or extraction change without fetching them again.
+
+Layout of the archive directory:
+- segment_<n>.dat: concatenated zlib-compressed pages. A segment is closed
+  once it reaches segment_size and the next one is started; segments are
+  never rewritten
+- index.db: SQLite index, one row per archived page version
+  (url, fetch time, segment, offset, compressed length, raw size, crc32)
+
+Pages are read through read-only memory maps of the segments, so reading the
+whole corpus is a sequence of page cache hits plus decompression. A page is
+only appended when it differs from the latest archived version of its URL.
+
+One process writes to an archive at a time; inside a process, use
+open_archive() so that every writer of a directory shares the same instance.
+"""
+
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(directory: str, **kwargs):
+    """Return the PageArchive of a directory, shared inside the process"""
+    path = os.path.realpath(directory)
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = PageArchive(path, **kwargs)
+        return _archives[path]
+
+
+class PageArchive:
+    """
+    Compressed, append-only archive of raw pages.
+
+    Args:
+        directory: Archive directory (created if needed)
+        segment_size: Size in bytes after which a new segment is started
+        level: zlib compression level
+    """
+    def __init__(self, directory="archive", segment_size=SEGMENT_SIZE, level=6):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, "index.db")
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.maps = {}
+        with self.lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS pages (
+                                    id INTEGER PRIMARY KEY,
+                                    url TEXT NOT NULL,
+                                    fetched REAL NOT NULL,
+                                    segment INTEGER NOT NULL,
+                                    offset INTEGER NOT NULL,
+                                    length INTEGER NOT NULL,
+                                    size INTEGER NOT NULL,
+                                    checksum INTEGER NOT NULL
+                                )''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url)")
+            self.conn.commit()
+            row = self.conn.execute("SELECT MAX(segment) FROM pages").fetchone()
+        self.segment = row[0] or 1
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:05d}.dat")
+
+    def put(self, url: str, content) -> bool:
+        """
+        Archive a page.
+
+        Args:
+            url: URL of the page
+            content: Raw page (bytes or str)
+
+        Returns:
+            bool: False if the page equals the latest archived version of the URL
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if not content:
+            return False
+        checksum = zlib.crc32(content)
+        with self.lock:
+            latest = self.conn.execute("SELECT size, checksum FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1",
+                                       (url,)).fetchone()
+            if latest == (len(content), checksum):
+                return False
+            data = zlib.compress(content, self.level)
+            path = self._segment_path(self.segment)
+            if os.path.exists(path) and os.path.getsize(path) + len(data) > self.segment_size:
+                self.segment += 1
+                path = self._segment_path(self.segment)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            self.conn.execute("INSERT INTO pages (url, fetched, segment, offset, length, size, checksum) "
+                              "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (url, time.time(), self.segment, offset, len(data), len(content), checksum))
+            self.conn.commit()
+        return True
+
+    def _read(self, segment: int, offset: int, length: int, checksum: int) -> bytes:
+        with self.lock:
+            segment_map = self.maps.get(segment)
+            if segment_map is None or offset + length > len(segment_map):
+                # map (again) the segment, it grew since it was mapped
+                if segment_map is not None:
+                    segment_map.close()
+                with open(self._segment_path(segment), "rb") as f:
+                    segment_map = self.maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = segment_map[offset:offset + length]
+        content = zlib.decompress(data)
+        if zlib.crc32(content) != checksum:
+            raise ValueError(f"Corrupted archive record in segment {segment} at offset {offset}")
+        return content
+
+    def get(self, url: str):
+        """Return the latest archived version of a page as bytes, None if absent"""
+        with self.lock:
+            row = self.conn.execute("SELECT segment, offset, length, checksum FROM pages WHERE url = ? "
+                                    "ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+        return self._read(*row) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM pages WHERE url = ? LIMIT 1", (url,)).fetchone() is not None
+
+    def iter_pages(self, urls=None):
+        """
+        Iterate over the latest version of archived pages, in storage order.
+
+        Args:
+            urls: Only these URLs (default: every archived URL)
+
+        Yields:
+            tuple: (url, content bytes)
+        """
+        conn = sqlite3.connect(self.index_path)
+        try:
+            rows = conn.execute("SELECT url, segment, offset, length, checksum FROM pages "
+                                "WHERE id IN (SELECT MAX(id) FROM pages GROUP BY url) ORDER BY segment, offset")
+            wanted = set(urls) if urls is not None else None
+            for url, segment, offset, length, checksum in rows:
+                if wanted is None or url in wanted:
+                    yield url, self._read(segment, offset, length, checksum)
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        """Number of pages and URLs, raw and compressed bytes"""
+        with self.lock:
+            pages, urls, size, length = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) "
+                "FROM pages").fetchone()
+        return {"pages": pages, "urls": urls, "raw_bytes": size, "compressed_bytes": length,
+                "segments": self.segment}
+
+    def close(self):
+        """Release the memory maps and the index connection"""
+        with self.lock:
+            for segment_map in self.maps.values():
+                segment_map.close()
+            self.maps = {}
+            self.conn.close()
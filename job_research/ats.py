@@ -0,0 +1,213 @@
+"""
+Applicant Tracking System Connectors
+
+Career pages hosted on common applicant tracking systems have a public JSON
+API listing every open position of the company, with full descriptions. A
+search result on one of these boards (the board itself or any of its job
+pages) is read with a single API request instead of crawling the board's
+HTML: no link classification, no pagination, no formatting by the LLM.
+
+Supported boards (URL shapes -> API):
+- Greenhouse: boards.greenhouse.io/<board>, job-boards.greenhouse.io/<board>,
+  greenhouse.io/embed/job_board?for=<board>
+  -> boards-api.greenhouse.io/v1/boards/<board>/jobs?content=true
+- Lever: jobs.lever.co/<board> -> api.lever.co/v0/postings/<board>?mode=json
+- Ashby: jobs.ashbyhq.com/<board> -> api.ashbyhq.com/posting-api/job-board/<board>
+- Workable: apply.workable.com/<board> -> www.workable.com/api/accounts/<board>?details=true
+
+Each connector takes an api_base, so that tests can serve the API from a
+replay.StubServer.
+"""
+
+import html
+import json
+import re
+
+from structured_data import html_to_markdown, _number
+
+
+def _company(board: str) -> str:
+    return board.replace("-", " ").replace("_", " ").title()
+
+
+def _join(*parts) -> str:
+    return ", ".join(str(part).strip() for part in parts if part and str(part).strip())
+
+
+class ATSConnector:
+    """
+    Base class of the connectors: URL recognition, API URL and response mapping.
+
+    Args:
+        api_base: Base URL of the API (default: the public API of the ATS)
+    """
+    name = ""
+    api_base = ""
+    patterns = ()
+
+    def __init__(self, api_base: str = None):
+        if api_base:
+            self.api_base = api_base.rstrip("/")
+
+    def match(self, url: str):
+        """Return the board of a URL hosted on this ATS, None otherwise"""
+        for pattern in self.patterns:
+            match = re.search(pattern, url or "", re.IGNORECASE)
+            if match:
+                return match.group("board")
+        return None
+
+    def listing_url(self, board: str) -> str:
+        raise NotImplementedError
+
+    def parse(self, data, board: str) -> list:
+        """Map an API response to job dicts (url, title, company, location, salary, description)"""
+        raise NotImplementedError
+
+    def fetch_jobs(self, board: str, fetch) -> list:
+        """
+        Read every open position of a board.
+
+        Args:
+            board: Board name, as returned by match()
+            fetch: Callable(url) -> response body (bytes or str), "" on failure
+
+        Returns:
+            list: Job dicts with at least url and title, [] if the API could not be read
+        """
+        content = fetch(self.listing_url(board))
+        if not content:
+            return []
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return []
+        try:
+            jobs = self.parse(data, board)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return []
+        return [job for job in jobs if job.get("url") and job.get("title")]
+
+
+class GreenhouseConnector(ATSConnector):
+    name = "greenhouse"
+    api_base = "https://boards-api.greenhouse.io/v1/boards"
+    patterns = (r"^https?://(?:boards|job-boards)(?:\.eu)?\.greenhouse\.io/(?!embed/)(?P<board>[\w-]+)",
+                r"greenhouse\.io/embed/job_board\?(?:.*&)?for=(?P<board>[\w-]+)")
+
+    def listing_url(self, board: str) -> str:
+        return f"{self.api_base}/{board}/jobs?content=true"
+
+    def parse(self, data, board: str) -> list:
+        return [{
+            "url": job.get("absolute_url"),
+            "title": job.get("title"),
+            "company": job.get("company_name") or _company(board),
+            "location": (job.get("location") or {}).get("name", ""),
+            "salary": "",
+            "description": html_to_markdown(html.unescape(job.get("content") or "")),
+        } for job in data.get("jobs", [])]
+
+
+class LeverConnector(ATSConnector):
+    name = "lever"
+    api_base = "https://api.lever.co/v0/postings"
+    patterns = (r"^https?://jobs\.lever\.co/(?P<board>[\w.-]+)",)
+
+    def listing_url(self, board: str) -> str:
+        return f"{self.api_base}/{board}?mode=json"
+
+    @staticmethod
+    def _salary(salary: dict) -> str:
+        if not salary or salary.get("min") is None:
+            return ""
+        amount = _number(salary["min"])
+        if salary.get("max") is not None:
+            amount += f" - {_number(salary['max'])}"
+        interval = salary.get("interval", "").replace("-salary", "").replace("-", " ")
+        return " ".join(part for part in (amount, salary.get("currency", ""), interval) if part)
+
+    def parse(self, data, board: str) -> list:
+        jobs = []
+        for job in data:
+            sections = [job.get("description") or job.get("descriptionPlain") or ""]
+            sections += [f"<h3>{item.get('text', '')}</h3><ul>{item.get('content', '')}</ul>"
+                         for item in job.get("lists", [])]
+            sections.append(job.get("additional") or "")
+            categories = job.get("categories") or {}
+            jobs.append({
+                "url": job.get("hostedUrl"),
+                "title": job.get("text"),
+                "company": _company(board),
+                "location": categories.get("location") or _join(*categories.get("allLocations", [])),
+                "salary": self._salary(job.get("salaryRange")),
+                "description": html_to_markdown("".join(sections)),
+            })
+        return jobs
+
+
+class AshbyConnector(ATSConnector):
+    name = "ashby"
+    api_base = "https://api.ashbyhq.com/posting-api/job-board"
+    patterns = (r"^https?://jobs\.ashbyhq\.com/(?P<board>[\w.%-]+)",)
+
+    def listing_url(self, board: str) -> str:
+        return f"{self.api_base}/{board}?includeCompensation=true"
+
+    def parse(self, data, board: str) -> list:
+        jobs = []
+        for job in data.get("jobs", []):
+            if job.get("isListed") is False:
+                continue
+            compensation = job.get("compensation") or {}
+            location = job.get("location") or ""
+            jobs.append({
+                "url": job.get("jobUrl"),
+                "title": job.get("title"),
+                "company": _company(board),
+                "location": f"{location} (Remote)" if job.get("isRemote") and location else location,
+                "salary": compensation.get("compensationTierSummary") or "",
+                "description": (html_to_markdown(job["descriptionHtml"]) if job.get("descriptionHtml")
+                                else job.get("descriptionPlain", "")),
+            })
+        return jobs
+
+
+class WorkableConnector(ATSConnector):
+    name = "workable"
+    api_base = "https://www.workable.com/api/accounts"
+    patterns = (r"^https?://apply\.workable\.com/(?!j/|api/)(?P<board>[\w-]+)",)
+
+    def listing_url(self, board: str) -> str:
+        return f"{self.api_base}/{board}?details=true"
+
+    def parse(self, data, board: str) -> list:
+        company = data.get("name") or _company(board)
+        return [{
+            "url": job.get("url") or job.get("shortlink"),
+            "title": job.get("title"),
+            "company": company,
+            "location": _join(job.get("city"), job.get("state"), job.get("country"),
+                              "Remote" if job.get("telecommuting") else ""),
+            "salary": "",
+            "description": html_to_markdown(job.get("description") or ""),
+        } for job in data.get("jobs", [])]
+
+
+def default_connectors() -> list:
+    """One connector per supported ATS, on the public APIs"""
+    return [GreenhouseConnector(), LeverConnector(), AshbyConnector(), WorkableConnector()]
+
+
+def find_board(url: str, connectors: list):
+    """
+    Recognize a URL hosted on an ATS.
+
+    Returns:
+        tuple|None: (connector, board), None if no connector matches
+    """
+    for connector in connectors:
+        board = connector.match(url)
+        if board:
+            return connector, board
+    return None
@@ -0,0 +1,559 @@
+"""
+Pipeline Benchmark
+
+End-to-end, fully offline benchmark of JobSearchAssistant over a synthetic
+corpus:
+- listing pages with N anchors (job links, navigation links, pagination)
+  served by a local StubServer
+- job description pages, optionally some of them replaced by bot challenge pages,
+  and optionally some of them embedding a schema.org JobPosting (JSON-LD)
+- optionally Greenhouse boards among the search results, whose JSON API is
+  served by the StubServer
+- optionally a mix of job titles: titles of the profile's target role, and
+  unrelated titles whose jobs are never relevant
+- a synthetic LLM and Serper answering through the replay layer, with
+  simulated latency
+
+Measured per stage (crawl = run(), score = score_jobs(), documents =
+create_outputs_from_db()): wall time, SQLite time, peak Python memory, LLM
+calls, tokens and cost. Totals report jobs/minute, LLM calls per job,
+tokens per job and LLM calls until the first relevant job is stored.
+
+Usage:
+    python benchmark.py                                  # default configuration
+    python benchmark.py --config a.json --config b.json  # side-by-side comparison
+    python benchmark.py --save baseline.json             # store results
+    python benchmark.py --baseline baseline.json         # exit 1 on regression
+    python benchmark.py --startup 10                     # cold start time of the entry points
+
+A configuration file is a JSON object overriding DEFAULT_CONFIG. Keys under
+"assistant" are passed to the JobSearchAssistant constructor.
+
+The startup benchmark runs each entry point in a fresh interpreter and
+reports the median and best wall time over the runs, next to a bare
+interpreter start; it fails when the median exceeds --startup-limit.
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+import replay
+from ats import GreenhouseConnector
+from llm import calculate_subagent_cost
+
+DEFAULT_CONFIG = {
+    "name": "default",
+    "seed": 42,
+    "listings": 3,                # number of Serper results (listing pages)
+    "pages_per_listing": 2,       # pagination depth of each listing
+    "jobs_per_page": 8,           # job anchors per listing page
+    "other_anchors_per_page": 6,  # navigation / non job anchors per listing page
+    "job_page_paragraphs": 12,    # size of each job page
+    "documents": 2,               # number of top jobs to generate documents for
+    "llm_latency": 0.0,           # simulated seconds per LLM call (number or [min, max])
+    "serper_latency": 0.0,        # simulated seconds per Serper call
+    "http_latency": 0.0,          # simulated seconds per HTTP request
+    "http_error_rate": 0.0,       # probability of a simulated 500 per HTTP request
+    "blocked_page_rate": 0.0,     # share of job pages served as a bot challenge page (status 200)
+    "ats_boards": 0,              # Greenhouse boards added to the search results (jobs_per_page jobs each)
+    "structured_data_rate": 0.0,  # share of job pages embedding their JobPosting as JSON-LD
+    "recrawl": False,             # run the search a second time over the unchanged corpus
+    "matching_title_rate": None,  # share of jobs titled like the target role, the others are unrelated
+                                  # and not relevant (None: every job is an "Engineer")
+    "assistant": {},              # extra JobSearchAssistant keyword arguments
+}
+
+# Metrics compared against a baseline: name -> True if higher is better
+GATED_METRICS = {
+    "jobs_per_minute": True,
+    "llm_calls_per_job": False,
+    "tokens_per_job": False,
+    "jobs_per_dollar": True,
+}
+
+UNRELATED_TITLE = "Retail Store Cashier"
+
+LOREM = ("Our team builds reliable data products for thousands of customers. "
+         "You will design, implement and operate backend services in Python, "
+         "collaborate with product managers and mentor junior engineers. ")
+
+
+def _stable_hash(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+class SyntheticCorpus:
+    """
+    Generated listing and job pages registered on a StubServer.
+
+    Args:
+        server: StubServer the pages are added to
+        config: Benchmark configuration
+    """
+    def __init__(self, server, config):
+        self.server = server
+        self.config = config
+        self.listing_urls = []
+        self.next_pages = {}
+        self.job_count = 0
+        for listing in range(config["listings"]):
+            for page in range(config["pages_per_listing"]):
+                path = f"/listing/{listing}?page={page}"
+                url = server.url_for(path)
+                if page == 0:
+                    self.listing_urls.append(url)
+                if page + 1 < config["pages_per_listing"]:
+                    self.next_pages[url] = server.url_for(f"/listing/{listing}?page={page + 1}")
+                server.add_page(path, self._listing_page(listing, page))
+        for board in range(config.get("ats_boards", 0)):
+            self.listing_urls.append(f"https://boards.greenhouse.io/synthetic-{board}")
+            server.add_page(f"/ats/greenhouse/synthetic-{board}/jobs?content=true", self._ats_board(board),
+                            content_type="application/json")
+
+    def _ats_board(self, board: int) -> str:
+        jobs = []
+        for i in range(self.config["jobs_per_page"]):
+            job_id = f"gh{board}-{i}"
+            self.job_count += 1
+            paragraphs = "".join(f"<p>{LOREM}</p>" for _ in range(self.config["job_page_paragraphs"]))
+            jobs.append({"id": i, "title": f"{self._title(job_id)} {job_id}", "location": {"name": "Remote"},
+                         "absolute_url": self.server.url_for(f"/ats-job/{job_id}"),
+                         "company_name": f"Synthetic Corp {board}", "content": paragraphs.replace("<", "&lt;")})
+        return json.dumps({"jobs": jobs})
+
+    def _title(self, job_id: str) -> str:
+        rate = self.config.get("matching_title_rate")
+        if rate is None:
+            return "Backend Engineer"
+        return "Backend Python Developer" if _stable_hash("title" + job_id) % 1000 < rate * 1000 else UNRELATED_TITLE
+
+    def _listing_page(self, listing: int, page: int) -> str:
+        anchors = []
+        for i in range(self.config["jobs_per_page"]):
+            job_id = f"{listing}-{page}-{i}"
+            self.job_count += 1
+            self.server.add_page(f"/job/{job_id}", self._job_page(job_id))
+            label = "Engineer" if self.config.get("matching_title_rate") is None else self._title(job_id)
+            anchors.append(f'<a class="job-title" href="/job/{job_id}">{label} {job_id}</a>')
+        for i in range(self.config["other_anchors_per_page"]):
+            anchors.append(f'<a class="nav" href="/about/{listing}-{page}-{i}">About {i}</a>')
+        if page + 1 < self.config["pages_per_listing"]:
+            anchors.append(f'<a rel="next" href="/listing/{listing}?page={page + 1}">Next</a>')
+        items = "\n".join(f"<li>{a}</li>" for a in anchors)
+        return (f"<html><head><title>Jobs listing {listing} page {page}</title></head>"
+                f"<body><h1>Open positions</h1><ul>{items}</ul></body></html>")
+
+    def _job_page(self, job_id: str) -> str:
+        if _stable_hash(job_id) % 1000 < self.config["blocked_page_rate"] * 1000:
+            return ("<html><head><title>Just a moment...</title></head><body>"
+                    "<div id=\"cf-browser-verification\">Checking your browser before accessing the site.</div>"
+                    "<script>window._cf_chl_opt = {};</script></body></html>")
+        paragraphs = "\n".join(f"<p>{LOREM}</p>" for _ in range(self.config["job_page_paragraphs"]))
+        json_ld = ""
+        if _stable_hash("json-ld" + job_id) % 1000 < self.config.get("structured_data_rate", 0.0) * 1000:
+            posting = {"@context": "https://schema.org", "@type": "JobPosting",
+                       "title": f"{self._title(job_id)} {job_id}", "description": paragraphs,
+                       "hiringOrganization": {"@type": "Organization", "name": f"Synthetic Corp {job_id.split('-')[0]}"},
+                       "jobLocationType": "TELECOMMUTE",
+                       "baseSalary": {"@type": "MonetaryAmount", "currency": "EUR", "value": {
+                           "@type": "QuantitativeValue", "minValue": 60000, "maxValue": 80000, "unitText": "YEAR"}}}
+            json_ld = f'<script type="application/ld+json">{json.dumps(posting)}</script>'
+        return (f"<html><head><title>Engineer {job_id}</title><style>p {{margin: 0}}</style>{json_ld}</head><body>\n"
+                f"<h1>Job title: {self._title(job_id)} {job_id}</h1>\n"
+                f"<p>Company: Synthetic Corp {job_id.split('-')[0]}</p>\n"
+                f"<p>Location: Remote</p>\n<p>Salary: 60k - 80k</p>\n{paragraphs}\n"
+                f"<script>var tracking = '{job_id}';</script></body></html>")
+
+
+def _tag(text: str, tag: str):
+    match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+    return match.group(1).strip() if match else None
+
+
+class SyntheticLLM:
+    """
+    Deterministic stand-in for query_llm, answering each prompt type of the
+    pipeline with a well-formed response.
+
+    Args:
+        corpus: SyntheticCorpus the answers must be consistent with
+    """
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def answer(self, request: dict) -> str:
+        query = request["query"]
+        system = request.get("system") or ""
+        if "<json_dump>" in query:
+            href = json.loads(_tag(query, "json_dump"))["attrs"].get("href", "")
+            return f"<reasoning>href pattern</reasoning><answer>{'yes' if '/job/' in href else 'no'}</answer>"
+        if "job description page or a job listing page" in query:
+            url = _tag(query, "url") or ""
+            kind = "Job Description" if "/job/" in url else "Job Listing"
+            return f"<scratchpad>url shape</scratchpad><answer>{kind}</answer>"
+        if "next page of job listings" in query:
+            url = _tag(query, "url") or ""
+            next_page = self.corpus.next_pages.get(url, 'No "next page" link found on this page.')
+            return f"<result>{next_page}</result>"
+        if "<raw_job_description>" in query:
+            raw = _tag(query, "raw_job_description") or ""
+            title = re.search(r"Job title: (.*)", raw)
+            if not title:
+                return ("<formatted_job_description>None</formatted_job_description><job_title>None</job_title>"
+                        "<salary>None</salary><location>None</location><company>None</company>")
+            company = re.search(r"Company: (.*)", raw)
+            description = "\n".join(line.strip() for line in raw.splitlines() if line.strip())
+            return (f"<formatted_job_description># {title.group(1)}\n\n{description}</formatted_job_description>"
+                    f"<job_title>{title.group(1)}</job_title><salary>60k - 80k</salary>"
+                    f"<location>Remote</location><company>{company.group(1) if company else 'None'}</company>")
+        if "create queries that could be used to search for job websites" in query:
+            return ('<scratchpad>backend</scratchpad><query_list>"python backend jobs", "data engineer jobs"'
+                    '</query_list><domain_of_interest>software engineering, data</domain_of_interest>')
+        if "good fit for the user" in system:
+            job = _tag(query, "JOB_DESCRIPTION") or query
+            verdict = "not relevant" if UNRELATED_TITLE in job or _stable_hash(job) % 3 == 0 else "relevant"
+            return f"<thinking>compare missions</thinking><answer>{verdict}</answer>"
+        if "score the fitting of a job" in system:
+            job = _tag(query, "JOB_DESCRIPTION") or query
+            return f"<thinking>compare skills</thinking><answer>{_stable_hash(job) % 11}</answer>"
+        if "pain points and the biggest challenges" in query:
+            return "<pain_points>- scaling the data platform\n- onboarding new engineers</pain_points>"
+        if "attention-grabbing hook" in query:
+            return "<hook>Scaling data platforms is what I have done for the last four years.</hook>"
+        if "<current_cover_letter>" in query:
+            current = json.loads(_tag(query, "current_cover_letter") or "{}")
+            current["body"] = LOREM * 3
+            return f"<cover_letter>{json.dumps(current)}</cover_letter>"
+        if "<fixed_steps>" in query:
+            step = {"adjective": "curious", "title": "Backend engineer",
+                    "experience": "4+ years of experience", "specialties": "python, sql, apis"}
+            return (f"<output>{json.dumps(step)}</output><professional_summary>Curious backend engineer "
+                    f"with 4+ years of experience. {LOREM}</professional_summary>")
+        if "<previous_steps>" in query:
+            return f"<professional_summary>Curious backend engineer with 4+ years of experience. {LOREM}</professional_summary>"
+        if '"adjective"' in query:
+            step = {"adjective": "curious", "title": "Backend engineer",
+                    "experience": "4+ years of experience", "specialties": "python, sql, apis"}
+            return f"<output>{json.dumps(step)}</output>"
+        if "<cover_latex>" in query:
+            return "<cover_latex>\\documentclass{letter}\\begin{document}x\\end{document}</cover_latex>"
+        if "<resume_latex>" in query:
+            return "<resume_latex>\\documentclass{article}\\begin{document}x\\end{document}</resume_latex>"
+        return "<answer>unknown</answer>"
+
+    def __call__(self, request: dict) -> dict:
+        response = self.answer(request)
+        input_tokens = (len(request["query"]) + len(request.get("system") or "")) // 4
+        output_tokens = len(response) // 4
+        model = request["model"]
+        return {
+            "response": response,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_creation_tokens": 0,
+            "cache_read_tokens": 0,
+            "cost": calculate_subagent_cost(model, input_tokens, output_tokens),
+        }
+
+
+class _TimedProxy:
+    """Proxy accumulating the time spent in every method call of the wrapped object"""
+    def __init__(self, target, timer: dict):
+        self._target = target
+        self._timer = timer
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            finally:
+                self._timer["sqlite"] += time.perf_counter() - start
+            return _TimedProxy(result, self._timer) if name == "cursor" else result
+        return timed
+
+    def __iter__(self):
+        iterator = iter(self._target)
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._timer["sqlite"] += time.perf_counter() - start
+            yield row
+
+
+def _llm_totals(metrics) -> dict:
+    data = metrics.to_dict()
+    totals = {"llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+    for stage in data["totals"].values():
+        totals["llm_calls"] += stage["calls"]
+        totals["input_tokens"] += stage["input_tokens"]
+        totals["output_tokens"] += stage["output_tokens"]
+        totals["cost"] += stage["cost"]
+    return totals
+
+
+def _measure(assistant, timer, name, fn, results):
+    before = _llm_totals(assistant.metrics)
+    sqlite_before = timer["sqlite"]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    after = _llm_totals(assistant.metrics)
+    stage = {key: after[key] - before[key] for key in after}
+    stage.update({
+        "wall_s": wall,
+        "sqlite_s": timer["sqlite"] - sqlite_before,
+        "peak_mem_mb": peak / 1_000_000,
+    })
+    results[name] = stage
+
+
+def run_benchmark(config: dict) -> dict:
+    """
+    Run the whole pipeline once over a synthetic corpus.
+
+    Args:
+        config: Benchmark configuration (see DEFAULT_CONFIG)
+
+    Returns:
+        dict with the configuration, per stage measurements and totals
+    """
+    from main import JobSearchAssistant
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, \
+            replay.StubServer(latency=config["http_latency"], error_rate=config["http_error_rate"],
+                              seed=config["seed"]) as server:
+        os.chdir(workdir)
+        try:
+            corpus = SyntheticCorpus(server, config)
+            serper_results = [{"link": url} for url in corpus.listing_urls]
+            replay.configure(
+                mode="replay",
+                directory=os.path.join(workdir, "fixtures"),
+                latency={"llm": config["llm_latency"], "serper": config["serper_latency"]},
+                error_rate={},
+                responders={
+                    "llm": SyntheticLLM(corpus),
+                    "serper": lambda request: [dict(r, query=request["q"]) for r in serper_results],
+                },
+                seed=config["seed"],
+                kinds=("llm", "serper"),
+            )
+            assistant = JobSearchAssistant(
+                os.path.join(here, "user_context_example.json"),
+                os.path.join(here, "user_want_example.md"),
+                **config["assistant"],
+            )
+            if config.get("ats_boards"):
+                assistant.ats_connectors = [GreenhouseConnector(api_base=server.url_for("/ats/greenhouse"))]
+            timer = {"sqlite": 0.0}
+            assistant.c = _TimedProxy(assistant.c, timer)
+            assistant.conn = _TimedProxy(assistant.conn, timer)
+
+            # LLM calls made when the first relevant job is stored
+            first_relevant = {}
+            add_job = assistant.add_job
+
+            def tracking_add_job(job_details):
+                add_job(job_details)
+                if job_details.get("is_relevant") and not first_relevant:
+                    first_relevant["llm_calls"] = _llm_totals(assistant.metrics)["llm_calls"]
+            assistant.add_job = tracking_add_job
+
+            stages = {}
+            tracemalloc.start()
+            try:
+                _measure(assistant, timer, "crawl", assistant.run, stages)
+                if config.get("recrawl"):
+                    _measure(assistant, timer, "recrawl", assistant.run, stages)
+                _measure(assistant, timer, "score", assistant.score_jobs, stages)
+                assistant.c.execute("SELECT id FROM jobs WHERE is_relevant = 1 ORDER BY score DESC LIMIT ?",
+                                    (config["documents"],))
+                top_ids = [row[0] for row in assistant.c.fetchall()]
+                _measure(assistant, timer, "documents",
+                         lambda: assistant.create_outputs_for_jobs(top_ids), stages)
+            finally:
+                tracemalloc.stop()
+
+            assistant.c.execute("SELECT COUNT(*) FROM jobs")
+            jobs = assistant.c.fetchone()[0]
+        finally:
+            replay.configure(mode="off", kinds=replay.KINDS)
+            os.chdir(previous_cwd)
+
+    totals = _llm_totals(assistant.metrics)
+    tokens = totals["input_tokens"] + totals["output_tokens"]
+    crawl_minutes = stages["crawl"]["wall_s"] / 60
+    return {
+        "config": config,
+        "stages": stages,
+        "totals": {
+            "jobs": jobs,
+            "corpus_jobs": corpus.job_count,
+            "http_requests": server.request_count,
+            "jobs_per_minute": jobs / crawl_minutes if crawl_minutes else 0.0,
+            "llm_calls": totals["llm_calls"],
+            "llm_calls_per_job": totals["llm_calls"] / jobs if jobs else 0.0,
+            "tokens_per_job": tokens / jobs if jobs else 0.0,
+            "cost_per_job": totals["cost"] / jobs if jobs else 0.0,
+            "jobs_per_dollar": jobs / totals["cost"] if totals["cost"] else 0.0,
+            "llm_calls_to_first_relevant": first_relevant.get("llm_calls", 0),
+            "sqlite_s": sum(stage["sqlite_s"] for stage in stages.values()),
+        },
+        "llm_metrics": assistant.metrics.to_dict(),
+    }
+
+
+def load_config(path: str = None) -> dict:
+    """Merge a JSON configuration file over DEFAULT_CONFIG"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        config["name"] = os.path.splitext(os.path.basename(path))[0]
+        config.update(overrides)
+    return config
+
+
+def format_comparison(results: list) -> str:
+    """Render totals and per stage measurements of several runs side by side"""
+    names = [r["config"]["name"] for r in results]
+    width = max(14, *(len(n) + 2 for n in names))
+    lines = [f"{'metric':<32}" + "".join(f"{n:>{width}}" for n in names)]
+
+    def row(label, values):
+        cells = "".join(f"{v:>{width}.3f}" if isinstance(v, float) else f"{v:>{width}}" for v in values)
+        if len(values) > 1 and isinstance(values[0], (int, float)) and values[0]:
+            cells += f"  ({(values[-1] - values[0]) / values[0] * 100:+.1f}%)"
+        lines.append(f"{label:<32}{cells}")
+
+    for key in results[0]["totals"]:
+        row(key, [r["totals"][key] for r in results])
+    for stage in results[0]["stages"]:
+        for key in results[0]["stages"][stage]:
+            row(f"{stage}.{key}", [r["stages"][stage][key] for r in results])
+    return "\n".join(lines)
+
+
+def check_regression(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare gated totals of a run with a baseline run.
+
+    Returns:
+        list of human readable regression messages (empty if none)
+    """
+    regressions = []
+    for key, higher_is_better in GATED_METRICS.items():
+        if key not in baseline["totals"]:
+            continue
+        old, new = baseline["totals"][key], result["totals"][key]
+        if not old:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{key}: {old:.3f} -> {new:.3f} ({change * 100:+.1f}%)")
+    return regressions
+
+
+# Commands timed by the startup benchmark, run from this directory
+STARTUP_COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import main": [sys.executable, "-c", "import main"],
+    "cli --help": [sys.executable, "cli.py", "--help"],
+}
+
+
+def measure_startup(runs: int = 10) -> dict:
+    """
+    Time the cold start of the entry points in fresh interpreters.
+
+    Args:
+        runs: Number of runs of each command
+
+    Returns:
+        dict: command -> {"median_s", "best_s"}
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, command in STARTUP_COMMANDS.items():
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=here, check=True, stdout=subprocess.DEVNULL)
+            durations.append(time.perf_counter() - start)
+        results[name] = {"median_s": statistics.median(durations), "best_s": min(durations)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the job search pipeline")
+    parser.add_argument("--config", action="append", default=[],
+                        help="JSON configuration file (repeat to compare configurations)")
+    parser.add_argument("--save", help="Write the results of every run to this JSON file")
+    parser.add_argument("--baseline", help="Results file to gate against (first run of the file)")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression on gated metrics (default 0.10)")
+    parser.add_argument("--startup", type=int, metavar="RUNS",
+                        help="Only time the cold start of the entry points over RUNS runs")
+    parser.add_argument("--startup-limit", type=float, default=1.0,
+                        help="Max median startup time in seconds of each entry point (default 1.0)")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        results = measure_startup(args.startup)
+        print(f"{'command':<16}{'median_s':>12}{'best_s':>12}")
+        for name, result in results.items():
+            print(f"{name:<16}{result['median_s']:>12.3f}{result['best_s']:>12.3f}")
+        slow = [name for name, result in results.items() if result["median_s"] > args.startup_limit]
+        for name in slow:
+            print(f"REGRESSION {name}: median startup above {args.startup_limit:.2f}s")
+        return 1 if slow else 0
+
+    configs = [load_config(path) for path in args.config] or [load_config()]
+    results = []
+    for config in configs:
+        print(f"running benchmark '{config['name']}'...", file=sys.stderr)
+        # keep the pipeline's progress output away from the report
+        with contextlib.redirect_stdout(sys.stderr):
+            results.append(run_benchmark(config))
+
+    print(format_comparison(results))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)[0]
+        regressions = check_regression(results[0], baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
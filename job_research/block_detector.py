@@ -0,0 +1,115 @@
+"""
+Block Page Detector
+
+Fast local classification of fetched pages, so that bot challenges and empty
+pages are retried with a stronger fetch strategy instead of being sent to the
+LLMs. A page is classified as:
+- blocked: captcha, Cloudflare / Incapsula / PerimeterX / DataDome challenge,
+  "enable JavaScript" shell, access denied page
+- empty: almost no visible text (empty body, script-only page)
+- ok: anything else
+
+Signals:
+- challenge markers of the anti-bot vendors (cf-chl, px-captcha, datadome,
+  "Attention Required! | Cloudflare", ...), only trusted on pages with
+  little visible text
+- generic block words (captcha, access denied, forbidden, ...), only trusted
+  on pages answered with a blocking status (401, 403, 429, 503): many short
+  job posts embed a reCAPTCHA apply form and are served with 200
+- visible text size and text-to-markup ratio
+"""
+
+import re
+
+OK = "ok"
+BLOCKED = "blocked"
+EMPTY = "empty"
+
+# Markup of the challenge pages of anti-bot vendors
+BLOCK_SIGNATURES = (
+    "cf-browser-verification", "cf_chl_opt", "cf-chl", "cf-challenge", "challenge-platform",
+    "_incapsula_resource", "incapsula incident", "request unsuccessful. incapsula",
+    "px-captcha", "perimeterx", "captcha-delivery.com", "datadome", "ddos-guard",
+    "checking your browser before accessing", "pardon our interruption",
+)
+
+# Titles of the challenge pages of anti-bot vendors
+BLOCK_TITLE_RE = re.compile(
+    r"just a moment\.\.\.|attention required! \| cloudflare|^un instant|pardon our interruption|"
+    r"request rejected|^robot check$|ddos-guard",
+    re.IGNORECASE)
+
+# Statuses with which a page containing generic block words is a block page
+BLOCK_STATUS_CODES = (401, 403, 429, 503)
+
+# Block words of any site, trusted with a blocking status only
+GENERIC_BLOCK_SIGNATURES = (
+    "captcha", "cf-turnstile", "enable javascript", "javascript is disabled", "activer javascript",
+    "activez javascript", "unusual traffic", "verify you are human", "are you a robot", "not a robot",
+    "access denied", "accès refusé",
+)
+
+GENERIC_BLOCK_TITLE_RE = re.compile(
+    r"access denied|accès refusé|are you a robot|security check|captcha|verify you are human|"
+    r"forbidden|too many requests|vérification",
+    re.IGNORECASE)
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_INVISIBLE_RE = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->",
+                           re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+# Pages with less visible text than this are checked for block signatures
+MAX_BLOCK_PAGE_TEXT = 1500
+# Pages with less visible text than this are empty
+MIN_TEXT = 200
+# Below this text-to-markup ratio, a page with little text is a script shell
+MIN_TEXT_RATIO = 0.01
+
+
+def visible_text(html: str) -> str:
+    """Return the visible text of an HTML page, whitespace collapsed"""
+    text = _TAG_RE.sub(" ", _INVISIBLE_RE.sub(" ", html))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def classify_page(content, status: int = 200) -> tuple:
+    """
+    Classify fetched content.
+
+    Args:
+        content: Page content (bytes or str)
+        status: HTTP status of the response (generic block words only count
+                with a BLOCK_STATUS_CODES status)
+
+    Returns:
+        tuple: (OK | BLOCKED | EMPTY, reason)
+    """
+    if not content:
+        return EMPTY, "empty body"
+    if isinstance(content, bytes):
+        if content.startswith(b"%PDF"):
+            return OK, "pdf"
+        content = content.decode("utf-8", "replace")
+
+    title_match = _TITLE_RE.search(content[:20000])
+    title = _SPACE_RE.sub(" ", title_match.group(1)).strip() if title_match else ""
+    text = visible_text(content)
+    blocking_status = status in BLOCK_STATUS_CODES
+    if title and len(text) < MAX_BLOCK_PAGE_TEXT * 2 and (
+            BLOCK_TITLE_RE.search(title) or (blocking_status and GENERIC_BLOCK_TITLE_RE.search(title))):
+        return BLOCKED, f"title: {title[:80]}"
+
+    if len(text) < MAX_BLOCK_PAGE_TEXT:
+        lowered = content.lower()
+        signatures = BLOCK_SIGNATURES + GENERIC_BLOCK_SIGNATURES if blocking_status else BLOCK_SIGNATURES
+        for signature in signatures:
+            if signature in lowered:
+                return BLOCKED, f"signature: {signature}"
+
+    if len(text) < MIN_TEXT:
+        return EMPTY, f"{len(text)} characters of text"
+    if len(text) < MAX_BLOCK_PAGE_TEXT and len(text) / len(content) < MIN_TEXT_RATIO:
+        return EMPTY, f"text to markup ratio {len(text) / len(content):.4f}"
+    return OK, ""
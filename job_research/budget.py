@@ -0,0 +1,172 @@
+"""
+Budget Governor
+
+Admission control for LLM spending. Ceilings on dollars and tokens are set
+for the whole run and optionally per pipeline stage (plan, classify_link,
+format, relevance, score, documents, ...). Before each call the governor
+reserves an estimate of its worst-case cost:
+- input tokens estimated from the prompt size (about 4 characters per token)
+- output tokens at the call's max_tokens
+and the call is refused (BudgetExceeded) when a ceiling would be crossed.
+Once the call returns, the reservation is replaced by the actual usage.
+
+As a ceiling gets close (degrade_at), the pipeline economizes before it has
+to stop:
+- calls use the next cheaper model of the cascade (sonnet -> haiku -> gpt-4o-mini)
+- the model router stops escalating answers to stronger models
+- optional stages (pagination by default) are skipped
+
+When a ceiling is reached, JobSearchAssistant.run() saves its progress to
+run_state.json and can be resumed with run(resume=True).
+"""
+
+import itertools
+import threading
+
+from llm import MODEL_CASCADE, MODEL_PRICING, DEFAULT_MAX_TOKENS, calculate_subagent_cost
+
+# Characters per token used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
+
+# Stages skipped when the budget is tight
+OPTIONAL_STAGES = ("next_page",)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a call would cross a cost or token ceiling"""
+    def __init__(self, scope: str, unit: str, limit: float, needed: float):
+        self.scope = scope
+        self.unit = unit
+        self.limit = limit
+        self.needed = needed
+        super().__init__(f"{scope} {unit} budget exhausted: {needed:.4f} needed, limit {limit:.4f}")
+
+
+class BudgetGovernor:
+    """
+    Run and stage ceilings on LLM cost and tokens.
+
+    Args:
+        max_cost: Run ceiling in USD (None: unlimited)
+        max_tokens: Run ceiling in input + output tokens (None: unlimited)
+        stage_limits: Per-stage ceilings, {stage: {"cost": usd, "tokens": n}}
+        degrade_at: Share of a ceiling above which cheaper models are used and
+                    optional stages are skipped
+        optional_stages: Stages skipped when the budget is tight
+        metrics: Optional MetricsRegistry receiving the governor's counters
+    """
+    def __init__(self, max_cost=None, max_tokens=None, stage_limits=None, degrade_at=0.8,
+                 optional_stages=OPTIONAL_STAGES, metrics=None):
+        self.limits = {"run": {"cost": max_cost, "tokens": max_tokens}}
+        for stage, limits in (stage_limits or {}).items():
+            self.limits[stage] = {"cost": limits.get("cost"), "tokens": limits.get("tokens")}
+        self.degrade_at = degrade_at
+        self.optional_stages = tuple(optional_stages)
+        self.metrics = metrics
+        self.spent = {}
+        self.reserved = {}
+        self.reservations = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def _count(self, name: str, stage: str):
+        if self.metrics is not None:
+            self.metrics.incr(name, stage=stage)
+
+    def _scopes(self, stage: str) -> tuple:
+        return ("run", stage) if stage in self.limits else ("run",)
+
+    def _used(self, scope: str, unit: str) -> float:
+        return self.spent.get(scope, {}).get(unit, 0) + self.reserved.get(scope, {}).get(unit, 0)
+
+    @staticmethod
+    def estimate(model: str, prompt_chars: int, max_tokens: int = None) -> dict:
+        """Worst-case tokens and cost of a call"""
+        input_tokens = prompt_chars // CHARS_PER_TOKEN + 1
+        output_tokens = max_tokens or DEFAULT_MAX_TOKENS
+        cost = calculate_subagent_cost(model, input_tokens, output_tokens) if model in MODEL_PRICING else 0.0
+        return {"tokens": input_tokens + output_tokens, "cost": cost}
+
+    def pressure(self, stage: str = None) -> float:
+        """Highest share of a ceiling used or reserved, over the run and the stage"""
+        with self.lock:
+            shares = [self._used(scope, unit) / limit
+                      for scope in self._scopes(stage) for unit, limit in self.limits[scope].items() if limit]
+        return max(shares, default=0.0)
+
+    def tight(self, stage: str = None) -> bool:
+        """Whether the pipeline should economize on a stage"""
+        return self.pressure(stage) >= self.degrade_at
+
+    def degrade(self, stage: str, model: str) -> str:
+        """Return the model to use for a call: one step down the cascade when the budget is tight"""
+        if model not in MODEL_CASCADE or MODEL_CASCADE.index(model) == 0 or not self.tight(stage):
+            return model
+        self._count("budget_degraded_total", stage)
+        return MODEL_CASCADE[MODEL_CASCADE.index(model) - 1]
+
+    def skip(self, stage: str) -> bool:
+        """Whether optional work of a stage should be skipped"""
+        if stage in self.optional_stages and self.tight(stage):
+            self._count("budget_skipped_total", stage)
+            return True
+        return False
+
+    def reserve(self, stage: str, model: str, prompt_chars: int, max_tokens: int = None) -> int:
+        """
+        Reserve the worst-case cost of a call.
+
+        Returns:
+            int: Reservation id, to pass to settle()
+
+        Raises:
+            BudgetExceeded: The call would cross a ceiling
+        """
+        estimate = self.estimate(model, prompt_chars, max_tokens)
+        with self.lock:
+            for scope in self._scopes(stage):
+                for unit, limit in self.limits[scope].items():
+                    needed = self._used(scope, unit) + estimate[unit]
+                    if limit is not None and needed > limit:
+                        self._count("budget_rejected_total", stage)
+                        raise BudgetExceeded(scope, unit, limit, needed)
+            for scope in self._scopes(stage):
+                reserved = self.reserved.setdefault(scope, {"cost": 0.0, "tokens": 0})
+                for unit in reserved:
+                    reserved[unit] += estimate[unit]
+            reservation = next(self.ids)
+            self.reservations[reservation] = (stage, estimate)
+        return reservation
+
+    def settle(self, reservation: int, response: dict = None):
+        """
+        Replace a reservation by the actual usage of the call.
+
+        Args:
+            reservation: Id returned by reserve()
+            response: Dict returned by query_llm, None if the call failed
+        """
+        response = response or {}
+        actual = {
+            "cost": response.get("cost", 0) or 0,
+            "tokens": sum(response.get(key, 0) or 0 for key in
+                          ("input_tokens", "output_tokens", "cache_creation_tokens", "cache_read_tokens")),
+        }
+        with self.lock:
+            stage, estimate = self.reservations.pop(reservation)
+            for scope in self._scopes(stage):
+                reserved = self.reserved[scope]
+                spent = self.spent.setdefault(scope, {"cost": 0.0, "tokens": 0})
+                for unit in reserved:
+                    reserved[unit] -= estimate[unit]
+                    spent[unit] += actual[unit]
+
+    def summary(self) -> str:
+        """Return a short human readable usage summary"""
+        lines = [f"{'budget':<16}{'cost $':>10}{'limit $':>10}{'tokens':>12}{'limit':>12}"]
+        with self.lock:
+            for scope, limits in self.limits.items():
+                spent = self.spent.get(scope, {})
+                lines.append(f"{scope:<16}{spent.get('cost', 0.0):>10.4f}{limits['cost'] or '-':>10}"
+                             f"{spent.get('tokens', 0):>12}{limits['tokens'] or '-':>12}")
+        return "\n".join(lines)
@@ -0,0 +1,200 @@
+"""
+Command Line Interface
+
+Entry point of the job-research console script (see pyproject.toml):
+
+    job-research search                      # plan the search and crawl job boards
+    job-research process --date 2024/07/30   # analyze job pages found since a date
+    job-research score                       # score relevant jobs
+    job-research reprocess --since 2024/07/01  # re-analyze stored jobs from the page archive, offline
+    job-research refresh --dry-run           # count the jobs made stale by a profile or prompt change
+    job-research compress                    # compress the stored job descriptions
+    job-research outputs 12 27 31 --workers 4
+    job-research letter --title "Data Engineer" --company Acme < description.txt
+    job-research daemon --port 8765          # keep the pipeline warm, see daemon.py
+    job-research batch --profiles profiles.json --documents 3  # one crawl for several candidates
+
+Only the standard library is imported before the command line is parsed, so
+`--help` and argument errors are instant; the pipeline modules (and the
+provider SDKs, which llm imports on first call) are loaded by the command
+that needs them.
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="job-research",
+                                     description="Find jobs matching your profile and write application documents.")
+    parser.add_argument("--context", default=os.path.join(HERE, "user_context.json"),
+                        help="User profile JSON (default: %(default)s)")
+    parser.add_argument("--want", default=os.path.join(HERE, "user_want.md"),
+                        help="Job search criteria in markdown (default: %(default)s)")
+    parser.add_argument("--output-dir", default="./output_dir", help="Directory of generated documents")
+    parser.add_argument("--max-workers", type=int, default=1, help="Concurrent workers")
+    parser.add_argument("--latex-mode", choices=("render", "llm"), default="render")
+    parser.add_argument("--summary-mode", choices=("chain", "single"), default="chain")
+    parser.add_argument("--metrics", default="metrics", help="Metrics export path prefix")
+    parser.add_argument("--max-cost", type=float, help="LLM spending ceiling of the run in USD")
+    parser.add_argument("--max-tokens", type=int, help="LLM token ceiling of the run")
+    parser.add_argument("--archive", default="archive", help="Raw page archive directory (default: %(default)s)")
+    parser.add_argument("--compression", choices=("zlib", "zstd", "none"), default="zlib",
+                        help="Compression of stored job descriptions (zstd needs the zstandard package)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Plan the search and crawl job boards")
+    search.add_argument("--query-limit", type=int, default=5, help="Max search results per query")
+    search.add_argument("--skip-domain", action="append", default=[], help="Domain to exclude (repeatable)")
+    search.add_argument("--resume", action="store_true", help="Continue the run stopped on its budget")
+    search.add_argument("--full-recrawl", action="store_true",
+                        help="Scan every listing page, including the ones unchanged since the previous crawl")
+
+    process = commands.add_parser("process", help="Analyze the job pages found since a date")
+    process.add_argument("--date", default="", help="YYYY/MM/DD (default: 7 days ago)")
+
+    score = commands.add_parser("score", help="Score the relevant jobs of the database")
+    score.add_argument("--unscored", action="store_true", help="Only score the jobs without a score")
+
+    reprocess = commands.add_parser("reprocess", help="Re-analyze stored jobs from the raw page archive, offline")
+    reprocess.add_argument("--since", default=None, help="Only jobs added since YYYY/MM/DD (default: every job)")
+    reprocess.add_argument("--no-score", dest="score", action="store_false", help="Do not score the relevant jobs")
+    reprocess.add_argument("--workers", type=int, default=None, help="Jobs analyzed in parallel")
+
+    refresh = commands.add_parser("refresh", help="Recompute the stale relevance votes and scores only")
+    refresh.add_argument("--stage", action="append", choices=("relevance", "score"),
+                         help="Stage to refresh (repeatable, default: both)")
+    refresh.add_argument("--dry-run", action="store_true", help="Only count the stale jobs")
+    refresh.add_argument("--workers", type=int, default=None, help="Jobs processed in parallel")
+
+    compress = commands.add_parser("compress", help="Migrate the stored descriptions to --compression")
+    compress.add_argument("--no-train", dest="train", action="store_false", help="Do not train a new dictionary")
+
+    outputs = commands.add_parser("outputs", help="Write the resume and cover letter of database jobs")
+    outputs.add_argument("ids", type=int, nargs="+", help="Job ids")
+    outputs.add_argument("--workers", type=int, default=None, help="Application packages written in parallel")
+
+    letter = commands.add_parser("letter", help="Write the resume and cover letter of a job given by hand")
+    letter.add_argument("--title", required=True)
+    letter.add_argument("--company", required=True)
+    letter.add_argument("--description", default="-",
+                        help="File holding the job description, '-' to read it from stdin (default)")
+
+    batch = commands.add_parser("batch", help="Crawl once and evaluate the jobs for several profiles (see profiles.py)")
+    batch.add_argument("--profiles", required=True, help="Profiles JSON file: {name: {context, want}}")
+    batch.add_argument("--no-crawl", dest="crawl", action="store_false",
+                       help="Only evaluate the stored jobs that are new or stale for a profile")
+    batch.add_argument("--query-limit", type=int, default=5, help="Max search results per query")
+    batch.add_argument("--full-recrawl", action="store_true",
+                       help="Scan every listing page, including the ones unchanged since the previous crawl")
+    batch.add_argument("--documents", type=int, default=0, help="Write the documents of each profile's N best jobs")
+    batch.add_argument("--workers", type=int, default=None, help="Evaluations running in parallel")
+
+    daemon = commands.add_parser("daemon", help="Serve the local task API (see daemon.py)")
+    daemon.add_argument("--host", default="127.0.0.1")
+    daemon.add_argument("--port", type=int, default=8765)
+    return parser
+
+
+def _read_description(path: str) -> str:
+    if path == "-":
+        if sys.stdin.isatty():
+            print("Enter the job description, then Ctrl+D (Ctrl+Z and Enter on Windows) on a new line:")
+        return sys.stdin.read().strip()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def main(argv=None) -> int:
+    """
+    Run a command.
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:])
+
+    Returns:
+        int: Exit status
+    """
+    args = build_parser().parse_args(argv)
+    description = _read_description(args.description) if args.command == "letter" else None
+
+    # the pipeline modules import each other by their flat names
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    from main import JobSearchAssistant
+    from budget import BudgetExceeded
+
+    budget = None
+    if args.max_cost is not None or args.max_tokens is not None:
+        budget = {"max_cost": args.max_cost, "max_tokens": args.max_tokens}
+
+    options = dict(verbose=args.verbose, max_workers=args.max_workers, skip_domains=getattr(args, "skip_domain", []),
+                   query_limit=getattr(args, "query_limit", 5), date=getattr(args, "date", ""),
+                   latex_mode=args.latex_mode, summary_mode=args.summary_mode, archive_dir=args.archive,
+                   description_compression=None if args.compression == "none" else args.compression,
+                   skip_unchanged_listings=not getattr(args, "full_recrawl", False))
+
+    def create_assistant():
+        return JobSearchAssistant(args.context, args.want, output_dir=args.output_dir, budget=budget, **options)
+
+    if args.command == "daemon":
+        from daemon import serve
+        serve(create_assistant, args.host, args.port, args.metrics)
+        return 0
+
+    if args.command == "batch":
+        from profiles import MultiProfileAssistant, load_profiles
+        assistant = MultiProfileAssistant(load_profiles(args.profiles), output_dir=args.output_dir, budget=budget,
+                                          **options)
+    else:
+        assistant = create_assistant()
+    try:
+        if args.command == "search":
+            if not assistant.run(resume=args.resume):
+                return 3
+        elif args.command == "process":
+            assistant.process_descriptions(assistant.date)
+        elif args.command == "score":
+            assistant.score_jobs(rescore=not args.unscored)
+        elif args.command == "reprocess":
+            assistant.reprocess(since=args.since, score=args.score, max_workers=args.workers)
+        elif args.command == "refresh":
+            assistant.refresh(stages=args.stage or ("relevance", "score"), max_workers=args.workers,
+                              dry_run=args.dry_run)
+        elif args.command == "compress":
+            assistant.compress_descriptions(train=args.train)
+        elif args.command == "outputs":
+            results = assistant.create_outputs_for_jobs(args.ids, max_workers=args.workers)
+            failed = [id for id, result in results.items() if isinstance(result, Exception)]
+            for id, result in results.items():
+                if not isinstance(result, Exception):
+                    print(f"Job {id}: {result}")
+            if failed:
+                return 1
+        elif args.command == "batch":
+            completed = assistant.run(args.workers) if args.crawl else assistant.evaluate(args.workers)
+            for name in assistant.assistants:
+                top = assistant.top_jobs(name, max(args.documents, 5))
+                print(f"{name}: " + ", ".join(f"{job['id']} {job['title']} ({job['score']})" for job in top))
+                if args.documents and top:
+                    assistant.create_outputs(name, [job["id"] for job in top[:args.documents]])
+            if not completed:
+                return 3
+        elif args.command == "letter":
+            output_path = assistant.create_outputs_from_params(args.title, args.company, description)
+            print(f"Outputs created in: {output_path}")
+    except BudgetExceeded as e:
+        print(f"Stopping: {e}")
+        return 3
+    finally:
+        print(f"Total API cost: {assistant.get_cost()} $USD")
+        assistant.export_metrics(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
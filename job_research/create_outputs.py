@@ -1,57 +1,20 @@
-import os
-import sys
-import subprocess
-
-def get_multiline_input(prompt):
-    print(prompt)
-    print("(Enter your input. Press Ctrl+Z and Enter on a new line to finish.)")
-    return sys.stdin.read().strip()
-
-if __name__ == "__main__":
-    # Get the directory of the current script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Activate the virtual environment using Poetry
-    activate_command = ["poetry", "run", "python", "-c", "import sys; print(sys.executable)"]
-    result = subprocess.run(activate_command, capture_output=True, text=True, cwd=current_dir)
-    
-    if result.returncode != 0:
-        print("Error activating virtual environment. Make sure Poetry is installed and configured correctly.")
-        print(result.stderr)
-        input("Press Enter to exit...")
-        sys.exit(1)
+"""
+Interactive helper writing the resume and cover letter of a job given by hand.
 
-    python_executable = result.stdout.strip()
+Runs in the current interpreter (start it with the project's environment,
+e.g. `poetry run python create_outputs.py`); it is the `letter` command of
+cli.py with the title and company asked interactively.
+"""
 
-    # Run the main script using the activated environment
-    main_script = [
-        python_executable,
-        "-c",
-        f"""
-import os
 import sys
-from main import JobSearchAssistant
 
-current_dir = {repr(current_dir)}
-user_context_file = os.path.join(current_dir, "user_context.json")
-user_want_file = os.path.join(current_dir, "user_want.md")
-
-assistant = JobSearchAssistant(user_context_file, user_want_file, verbose=True, max_workers=1)
-
-title = input("Enter job title: ")
-company = input("Enter enterprise name: ")
-print("Enter job description:")
-print("(Enter your input. Press Ctrl+Z and Enter on a new line to finish.)")
-description = sys.stdin.read().strip()
-
-assistant.create_outputs_from_params(title, company, description)
-
-print(f"\\nOutputs created successfully in: {{output_path}}")
-        """
-    ]
+from cli import main
 
+if __name__ == "__main__":
     try:
-        subprocess.run(main_script, cwd=current_dir)
+        title = input("Enter job title: ")
+        company = input("Enter enterprise name: ")
+        status = main(["--verbose", "letter", "--title", title, "--company", company])
     finally:
-        print("Press Enter to exit.")
-        input()
+        input("Press Enter to exit.")
+    sys.exit(status)
@@ -0,0 +1,314 @@
+"""
+Job Research Daemon
+
+Long-running process keeping JobSearchAssistant instances warm (SQLite
+connections, scraper session and fetch strategy stats, LLM clients, model
+router stats, LaTeX preamble formats) and accepting work over a local HTTP
+API, so submitting work does not pay interpreter, SDK and database startup.
+
+Work runs in two lanes, each with its own assistant and worker thread, so a
+long crawl does not delay interactive requests:
+- batch: search, crawl, process, score
+- interactive: check_url, job_url, documents, letter
+
+API (JSON bodies and responses, bound to localhost by default):
+- POST /tasks          {"kind": ..., "params": {...}} -> 202 with the queued task
+- GET  /tasks          recent tasks, optionally filtered with ?status=queued|running|done|failed
+- GET  /tasks/<id>     one task, with its result or error once finished
+- GET  /status         lanes, queue lengths, running tasks, cost and uptime
+- POST /shutdown       finish the running tasks and stop
+
+Task kinds and parameters:
+- search: {}                                   plan the search and crawl job boards
+- crawl: {"urls": [...], "process": true}      crawl seed pages, then process the job pages found
+- process: {"date": "YYYY/MM/DD"}              analyze job pages found since a date (default 7 days ago)
+- score: {}                                    score relevant jobs
+- check_url: {"url": ...}                      whether a URL is a job description page
+- job_url: {"url": ...}                        fetch, format and store one job page
+- documents: {"ids": [...], "workers": n}      resume and cover letter of database jobs
+- letter: {"title", "company", "description"}  resume and cover letter of a job given by hand
+"""
+
+import datetime
+import itertools
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# lane -> task kind -> required parameters
+LANES = {
+    "batch": {"search": (), "crawl": ("urls",), "process": (), "score": ()},
+    "interactive": {"check_url": ("url",), "job_url": ("url",), "documents": ("ids",),
+                    "letter": ("title", "company", "description")},
+}
+TASK_LANES = {kind: lane for lane, kinds in LANES.items() for kind in kinds}
+
+# Finished tasks kept for the status API
+MAX_FINISHED_TASKS = 1000
+
+
+class JobDaemon:
+    """
+    Task queues served by warm JobSearchAssistant instances.
+
+    Args:
+        assistant_factory: Callable() -> JobSearchAssistant, called once per
+                           lane in the lane's worker thread (the assistant's
+                           SQLite connection belongs to that thread)
+        metrics_prefix: Metrics export path prefix, the lane name is appended
+    """
+    def __init__(self, assistant_factory, metrics_prefix="metrics"):
+        self.assistant_factory = assistant_factory
+        self.metrics_prefix = metrics_prefix
+        self.queues = {lane: queue.Queue() for lane in LANES}
+        self.assistants = {}
+        self.running = {}
+        self.tasks = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.started = time.time()
+        self.ready = {lane: threading.Event() for lane in LANES}
+        self.workers = [threading.Thread(target=self._work, args=(lane,), name=f"daemon-{lane}", daemon=True)
+                        for lane in LANES]
+
+    def start(self):
+        """Start the lane workers and wait until their assistants are ready"""
+        for worker in self.workers:
+            worker.start()
+        for lane, worker in zip(LANES, self.workers):
+            while not self.ready[lane].wait(0.1):
+                if not worker.is_alive():
+                    raise RuntimeError(f"Could not start the {lane} worker")
+
+    def stop(self):
+        """Finish the running tasks, drop the queued ones and export the metrics"""
+        for lane_queue in self.queues.values():
+            while True:
+                try:
+                    task = lane_queue.get_nowait()
+                except queue.Empty:
+                    break
+                with self.lock:
+                    task.update(status="failed", error="daemon stopped", finished=time.time())
+            lane_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def submit(self, kind: str, params: dict = None) -> dict:
+        """
+        Queue a task.
+
+        Args:
+            kind: Task kind (see TASK_LANES)
+            params: Task parameters
+
+        Returns:
+            dict: Copy of the queued task
+
+        Raises:
+            ValueError: Unknown kind or missing parameter
+        """
+        params = params or {}
+        if kind not in TASK_LANES:
+            raise ValueError(f"Unknown task kind: {kind}")
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        lane = TASK_LANES[kind]
+        missing = [name for name in LANES[lane][kind] if not params.get(name)]
+        if missing:
+            raise ValueError(f"Missing parameters for {kind}: {', '.join(missing)}")
+        with self.lock:
+            task = {"id": next(self.ids), "kind": kind, "lane": lane, "params": params, "status": "queued",
+                    "result": None, "error": None, "cost": 0.0,
+                    "submitted": time.time(), "started": None, "finished": None}
+            self.tasks[task["id"]] = task
+            self._trim()
+            snapshot = dict(task)
+        self.queues[lane].put(task)
+        return snapshot
+
+    def _trim(self):
+        finished = [id for id, task in self.tasks.items() if task["status"] in ("done", "failed")]
+        for id in finished[:max(len(finished) - MAX_FINISHED_TASKS, 0)]:
+            del self.tasks[id]
+
+    def get(self, task_id: int):
+        """Return a copy of a task, None if unknown"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            return dict(task) if task else None
+
+    def list_tasks(self, status: str = None) -> list:
+        """Return copies of the known tasks, most recent first"""
+        with self.lock:
+            return [dict(task) for task in reversed(self.tasks.values()) if status in (None, task["status"])]
+
+    def status(self) -> dict:
+        """Daemon overview: lanes, queue lengths, running tasks, cost and uptime"""
+        with self.lock:
+            counts = {}
+            for task in self.tasks.values():
+                counts[task["status"]] = counts.get(task["status"], 0) + 1
+            running = dict(self.running)
+        return {
+            "uptime_s": time.time() - self.started,
+            "lanes": {lane: {"queued": self.queues[lane].qsize(), "running": running.get(lane),
+                             "cost": self.assistants[lane].get_cost() if lane in self.assistants else 0.0}
+                      for lane in LANES},
+            "tasks": counts,
+            "cost": sum(assistant.get_cost() for assistant in self.assistants.values()),
+        }
+
+    def _work(self, lane: str):
+        assistant = self.assistant_factory()
+        with self.lock:
+            self.assistants[lane] = assistant
+        self.ready[lane].set()
+        try:
+            while True:
+                task = self.queues[lane].get()
+                if task is None:
+                    break
+                self._run(lane, assistant, task)
+        finally:
+            assistant.export_metrics(f"{self.metrics_prefix}_{lane}")
+
+    def _run(self, lane: str, assistant, task: dict):
+        with self.lock:
+            task["status"], task["started"] = "running", time.time()
+            self.running[lane] = task["id"]
+        cost = assistant.get_cost()
+        try:
+            result = getattr(self, f"_run_{task['kind']}")(assistant, **task["params"])
+            status, error = "done", None
+        except Exception as e:
+            print(f"Task {task['id']} ({task['kind']}) failed: {e}")
+            result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+        with self.lock:
+            task.update(status=status, result=result, error=error, finished=time.time(),
+                        cost=assistant.get_cost() - cost)
+            self.running.pop(lane, None)
+
+    @staticmethod
+    def _default_date() -> str:
+        return (datetime.datetime.now() - datetime.timedelta(days=7)).strftime('%Y/%m/%d')
+
+    def _run_search(self, assistant):
+        assistant.jobs_descriptions = set()
+        assistant.date = self._default_date()
+        assistant.run()
+        return {"job_pages": len(assistant.jobs_descriptions)}
+
+    def _run_crawl(self, assistant, urls, process=True):
+        assistant.jobs_descriptions = set()
+        for url in urls:
+            assistant.process_url(url)
+        if process:
+            assistant.process_descriptions(self._default_date())
+        return {"job_pages": len(assistant.jobs_descriptions)}
+
+    def _run_process(self, assistant, date=None):
+        assistant.process_descriptions(date or self._default_date())
+        return {}
+
+    def _run_score(self, assistant):
+        assistant.score_jobs()
+        return {}
+
+    def _run_check_url(self, assistant, url):
+        return {"is_job_page": assistant.is_url_job_description(url)}
+
+    def _run_job_url(self, assistant, url):
+        assistant.process_job_description(url)
+        job_id = assistant.get_job_id(url)
+        job = assistant.get_job(job_id) if job_id is not None else None
+        if job is None:
+            return {"id": None}
+        return {key: job[key] for key in ("id", "title", "company", "location", "salary", "is_relevant", "score")}
+
+    def _run_documents(self, assistant, ids, workers=None):
+        results = assistant.create_outputs_for_jobs([int(id) for id in ids], max_workers=workers)
+        return {str(id): {"error": str(result)} if isinstance(result, Exception) else {"path": result}
+                for id, result in results.items()}
+
+    def _run_letter(self, assistant, title, company, description):
+        return {"path": assistant.create_outputs_from_params(title, company, description, open_folder=False)}
+
+
+def _handler(daemon: JobDaemon, shutdown):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["status"]:
+                return self._send(200, daemon.status())
+            if parts == ["tasks"]:
+                status = parse_qs(url.query).get("status", [None])[0]
+                return self._send(200, daemon.list_tasks(status))
+            if len(parts) == 2 and parts[0] == "tasks" and parts[1].isdigit():
+                task = daemon.get(int(parts[1]))
+                return self._send(200, task) if task else self._send(404, {"error": "unknown task"})
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            path = urlparse(self.path).path.rstrip("/")
+            if path == "/shutdown":
+                self._send(200, {"status": "stopping"})
+                threading.Thread(target=shutdown, daemon=True).start()
+                return
+            if path != "/tasks":
+                return self._send(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                task = daemon.submit(body.get("kind"), body.get("params"))
+            except (ValueError, AttributeError) as e:
+                return self._send(400, {"error": str(e)})
+            self._send(202, task)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(assistant_factory, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, metrics_prefix: str = "metrics"):
+    """
+    Run the daemon until POST /shutdown or Ctrl+C.
+
+    Args:
+        assistant_factory: Callable() -> JobSearchAssistant
+        host: Interface to listen on (keep it local, the API has no authentication)
+        port: TCP port
+        metrics_prefix: Metrics export path prefix
+    """
+    daemon = JobDaemon(assistant_factory, metrics_prefix)
+    daemon.start()
+
+    def shutdown():
+        server.shutdown()
+
+    server = ThreadingHTTPServer((host, port), _handler(daemon, shutdown))
+    print(f"Job research daemon listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+        print(f"Total API cost: {daemon.status()['cost']} $USD")
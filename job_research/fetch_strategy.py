@@ -0,0 +1,174 @@
+"""
+Fetch Strategy Learner
+
+Learns, per domain, which fetch strategy to use:
+- DIRECT (-1): free request with a rotating user agent
+- 0-3: ScrapeOps proxy, without bypass (0) or with cloudflare_level_1..3
+
+For every (domain, strategy) pair it records successes, failures, average
+latency and credits spent. Older observations decay exponentially (half-life),
+so the stats follow sites that harden or relax their protection.
+
+plan() returns the strategies to try for a domain, cheapest first, starting
+from the cheapest one likely to succeed: known-hard domains skip the free
+request and the levels that keep failing. The prior is optimistic, so a
+strategy is only demoted after a few failures (3 in a row with the default
+min_success): one timeout or server error keeps the free request first. A cheaper strategy is probed again
+once in a while (probe_interval), so a domain de-escalates when the site
+relaxes.
+
+Stats are stored in the fetch_stats table of webdomains.db.
+"""
+
+import sqlite3
+import threading
+import time
+
+DIRECT = -1
+STRATEGIES = (DIRECT, 0, 1, 2, 3)
+
+# ScrapeOps credits per request for each strategy
+STRATEGY_CREDITS = {DIRECT: 0, 0: 1, 1: 10, 2: 35, 3: 50}
+
+DAY = 24 * 3600
+
+# Beta prior of the success rate (pseudo successes, pseudo failures): an
+# untried strategy is estimated at 0.75, 3 failures bring it below 0.5
+PRIOR = (3, 1)
+
+
+class FetchStrategyLearner:
+    """
+    Per-domain, per-strategy success statistics with time decay.
+
+    Args:
+        db_path: SQLite database holding the fetch_stats table
+        half_life: Seconds after which an observation weighs half as much
+        min_success: Estimated success rate a strategy needs to be tried first
+        probe_interval: Seconds after which a cheaper strategy is tried again
+        credits: Credits per request for each strategy
+    """
+    def __init__(self, db_path="webdomains.db", half_life=7 * DAY, min_success=0.5, probe_interval=3 * DAY,
+                 credits=None):
+        self.half_life = half_life
+        self.min_success = min_success
+        self.probe_interval = probe_interval
+        self.credits = credits or STRATEGY_CREDITS
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS fetch_stats (
+                                    domain TEXT NOT NULL,
+                                    strategy INTEGER NOT NULL,
+                                    successes REAL NOT NULL,
+                                    failures REAL NOT NULL,
+                                    latency REAL,
+                                    credits REAL NOT NULL,
+                                    updated REAL NOT NULL,
+                                    PRIMARY KEY (domain, strategy)
+                                )''')
+            self.conn.commit()
+
+    def _decay(self, updated: float, now: float) -> float:
+        return 0.5 ** (max(now - updated, 0) / self.half_life)
+
+    @staticmethod
+    def _success_rate(successes: float, failures: float) -> float:
+        return (successes + PRIOR[0]) / (successes + failures + PRIOR[0] + PRIOR[1])
+
+    def get_stats(self, domain: str) -> dict:
+        """
+        Return the decayed stats of a domain.
+
+        Returns:
+            dict: strategy -> {"successes", "failures", "success_rate", "latency", "credits", "updated"}
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute("SELECT strategy, successes, failures, latency, credits, updated "
+                                     "FROM fetch_stats WHERE domain = ?", (domain,)).fetchall()
+        stats = {}
+        for strategy, successes, failures, latency, credits, updated in rows:
+            decay = self._decay(updated, now)
+            successes, failures = successes * decay, failures * decay
+            stats[strategy] = {
+                "successes": successes,
+                "failures": failures,
+                "success_rate": self._success_rate(successes, failures),
+                "latency": latency,
+                "credits": credits,
+                "updated": updated,
+            }
+        return stats
+
+    def known(self, domain: str) -> bool:
+        """Whether any observation was recorded for the domain"""
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM fetch_stats WHERE domain = ? LIMIT 1", (domain,)).fetchone() is not None
+
+    def record(self, domain: str, strategy: int, success: bool, latency: float = None, weight: float = 1.0):
+        """
+        Record the outcome of a fetch.
+
+        Args:
+            domain: Domain of the fetched URL
+            strategy: Strategy used (DIRECT or a ScrapeOps level)
+            success: Whether usable content was returned
+            latency: Duration of the request in seconds
+            weight: Number of observations the outcome counts for
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT successes, failures, latency, credits, updated FROM fetch_stats "
+                                    "WHERE domain = ? AND strategy = ?", (domain, strategy)).fetchone()
+            successes, failures, avg_latency, credits = 0.0, 0.0, None, 0.0
+            if row:
+                decay = self._decay(row[4], now)
+                successes, failures, avg_latency, credits = row[0] * decay, row[1] * decay, row[2], row[3]
+            if success:
+                successes += weight
+            else:
+                failures += weight
+            if latency is not None:
+                avg_latency = latency if avg_latency is None else 0.7 * avg_latency + 0.3 * latency
+            credits += self.credits.get(strategy, 0)
+            self.conn.execute("INSERT OR REPLACE INTO fetch_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (domain, strategy, successes, failures, avg_latency, credits, now))
+            self.conn.commit()
+
+    def seed(self, domain: str, level: int):
+        """Initialize a domain from a legacy difficulty level (webdomains table)"""
+        for strategy in STRATEGIES:
+            if strategy < level:
+                # known to fail: enough failures to outweigh the prior
+                self.record(domain, strategy, False, weight=PRIOR[0] + PRIOR[1] - 1)
+            elif strategy == level:
+                self.record(domain, strategy, True)
+
+    def plan(self, domain: str, allow_direct: bool = True) -> list:
+        """
+        Return the strategies to try for a domain, in order.
+
+        The first one is the cheapest strategy whose estimated success rate
+        reaches min_success, or the next cheaper strategy when it was not tried
+        for probe_interval. The more expensive strategies follow as escalation.
+
+        Args:
+            domain: Domain of the URL to fetch
+            allow_direct: Include the free request
+        """
+        candidates = sorted((s for s in STRATEGIES if allow_direct or s != DIRECT),
+                            key=lambda s: self.credits.get(s, 0))
+        stats = self.get_stats(domain)
+        now = time.time()
+        start = len(candidates) - 1
+        for i, strategy in enumerate(candidates):
+            rate = stats[strategy]["success_rate"] if strategy in stats else self._success_rate(0, 0)
+            if rate >= self.min_success:
+                start = i
+                break
+        if start > 0:
+            cheaper = candidates[start - 1]
+            if cheaper in stats and now - stats[cheaper]["updated"] >= self.probe_interval:
+                start -= 1
+        return candidates[start:]
@@ -0,0 +1,55 @@
+"""
+Derived Value Invalidation
+
+Each value the LLM derives for a stored job (is_relevant, score) is saved
+with the hash of the inputs that produced it:
+- the prompt templates of the stage
+- the models asked and their generation limits
+- the run inputs the templates actually use ({{USER_CONTEXT}},
+  {{USER_WANT}}, {{DOMAIN_OF_INTEREST}}, ...)
+
+Inputs a stage does not use are left out of its hash, so editing
+user_want.md leaves the scores valid (JOB_SCORE_PROMPT does not use it)
+while it invalidates the relevance votes. Per-job inputs such as
+{{JOB_DESCRIPTION}} are not run inputs, and a job whose description is
+rewritten gets its derived values recomputed with it (see
+JobSearchAssistant.reprocess).
+
+JobSearchAssistant.refresh() recomputes only the rows whose hash differs
+from the current one.
+"""
+
+import hashlib
+import json
+import re
+
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Za-z_]+)\}\}")
+
+
+def placeholders(*templates: str) -> set:
+    """Names of the {{PLACEHOLDERS}} used by prompt templates"""
+    return {name for template in templates for name in _PLACEHOLDER_RE.findall(template)}
+
+
+def stage_hash(templates: list, models, limits: dict, inputs: dict) -> str:
+    """
+    Hash of everything a stage's LLM answers depend on, besides the job itself.
+
+    Args:
+        templates: Prompt templates of the stage
+        models: Models asked, in order
+        limits: Generation limits of the calls (see llm.GENERATION_LIMITS)
+        inputs: Placeholder name -> value for the run inputs; only the
+                placeholders found in the templates are hashed
+
+    Returns:
+        str: 16 hex characters
+    """
+    used = placeholders(*templates)
+    canonical = json.dumps({
+        "templates": list(templates),
+        "models": list(models),
+        "limits": limits,
+        "inputs": {name: value for name, value in sorted(inputs.items()) if name in used},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,171 @@
+"""
+LaTeX Build Service
+
+Compiles generated .tex documents to PDF without blocking the pipeline on
+serial pdflatex runs:
+- Compilations run as subprocesses in a bounded pool (one per CPU core by default)
+- The preamble (everything before \\begin{document}) is precompiled once into a
+  format file with mylatexformat and reused by every document sharing it, so
+  packages are not reloaded for each resume / cover letter
+- A build is skipped when the .tex content hash matches the one recorded for
+  an existing PDF
+- Compiler output is captured; the log is only kept (as <name>.build.log)
+  when a build fails
+
+If the format cannot be built (e.g. mylatexformat is not installed) or a
+document fails to compile with it, documents are compiled the regular way.
+"""
+
+import hashlib
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+AUX_EXTENSIONS = (".aux", ".log", ".out")
+BEGIN_DOCUMENT = "\\begin{document}"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LatexBuilder:
+    """
+    Bounded pool of LaTeX compilations with precompiled preambles.
+
+    Args:
+        max_workers: Max concurrent compilations (default: number of CPU cores)
+        format_dir: Directory holding precompiled format files
+        compiler: LaTeX engine to run
+        use_formats: Precompile shared preambles into format files
+        timeout: Max seconds for a single compilation
+    """
+    def __init__(self, max_workers=None, format_dir=None, compiler="pdflatex", use_formats=True, timeout=120):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+        self.format_dir = format_dir or os.path.join(tempfile.gettempdir(), "job_research_latex_formats")
+        self.compiler = compiler
+        self.use_formats = use_formats
+        self.timeout = timeout
+        self.formats = {}
+        self.formats_lock = threading.Lock()
+        self.stats = {"built": 0, "skipped": 0, "failed": 0, "format_builds": 0}
+        self.stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def _run(self, args: list, cwd: str, env: dict = None) -> tuple:
+        """Run the compiler, returns (returncode, captured output)"""
+        try:
+            result = subprocess.run(args, cwd=cwd, env=env, capture_output=True, timeout=self.timeout,
+                                    stdin=subprocess.DEVNULL)
+        except FileNotFoundError:
+            return -1, f"{self.compiler} not found, install it to build PDF files"
+        except subprocess.TimeoutExpired as e:
+            return -1, f"{self.compiler} timed out after {self.timeout}s\n{(e.stdout or b'').decode('utf-8', 'replace')}"
+        return result.returncode, result.stdout.decode("utf-8", "replace") + result.stderr.decode("utf-8", "replace")
+
+    def _format_for(self, source: str):
+        """
+        Return the name of the precompiled format for the preamble of a
+        document, building it on first use. Returns None when unavailable.
+        """
+        if not self.use_formats or BEGIN_DOCUMENT not in source:
+            return None
+        preamble = source.split(BEGIN_DOCUMENT, 1)[0]
+        name = f"preamble_{_sha256(preamble)[:16]}"
+        with self.formats_lock:
+            if name in self.formats:
+                return self.formats[name]
+            os.makedirs(self.format_dir, exist_ok=True)
+            if not os.path.exists(os.path.join(self.format_dir, f"{name}.fmt")):
+                with open(os.path.join(self.format_dir, f"{name}.tex"), "w", encoding="utf-8") as f:
+                    f.write(preamble + BEGIN_DOCUMENT + "\n\\end{document}\n")
+                returncode, output = self._run(
+                    [self.compiler, "-ini", "-interaction=nonstopmode", f"-jobname={name}",
+                     f"&{self.compiler}", "mylatexformat.ltx", f"{name}.tex"],
+                    cwd=self.format_dir)
+                self._count("format_builds")
+                if returncode != 0 or not os.path.exists(os.path.join(self.format_dir, f"{name}.fmt")):
+                    self.formats[name] = None
+                    return None
+            self.formats[name] = name
+            return name
+
+    def _compile(self, tex_path: str, output_dir: str, fmt: str = None) -> tuple:
+        args = [self.compiler, "-interaction=nonstopmode", "-halt-on-error", f"-output-directory={output_dir}"]
+        env = None
+        if fmt:
+            args.append(f"-fmt={fmt}")
+            env = dict(os.environ, TEXFORMATS=self.format_dir + os.pathsep)
+        return self._run(args + [tex_path], cwd=output_dir, env=env)
+
+    def build(self, tex_path: str, force: bool = False) -> dict:
+        """
+        Compile a .tex file to PDF in its own directory, blocking until done.
+
+        Args:
+            tex_path: Path of the .tex file
+            force: Rebuild even if the source is unchanged
+
+        Returns:
+            dict with pdf_path, skipped, success, duration and log (None on success)
+        """
+        start = time.perf_counter()
+        tex_path = os.path.abspath(tex_path)
+        output_dir = os.path.dirname(tex_path)
+        name = os.path.splitext(os.path.basename(tex_path))[0]
+        pdf_path = os.path.join(output_dir, f"{name}.pdf")
+        hash_path = os.path.join(output_dir, f".{name}.texhash")
+
+        with open(tex_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        source_hash = _sha256(source)
+        if not force and os.path.exists(pdf_path) and os.path.exists(hash_path):
+            with open(hash_path, "r", encoding="utf-8") as f:
+                if f.read().strip() == source_hash:
+                    self._count("skipped")
+                    return {"pdf_path": pdf_path, "skipped": True, "success": True,
+                            "duration": time.perf_counter() - start, "log": None}
+
+        fmt = self._format_for(source)
+        returncode, output = self._compile(tex_path, output_dir, fmt)
+        if fmt and (returncode != 0 or not os.path.exists(pdf_path)):
+            # the precompiled preamble does not suit this document, fall back to a full build
+            with self.formats_lock:
+                self.formats[fmt] = None
+            returncode, output = self._compile(tex_path, output_dir)
+
+        for ext in AUX_EXTENSIONS:
+            aux_file = os.path.join(output_dir, f"{name}{ext}")
+            if os.path.exists(aux_file):
+                os.remove(aux_file)
+
+        success = returncode == 0 and os.path.exists(pdf_path)
+        if success:
+            with open(hash_path, "w", encoding="utf-8") as f:
+                f.write(source_hash)
+            self._count("built")
+        else:
+            with open(os.path.join(output_dir, f"{name}.build.log"), "w", encoding="utf-8") as f:
+                f.write(output)
+            self._count("failed")
+            print(f"LaTeX build failed for {tex_path}, see {name}.build.log")
+        return {"pdf_path": pdf_path, "skipped": False, "success": success,
+                "duration": time.perf_counter() - start, "log": None if success else output}
+
+    def submit(self, tex_path: str, force: bool = False):
+        """Queue a compilation, returns a Future resolving to the build() result"""
+        return self.executor.submit(self.build, tex_path, force)
+
+    def compile(self, tex_path: str, force: bool = False) -> dict:
+        """Compile through the pool and wait for the result"""
+        return self.submit(tex_path, force).result()
+
+    def shutdown(self):
+        """Wait for queued compilations and release the pool"""
+        self.executor.shutdown(wait=True)
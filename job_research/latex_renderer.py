@@ -0,0 +1,367 @@
+"""
+LaTeX Renderer
+
+Fills cover_template.tex and resume_template.tex locally from structured
+content, without sending the templates to an LLM:
+- the cover letter JSON produced by the cover letter chain (hook, body)
+- the professional summary produced by the resume chain
+- user_context.json (personal info, experience, education, projects, skills, hobbies)
+
+The templates keep their preamble (packages, macros, styling); only the
+personal information commands and the document body are generated. Every
+piece of user text goes through latex_escape, and **bold** markdown spans
+are turned into \\textbf.
+"""
+
+import re
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIALS_RE = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIALS))
+
+# URLs are written into \newcommand bodies, tokenized when the macro is
+# defined: \href / \url cannot re-read them as URL text, so characters that
+# are active or special there are turned back into plain characters with
+# \string when the macro expands (\# and \% are handled by hyperref)
+_URL_SPECIALS = {
+    "\\": "/",
+    "%": r"\%",
+    "#": r"\#",
+    "~": r"\string~",
+    "_": r"\string_",
+    "&": r"\string&",
+    "$": r"\string$",
+    "^": r"\string^",
+    "{": r"\%7B",
+    "}": r"\%7D",
+}
+_URL_SPECIALS_RE = re.compile("|".join(re.escape(c) for c in _URL_SPECIALS))
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+# Resume section titles by language. The default (French) matches resume_template.tex.
+SECTION_TITLES = {
+    "fr": {
+        "summary": "Résumé professionnel",
+        "skills": "Compétences",
+        "experience": "Expériences professionnelles",
+        "projects": "Autres expériences pertinentes",
+        "education": "Formation",
+        "hobbies": "Hobbies",
+        "references": "Références",
+        "references_text": "Disponibles sur demande.",
+    },
+    "en": {
+        "summary": "Professional Summary",
+        "skills": "Skills",
+        "experience": "Professional Experience",
+        "projects": "Other Relevant Experience",
+        "education": "Education",
+        "hobbies": "Hobbies",
+        "references": "References",
+        "references_text": "Available upon request.",
+    },
+}
+
+_LANGUAGE_HINTS = {
+    "fr": {"le", "la", "les", "des", "et", "vous", "nous", "pour", "avec", "une", "dans", "est", "sur", "du"},
+    "en": {"the", "and", "you", "we", "for", "with", "our", "are", "in", "of", "to", "is", "on", "will"},
+}
+
+
+def latex_escape(text) -> str:
+    """Escape LaTeX special characters in plain text and render **bold** spans"""
+    if text is None:
+        return ""
+    escaped = _LATEX_SPECIALS_RE.sub(lambda m: _LATEX_SPECIALS[m.group(0)], str(text))
+    return _BOLD_RE.sub(r"\\textbf{\1}", escaped)
+
+
+def latex_escape_url(url) -> str:
+    """Escape the characters of a URL (or email address) used as an \\href / \\url target inside a macro"""
+    return _URL_SPECIALS_RE.sub(lambda m: _URL_SPECIALS[m.group(0)], str(url or ""))
+
+
+def detect_language(text: str, default: str = "fr") -> str:
+    """Guess the language of a job description among SECTION_TITLES' languages"""
+    words = re.findall(r"[a-zà-ÿ]+", (text or "").lower())
+    scores = {lang: sum(1 for w in words if w in hints) for lang, hints in _LANGUAGE_HINTS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else default
+
+
+def _find_group_end(source: str, start: int) -> int:
+    """Return the index just after the balanced {...} group starting at start"""
+    depth = 0
+    i = start
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError("Unbalanced braces in LaTeX template")
+
+
+def replace_command(source: str, name: str, value: str) -> str:
+    """
+    Replace the definition of \\newcommand{\\<name>}{...} in a template.
+
+    Args:
+        source: Template source
+        name: Command name without backslash
+        value: New LaTeX body of the command
+    """
+    marker = "\\newcommand{\\" + name + "}"
+    start = source.find(marker)
+    if start < 0:
+        return source
+    group_start = source.index("{", start + len(marker))
+    group_end = _find_group_end(source, group_start)
+    return source[:group_start] + "{" + value + "}" + source[group_end:]
+
+
+def replace_group(source: str, prefix: str, value: str) -> str:
+    """Replace the first {...} argument following prefix (e.g. "\\signature")"""
+    start = source.find(prefix)
+    if start < 0:
+        return source
+    group_start = source.index("{", start + len(prefix))
+    group_end = _find_group_end(source, group_start)
+    return source[:group_start] + "{" + value + "}" + source[group_end:]
+
+
+def _paragraphs(text: str) -> list:
+    return [latex_escape(p.strip()) for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+
+
+def render_cover_letter(template: str, user_context: dict, cover_letter: dict, job_desc: dict = None) -> str:
+    """
+    Fill the cover letter template.
+
+    Args:
+        template: Content of cover_template.tex
+        user_context: Parsed user_context.json
+        cover_letter: Cover letter JSON with 'hook' and 'body' (and optionally
+                      'opening' / 'closing' to override the template's)
+        job_desc: Job details, used for the recipient block
+
+    Returns:
+        str: Complete LaTeX document
+    """
+    info = user_context.get("personalInfo", {})
+    job_desc = job_desc or {}
+    name = latex_escape(info.get("name", ""))
+    website = info.get("linkedin") or info.get("github") or info.get("youtube") or ""
+
+    tex = replace_command(template, "covertitle", name.replace(" ", "~"))
+    tex = replace_command(tex, "authoraddress", "\n    " + latex_escape(info.get("location", "")))
+    tex = replace_command(tex, "authorweb", latex_escape_url(website))
+    tex = replace_command(tex, "authoremail", latex_escape_url(info.get("email", "")))
+    tex = replace_command(tex, "authortel", latex_escape(info.get("phone", "")))
+    tex = replace_group(tex, "\\signature", name)
+
+    recipient = [f"\\textbf{{{latex_escape(job_desc.get('company') or '')}}}"]
+    if job_desc.get("location"):
+        recipient.append(latex_escape(job_desc["location"]))
+    tex = replace_group(tex, "\\begin{letter}", "\n" + " \\\\\n".join(recipient) + "\n")
+
+    if cover_letter.get("opening"):
+        tex = replace_group(tex, "\\opening", latex_escape(cover_letter["opening"]))
+    if cover_letter.get("closing"):
+        tex = replace_group(tex, "\\closing", latex_escape(cover_letter["closing"]))
+
+    # replace the sample letter between \opening{...} and \closing
+    opening = tex.index("\\opening")
+    body_start = _find_group_end(tex, tex.index("{", opening))
+    body_end = tex.index("\\closing", body_start)
+    paragraphs = _paragraphs(cover_letter.get("hook", "")) + _paragraphs(cover_letter.get("body", ""))
+    body = "\n\n" + "\n\n".join(paragraphs) + "\n\n"
+    return tex[:body_start] + body + tex[body_end:]
+
+
+def _contact_info(info: dict) -> str:
+    parts = []
+    if info.get("phone"):
+        parts.append(f"\\faPhone{{}} {latex_escape(info['phone'])}")
+    if info.get("email"):
+        parts.append(f"\\faEnvelope{{}} {latex_escape(info['email'])}")
+    for key, icon in (("linkedin", "\\faLinkedin"), ("github", "\\faGithub"), ("youtube", "\\faYoutubePlay")):
+        url = info.get(key)
+        if url:
+            label = url.rstrip("/").rsplit("/", 1)[-1]
+            parts.append(f"{icon}{{}} \\href{{{latex_escape_url(url)}}}{{{latex_escape(label)}}}")
+    contact = " \\textbar{} ".join(parts)
+    if info.get("location"):
+        contact += f" \\textit{{{latex_escape(info['location'])}}}"
+    return contact
+
+
+def _itemize(items: list) -> str:
+    if not items:
+        return ""
+    lines = "\n".join(f"    \\item {item}" for item in items)
+    return f"\\begin{{itemize}}\n{lines}\n\\end{{itemize}}\n"
+
+
+def render_resume(template: str, user_context: dict, professional_summary: str, job_desc: dict = None,
+                  language: str = None) -> str:
+    """
+    Fill the resume template.
+
+    Args:
+        template: Content of resume_template.tex
+        user_context: Parsed user_context.json
+        professional_summary: Summary produced by the resume chain (kept as is)
+        job_desc: Job details, used to pick the section language
+        language: Force the section language (key of SECTION_TITLES)
+
+    Returns:
+        str: Complete LaTeX document
+    """
+    info = user_context.get("personalInfo", {})
+    language = language or detect_language((job_desc or {}).get("description", ""))
+    titles = SECTION_TITLES.get(language, SECTION_TITLES["fr"])
+
+    tex = replace_command(template, "myname", latex_escape(info.get("name", "")))
+    tex = replace_command(tex, "contactinfo", _contact_info(info))
+
+    sections = ["\\header\n", f"\\sectionheader{{{titles['summary']}}}\n\n{latex_escape(professional_summary)}\n"]
+
+    skills = list(dict.fromkeys(user_context.get("mainSkills", []) + user_context.get("skills", [])))
+    if skills:
+        sections.append(f"\\sectionheader{{{titles['skills']}}}\n\\noindent "
+                        + " \\textbar{} ".join(latex_escape(s) for s in skills) + "\n")
+
+    experiences = user_context.get("experience", [])
+    if experiences:
+        blocks = []
+        for exp in experiences:
+            heading = (f"\\MyHeadings{{{latex_escape(exp.get('company'))}}}{{{latex_escape(exp.get('title'))}}}"
+                       f"{{{latex_escape(exp.get('location'))}}}{{{latex_escape(exp.get('duration'))}}}\n")
+            items = []
+            for project in exp.get("projects", []):
+                details = project.get("details", [])
+                if project.get("name"):
+                    items.append(f"\\textbf{{{latex_escape(project['name'])}}}"
+                                 + (f" ({latex_escape(project.get('duration'))})" if project.get("duration") else "")
+                                 + (": " + latex_escape(details[0]) if details else ""))
+                    details = details[1:]
+                items.extend(latex_escape(d) for d in details)
+            blocks.append(heading + _itemize(items))
+        sections.append(f"\\sectionheader{{{titles['experience']}}}\n\n" + "\n\\vspace{6pt}\n\n".join(blocks))
+
+    projects = user_context.get("projects", [])
+    if projects:
+        items = [f"\\textbf{{{latex_escape(p.get('name'))}}}"
+                 + (f" ({latex_escape(p.get('duration'))})" if p.get("duration") else "")
+                 + f": {latex_escape(p.get('description'))}" for p in projects]
+        sections.append(f"\\sectionheader{{{titles['projects']}}}\n" + _itemize(items))
+
+    education = user_context.get("education", [])
+    if education:
+        entries = []
+        for edu in education:
+            degree = ", ".join(latex_escape(edu[k]) for k in ("degree", "field") if edu.get(k))
+            entries.append(f"\\textbf{{{latex_escape(edu.get('institution'))}}} \\hfill "
+                           f"{latex_escape(edu.get('duration'))} \\\\\n{degree}.")
+        sections.append(f"\\sectionheader{{{titles['education']}}}\n" + "\n\n\\vspace{4pt}\n".join(entries) + "\n")
+
+    hobbies = user_context.get("hobbies", [])
+    if hobbies:
+        sections.append(f"\\sectionheader{{{titles['hobbies']}}}\n" + _itemize([latex_escape(h) for h in hobbies]))
+
+    sections.append(f"\\sectionheader{{{titles['references']}}}\n{titles['references_text']}\n")
+
+    body_start = tex.index("\\begin{document}") + len("\\begin{document}")
+    body_end = tex.rindex("\\end{document}")
+    return tex[:body_start] + "\n\n" + "\n".join(sections) + "\n" + tex[body_end:]
+
+
+# Profile of check_rendering: URLs and email with characters special to LaTeX
+CHECK_CONTEXT = {
+    "personalInfo": {
+        "name": "Jane O'Neil-Smith",
+        "email": "jane_o&neil~dev@example.com",
+        "phone": "+33 6 12 34 56 78",
+        "location": "Paris & remote",
+        "linkedin": "https://www.linkedin.com/in/jane_o~neil/?a=1&b=2#top",
+        "github": "https://github.com/jane_o~neil",
+    },
+    "skills": ["C#", "R&D", "50% growth"],
+}
+
+_HREF_TARGET_RE = re.compile(r"\\href\{((?:[^{}]|\{\})*)\}")
+_URL_COMMAND_RE = re.compile(r"\\newcommand\{\\(authorweb|authoremail)\}\{(.*)\}")
+_UNESCAPED_URL_RE = re.compile(r"(?<!\\string)[~_&$^]|(?<!\\)[#%]")
+
+
+def check_rendering(builder=None, directory: str = None) -> list:
+    """
+    Render the resume and the cover letter of CHECK_CONTEXT and check the
+    URL and email targets. When the LaTeX compiler is available, the
+    documents are compiled too.
+
+    Args:
+        builder: latex.LatexBuilder to compile with (default: a new one)
+        directory: Where to write the documents (default: a temporary directory)
+
+    Returns:
+        list: Problems found, [] if the documents render
+    """
+    import os
+    import shutil
+    import tempfile
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, "resume_template.tex"), "r", encoding="utf-8") as f:
+        resume = render_resume(f.read(), CHECK_CONTEXT, "Engineer, **10 years** of R&D.", language="en")
+    with open(os.path.join(here, "cover_template.tex"), "r", encoding="utf-8") as f:
+        cover = render_cover_letter(f.read(), CHECK_CONTEXT, {"hook": "Hello_world & co.", "body": "50% ~ #1"},
+                                    {"company": "A&B", "location": "Lyon"})
+
+    problems = []
+    targets = [("resume", target) for target in _HREF_TARGET_RE.findall(resume)]
+    targets += [("cover letter", target) for _, target in _URL_COMMAND_RE.findall(cover)]
+    for document, target in targets:
+        if _UNESCAPED_URL_RE.search(target):
+            problems.append(f"{document}: unescaped URL target {target}")
+    if builder is None and shutil.which("pdflatex") is None:
+        return problems
+
+    from latex import LatexBuilder
+
+    builder = builder or LatexBuilder(max_workers=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = directory or tmp
+        for name, tex in (("check_resume", resume), ("check_cover", cover)):
+            path = os.path.join(directory, f"{name}.tex")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(tex)
+            result = builder.build(path, force=True)
+            if not result["success"]:
+                problems.append(f"{name}.tex does not compile:\n{(result['log'] or '')[-2000:]}")
+    return problems
+
+
+if __name__ == "__main__":
+    import sys
+
+    found = check_rendering()
+    print("\n".join(found) or "LaTeX rendering check passed")
+    sys.exit(1 if found else 0)
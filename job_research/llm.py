@@ -9,17 +9,25 @@ This module provides a unified interface for interacting with various Language M
 It handles:
 - Model selection and API calls
 - Token counting and cost calculation
+- Prompt caching of static prompt prefixes (Anthropic cache_control, OpenAI automatic prefix caching)
+- Model routing: a task declares its quality requirement, the cheapest suitable
+  model answers first and stronger models are only used when the answer fails
+  to parse or signals low confidence (ModelRouter)
 - Error handling and retries
-- Response parsing and formatting
+- Per-task generation limits (max_tokens, stop sequences) so that generation
+  halts right after the closing answer tag
+- Single-pass response parsing (parse_tags)
+
+Provider SDKs (anthropic, openai, ollama) are imported on first use, so
+importing this module stays fast. Clients are created once per API key and
+reused, so their connection pools stay warm in long-running processes.
 """
 
 import os
-import openai
-import anthropic
-from anthropic import Anthropic
 import re
-import ollama
+import threading
 import time
+from replay import replayable
 
 # Model configuration constants
 MODEL_NAMES = {
@@ -44,26 +52,123 @@ MODEL_PRICING = {
     "gpt-4o-mini": {"input_cost_per_mtok": 0.15, "output_cost_per_mtok": 0.6},
 }
 
-def _query_claude(query: str, model_name: str, api_key: str = None) -> dict:
-    """Handle Claude API calls with retry logic for server overload"""
+# Prompt caching price multipliers, relative to the model's input price.
+# Anthropic bills cache writes at 1.25x and cache reads at 0.1x; OpenAI caches
+# prefixes automatically (no write surcharge) and bills cached tokens at 0.5x.
+CACHE_PRICING = {
+    "claude": {"cache_write_multiplier": 1.25, "cache_read_multiplier": 0.1},
+    "gpt": {"cache_write_multiplier": 1.0, "cache_read_multiplier": 0.5},
+}
+
+# Default output budget when a task sets none
+DEFAULT_MAX_TOKENS = 4096
+
+# Per-task generation limits: max output tokens and stop sequences. Stopping on
+# the closing tag of the last expected tag avoids paying for trailing text; the
+# stop sequence is restored in the returned response.
+GENERATION_LIMITS = {
+    "plan": {"max_tokens": 1024},
+    "classify_link": {"max_tokens": 400, "stop": ["</answer>"]},
+    "is_job_page": {"max_tokens": 500, "stop": ["</answer>"]},
+    "next_page": {"max_tokens": 300, "stop": ["</result>"]},
+    "format": {"max_tokens": 4096},
+    # room for the <thinking> section the prompts ask for before the answer
+    "relevance": {"max_tokens": 2048, "stop": ["</answer>"]},
+    "score": {"max_tokens": 2048, "stop": ["</answer>"]},
+    "pain_points": {"max_tokens": 1024, "stop": ["</pain_points>"]},
+    "hook": {"max_tokens": 1024, "stop": ["</hook>"]},
+    "cover_letter_body": {"max_tokens": 2048, "stop": ["</cover_letter>"]},
+    "summary_step": {"max_tokens": 1024, "stop": ["</output>"]},
+    "summary_final": {"max_tokens": 1024, "stop": ["</professional_summary>"]},
+    "summary_single": {"max_tokens": 1024, "stop": ["</professional_summary>"]},
+    "cover_latex": {"max_tokens": 4096, "stop": ["</cover_latex>"]},
+    "resume_latex": {"max_tokens": 4096, "stop": ["</resume_latex>"]},
+}
+
+def _restore_stop(text: str, stop: list = None, stopped: bool = True) -> str:
+    """
+    Append a closing-tag stop sequence the provider cut off, so the tag can be parsed.
+
+    Args:
+        text: Generated text
+        stop: Stop sequences of the call
+        stopped: Whether generation ended on a stop sequence; a response cut
+                 at max_tokens is returned as is, so that validation sees it
+                 is truncated
+    """
+    if not stopped:
+        return text
+    for sequence in stop or []:
+        if sequence.startswith("</") and sequence.endswith(">"):
+            opening = "<" + sequence[2:]
+            if text.rfind(opening) > text.rfind(sequence):
+                return text + sequence
+    return text
+
+def _model_key(model_name: str) -> str:
+    """Map a provider model name back to its MODEL_NAMES key"""
+    for key, name in MODEL_NAMES.items():
+        if name == model_name:
+            return key
+    return model_name
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _anthropic_client(api_key: str):
+    """Return the shared Anthropic client of an API key"""
+    import anthropic
+
+    with _clients_lock:
+        client = _clients.get(("anthropic", api_key))
+        if client is None:
+            client = _clients[("anthropic", api_key)] = anthropic.Anthropic(api_key=api_key)
+        return client
+
+def _query_claude(query: str, model_name: str, api_key: str = None, system: str = None,
+                  max_tokens: int = None, stop: list = None) -> dict:
+    """
+    Handle Claude API calls with retry logic for server overload.
+
+    When a system prompt is given it is sent as a separate block marked with a
+    cache_control breakpoint, so repeated calls sharing the same static prefix
+    only pay the cache read price for it.
+    """
+    import anthropic
+
     max_retries = 3
     retry_delay = 10
     
-    for _ in range(max_retries):
+    for attempt in range(max_retries):
         try:
-            client = Anthropic(api_key=api_key or os.environ["ANTHROPIC_API_KEY"])
+            client = _anthropic_client(api_key or os.environ["ANTHROPIC_API_KEY"])
+            kwargs = {}
+            if stop:
+                kwargs["stop_sequences"] = stop
+            if system:
+                kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+                kwargs["extra_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
             response = client.messages.create(
                 model=model_name,
-                max_tokens=4096,
+                max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
                 messages=[{"role": "user", "content": query}],
+                **kwargs,
             )
+            cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
+            cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", 0) or 0
             return {
-                "response": response.content[0].text,
+                "response": _restore_stop(response.content[0].text, stop,
+                                          response.stop_reason == "stop_sequence"),
                 "input_tokens": response.usage.input_tokens,
                 "output_tokens": response.usage.output_tokens,
-                "cost": calculate_subagent_cost(model_name, 
-                                              response.usage.input_tokens, 
-                                              response.usage.output_tokens),
+                "cache_creation_tokens": cache_creation_tokens,
+                "cache_read_tokens": cache_read_tokens,
+                "retries": attempt,
+                "cost": calculate_subagent_cost(_model_key(model_name),
+                                              response.usage.input_tokens,
+                                              response.usage.output_tokens,
+                                              cache_creation_tokens,
+                                              cache_read_tokens),
             }
         except anthropic.InternalServerError as e:
             error_details = e.response.json()
@@ -76,31 +181,73 @@ def _query_claude(query: str, model_name: str, api_key: str = None) -> dict:
             raise
     raise Exception("All retry attempts failed")
 
-def _query_openai(query: str, model_name: str, api_key: str = None) -> dict:
-    """Handle OpenAI API calls"""
+def _query_openai(query: str, model_name: str, api_key: str = None, system: str = None,
+                  max_tokens: int = None, stop: list = None) -> dict:
+    """
+    Handle OpenAI API calls.
+
+    OpenAI caches prompt prefixes automatically, so the system prompt is simply
+    sent first; cached tokens are read back from the usage details.
+    """
+    import openai
+
     openai.api_key = api_key or os.environ["OPENAI_API_KEY"]
+    messages = [{"role": "user", "content": query}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    kwargs = {"stop": stop} if stop else {}
     response = openai.chat.completions.create(
         model=model_name,
-        messages=[{"role": "user", "content": query}],
+        messages=messages,
+        max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+        **kwargs,
     )
+    details = getattr(response.usage, "prompt_tokens_details", None)
+    cache_read_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    input_tokens = response.usage.prompt_tokens - cache_read_tokens
     return {
-        "response": response.choices[0].message.content,
-        "input_tokens": response.usage.prompt_tokens,
+        "response": _restore_stop(response.choices[0].message.content, stop,
+                                  response.choices[0].finish_reason == "stop"),
+        "input_tokens": input_tokens,
         "output_tokens": response.usage.completion_tokens,
-        "cost": calculate_subagent_cost(model_name, 
-                                      response.usage.prompt_tokens, 
-                                      response.usage.completion_tokens),
+        "cache_creation_tokens": 0,
+        "cache_read_tokens": cache_read_tokens,
+        "cost": calculate_subagent_cost(_model_key(model_name),
+                                      input_tokens,
+                                      response.usage.completion_tokens,
+                                      0,
+                                      cache_read_tokens),
     }
 
-def _query_ollama(query: str, model_name: str) -> dict:
+def _query_ollama(query: str, model_name: str, system: str = None, max_tokens: int = None, stop: list = None) -> dict:
     """Handle local Ollama model calls"""
-    response = ollama.generate(model=model_name, prompt=query)
+    import ollama
+
+    kwargs = {"system": system} if system else {}
+    options = {"num_predict": max_tokens or DEFAULT_MAX_TOKENS}
+    if stop:
+        options["stop"] = stop
+    response = ollama.generate(model=model_name, prompt=query, options=options, **kwargs)
     return {
-        "response": response["response"],
+        "response": _restore_stop(response["response"], stop, response.get("done_reason") != "length"),
+        "input_tokens": response.get("prompt_eval_count", 0) or 0,
+        "output_tokens": response.get("eval_count", 0) or 0,
         "cost": 0
     }
 
-def query_llm(query: str, model: str = "gpt-4o-mini", api_key: str = None) -> dict:
+def _llm_request(query: str, model: str = "gpt-4o-mini", api_key: str = None, system: str = None,
+                 max_tokens: int = None, stop: list = None) -> dict:
+    """Describe an LLM call for the record/replay fixture store (the API key is left out)"""
+    request = {"model": model, "system": system, "query": query}
+    if max_tokens:
+        request["max_tokens"] = max_tokens
+    if stop:
+        request["stop"] = list(stop)
+    return request
+
+@replayable("llm", _llm_request)
+def query_llm(query: str, model: str = "gpt-4o-mini", api_key: str = None, system: str = None,
+              max_tokens: int = None, stop: list = None) -> dict:
     """
     Query an LLM with automatic model selection and error handling.
 
@@ -108,12 +255,21 @@ def query_llm(query: str, model: str = "gpt-4o-mini", api_key: str = None) -> di
         query: The prompt/question to send to the LLM
         model: Model identifier from MODEL_NAMES
         api_key: Optional API key (defaults to environment variable)
+        system: Optional static prefix (instructions, user profile) shared
+                across calls. It is sent ahead of the query so providers can
+                serve it from their prompt cache.
+        max_tokens: Max output tokens (default DEFAULT_MAX_TOKENS)
+        stop: Stop sequences. A closing tag used as stop sequence is kept in
+              the response
 
     Returns:
         dict containing:
         - response: The LLM's text response
-        - input_tokens: Number of input tokens (if applicable)
+        - input_tokens: Number of uncached input tokens (if applicable)
         - output_tokens: Number of output tokens (if applicable)
+        - cache_creation_tokens: Input tokens written to the prompt cache (if applicable)
+        - cache_read_tokens: Input tokens served from the prompt cache (if applicable)
+        - retries: Number of retried attempts (if applicable)
         - cost: Calculated cost in USD
     """
     if model not in MODEL_NAMES:
@@ -122,28 +278,46 @@ def query_llm(query: str, model: str = "gpt-4o-mini", api_key: str = None) -> di
     model_name = MODEL_NAMES[model]
 
     if "claude" in model_name:
-        return _query_claude(query, model_name, api_key)
+        return _query_claude(query, model_name, api_key, system, max_tokens, stop)
     elif "gpt" in model_name:
-        return _query_openai(query, model_name, api_key)
+        return _query_openai(query, model_name, api_key, system, max_tokens, stop)
     else:
-        return _query_ollama(query, model_name)
+        return _query_ollama(query, model_name, system, max_tokens, stop)
 
-def calculate_subagent_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+def calculate_subagent_cost(model: str, input_tokens: int, output_tokens: int,
+                            cache_creation_tokens: int = 0, cache_read_tokens: int = 0) -> float:
     """
     Calculate API call cost based on token usage and model pricing.
     
     Args:
         model: Model identifier from MODEL_PRICING
-        input_tokens: Number of input tokens used
+        input_tokens: Number of uncached input tokens used
         output_tokens: Number of output tokens generated
+        cache_creation_tokens: Number of input tokens written to the prompt cache
+        cache_read_tokens: Number of input tokens read from the prompt cache
     
     Returns:
         Total cost in USD
     """
-    input_cost = (input_tokens / 1_000_000) * MODEL_PRICING[model]["input_cost_per_mtok"]
+    input_price = MODEL_PRICING[model]["input_cost_per_mtok"]
+    provider = "claude" if "claude" in MODEL_NAMES.get(model, model) else "gpt"
+    multipliers = CACHE_PRICING[provider]
+    input_cost = (input_tokens / 1_000_000) * input_price
+    input_cost += (cache_creation_tokens / 1_000_000) * input_price * multipliers["cache_write_multiplier"]
+    input_cost += (cache_read_tokens / 1_000_000) * input_price * multipliers["cache_read_multiplier"]
     output_cost = (output_tokens / 1_000_000) * MODEL_PRICING[model]["output_cost_per_mtok"]
     return input_cost + output_cost
 
+_TAG_RE = re.compile(r'<([A-Za-z_][\w-]*)>(.*?)</\1>', re.DOTALL)
+_tag_patterns = {}
+
+def _find_tag(text: str, tag: str):
+    pattern = _tag_patterns.get(tag)
+    if pattern is None:
+        pattern = _tag_patterns[tag] = re.compile(f'<{re.escape(tag)}>(.*?)</{re.escape(tag)}>', re.DOTALL)
+    match = pattern.search(text or "")
+    return match.group(1) if match else None
+
 def search_for_tag(answer: dict, tag: str) -> str:
     """
     Extract content between XML-style tags from LLM response.
@@ -155,12 +329,167 @@ def search_for_tag(answer: dict, tag: str) -> str:
     Returns:
         Content between tags or None if not found
     """
-    regex = f'<{tag}>(.*?)</{tag}>'
-    match = re.search(regex, answer["response"], re.DOTALL)
-    if match:
-        return match.group(1)
-    print(f"============= ALERT : no tag {tag} found. Return None. Text:\n{answer["response"]}")
-    return None
+    value = _find_tag(answer["response"], tag)
+    if value is None:
+        print(f"============= ALERT : no tag {tag} found. Return None. Text:\n{answer['response']}")
+    return value
+
+def parse_tags(text: str) -> dict:
+    """
+    Extract every top-level <tag>...</tag> block of a response in a single pass.
+
+    Returns:
+        dict: tag name -> content of its first occurrence
+    """
+    tags = {}
+    for match in _TAG_RE.finditer(text or ""):
+        tags.setdefault(match.group(1), match.group(2))
+    return tags
+
+def search_for_tags(answer: dict, *tags: str) -> dict:
+    """
+    Extract several tags from an LLM response, parsing it once.
+
+    Args:
+        answer: Dict containing LLM response
+        tags: Tag names to search for (without < >)
+
+    Returns:
+        dict: tag -> content, None for tags not found
+    """
+    parsed = parse_tags(answer["response"])
+    result = {}
+    for tag in tags:
+        # tags nested in another block are not top-level, look for them directly
+        value = parsed[tag] if tag in parsed else _find_tag(answer["response"], tag)
+        if value is None:
+            print(f"============= ALERT : no tag {tag} found. Return None. Text:\n{answer['response']}")
+        result[tag] = value
+    return result
+
+def normalize_answer(value: str) -> str:
+    """Lowercase an answer and strip the whitespace, brackets and quotes around it"""
+    return (value or "").strip().strip('[]"\'.').strip().lower()
+
+def expect_tag(tag: str, choices=None, check=None):
+    """
+    Build a response validator for ModelRouter.route.
+
+    Args:
+        tag: Tag that must be present in the response
+        choices: Accepted answers (compared with normalize_answer); any other
+                 answer, e.g. "unsure", is a low confidence signal
+        check: Optional callable(value) -> bool for free-form answers
+
+    Returns:
+        Callable(response) -> bool
+    """
+    def validate(response: dict) -> bool:
+        value = _find_tag(response["response"], tag)
+        if value is None:
+            return False
+        if choices is not None and normalize_answer(value) not in choices:
+            return False
+        return check(value) if check else True
+    return validate
+
+def expect_tags(*tags):
+    """Build a validator requiring every given tag to be present"""
+    def validate(response: dict) -> bool:
+        parsed = parse_tags(response["response"])
+        return all(tag in parsed or _find_tag(response["response"], tag) is not None for tag in tags)
+    return validate
+
+# Models tried by the router, cheapest first
+MODEL_CASCADE = ("gpt-4o-mini", "haiku", "sonnet")
+
+# Index in the cascade of the first model meeting a quality requirement
+QUALITY_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+class ModelRouter:
+    """
+    Confidence based model cascade.
+
+    A task declares its quality requirement ("low", "medium" or "high"); the
+    router asks the cheapest model meeting it, and escalates to the next model
+    of the cascade only when the response fails validation (missing tag,
+    unexpected or "unsure" answer). Per-task stats record which model answered
+    and how many escalations were needed.
+
+    Args:
+        cascade: Models from cheapest to strongest (keys of MODEL_NAMES)
+        metrics: Optional MetricsRegistry receiving the routing counters
+        budget: Optional BudgetGovernor; no escalation happens while the
+                budget of the task is tight
+    """
+    def __init__(self, cascade=MODEL_CASCADE, metrics=None, budget=None):
+        self.cascade = tuple(cascade)
+        self.metrics = metrics
+        self.budget = budget
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def models_for(self, quality: str) -> tuple:
+        """Return the models to try, in order, for a quality requirement"""
+        if quality not in QUALITY_LEVELS:
+            raise ValueError(f"Unsupported quality: {quality}")
+        return self.cascade[min(QUALITY_LEVELS[quality], len(self.cascade) - 1):]
+
+    def record(self, task: str, model: str, escalations: int, accepted: bool = True):
+        """
+        Record the outcome of a routed task.
+
+        Args:
+            task: Task name
+            model: Model whose answer was kept
+            escalations: Number of models that were asked before it
+            accepted: Whether the kept answer passed validation
+        """
+        with self.lock:
+            stats = self.stats.setdefault(task, {"calls": 0, "escalations": 0, "rejected": 0, "answered_by": {}})
+            stats["calls"] += 1
+            stats["escalations"] += escalations
+            stats["rejected"] += 0 if accepted else 1
+            stats["answered_by"][model] = stats["answered_by"].get(model, 0) + 1
+        if self.metrics is not None:
+            self.metrics.incr("llm_routed_total", task=task, model=model)
+            if escalations:
+                self.metrics.incr("llm_escalations_total", escalations, task=task)
+
+    def route(self, call, task: str, quality: str = "low", validate=None) -> dict:
+        """
+        Run a task through the cascade.
+
+        Args:
+            call: Callable(model) -> response dict (as returned by query_llm)
+            task: Task name used for the stats
+            quality: Quality requirement of the task
+            validate: Callable(response) -> bool; a False result escalates
+
+        Returns:
+            dict: Response of the first model whose answer passed validation (or
+            of the strongest model), with the model under the "model" key
+        """
+        models = self.models_for(quality)
+        if self.budget is not None and self.budget.tight(task):
+            models = models[:1]
+        for i, model in enumerate(models):
+            response = call(model)
+            accepted = validate is None or validate(response)
+            if accepted or i == len(models) - 1:
+                # the caller may have answered with another model (budget degradation)
+                model = response.get("model", model)
+                self.record(task, model, i, accepted)
+                return dict(response, model=model)
+
+    def summary(self) -> str:
+        """Return a short human readable per-task summary"""
+        lines = [f"{'task':<16}{'calls':>8}{'escalations':>13}{'rejected':>10}  answered by"]
+        with self.lock:
+            for task, stats in sorted(self.stats.items()):
+                answered = ", ".join(f"{model}: {n}" for model, n in sorted(stats["answered_by"].items()))
+                lines.append(f"{task:<16}{stats['calls']:>8}{stats['escalations']:>13}{stats['rejected']:>10}  {answered}")
+        return "\n".join(lines)
 
 def prompt_formatter(prompt_to_format: str) -> str:
     """
@@ -1,18 +1,41 @@
-#from concurrent.futures import ThreadPoolExecutor
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 import json
-from llm import query_llm, search_for_tag
+from llm import query_llm, search_for_tag, search_for_tags, ModelRouter, expect_tag, expect_tags, normalize_answer, GENERATION_LIMITS
 from serper_tool import search_serper
 from prompts import *
-from scraper import Scraper
+from metrics import MetricsRegistry
+from budget import BudgetGovernor, BudgetExceeded
+from latex import LatexBuilder
+from latex_renderer import render_cover_letter, render_resume
+from summary_cache import SummaryStepCache, title_cluster, profile_hash
+from priority import PriorityQueue, make_policy, DESCRIPTION_PREFIX
+from archive import open_archive
+from text_codec import TextCodec, TRAINING_SAMPLES
+from invalidation import stage_hash
+from structured_data import extract_job_posting, page_job_postings
+from ats import default_connectors, find_board
 from dotenv import load_dotenv
 import os
 import sqlite3
-from urllib.parse import urlparse
-import datetime
-import numpy as np
+import threading
+import hashlib
+from urllib.parse import urlparse, urldefrag, parse_qsl, urlencode
 import datetime
 
+# Models voting on the relevance of a job: the cheap round, then the strong
+# round when the cheap votes disagree or an answer is invalid
+RELEVANCE_VOTERS = (("gpt-4o-mini",) * 3, ("sonnet",) * 3)
+
+# Query parameters that do not change the target of a link (besides utm_*)
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "trk", "tracking"}
+
+# Jobs whose derived value of a stage was computed from other inputs than the
+# current ones (? is the current stage hash)
+STALE_CONDITIONS = {
+    "relevance": "title != 'No title' AND (relevance_hash IS NULL OR relevance_hash != ?)",
+    "score": "is_relevant = 1 AND (score_hash IS NULL OR score_hash != ?)",
+}
+
 class JobSearchAssistant:
     """
     Job Search Assistant Module
@@ -39,6 +62,18 @@ class JobSearchAssistant:
     Database Schema:
     - jobs: Stores job postings and analysis
     - known_links: Tracks processed URLs to avoid duplicates
+    - listing_pages: Fingerprint, links and next page of each crawled listing page,
+      so that a recrawl skips unchanged listings and only scans new links
+
+    is_relevant and score are stored with the hash of the prompts, models and
+    profile inputs that produced them (see invalidation.py), and refresh()
+    recomputes the stale ones only.
+
+    Job descriptions are stored compressed (see text_codec.py) and decompressed
+    by the accessors (get_job, get_job_description, iter_jobs_to_score).
+
+    Fetched pages are kept in a compressed raw page archive (see archive.py),
+    from which reprocess() re-runs extraction, relevance and scoring offline.
 
     Args:
         user_context_file (str): Path to JSON file containing user profile/experience
@@ -49,8 +84,27 @@ class JobSearchAssistant:
         output_dir (str): Directory for generated documents
         query_limit (int): Maximum search results per query
         date (str): Filter date in YYYY/MM/DD format
+        latex_mode (str): How LaTeX documents are produced: "render" fills the templates
+                          locally, "llm" asks the LLM to fill them
+        summary_mode (str): How the professional summary is written: "chain" runs one LLM
+                            call per step, "single" writes every step in one structured call
+        budget (BudgetGovernor|dict): Cost and token ceilings of the run, as a governor or
+                                      as BudgetGovernor keyword arguments (default: unlimited)
+        priority_policy (str|PriorityPolicy): Order in which job pages are processed and jobs
+                                              scored: "heuristic" (most promising first) or "fifo"
+        archive_dir (str): Directory of the raw page archive (None: fetched pages are not kept)
+        description_compression (str): Compression of stored descriptions: "zlib", "zstd"
+                                       (needs the zstandard package) or None
+        profile (str): Name of the profile in multi-profile mode (see profiles.py), keys the
+                       profile's settings in the shared database
+        evaluate_relevance (bool): Vote on the relevance of job pages when storing them (False
+                                   stores them unevaluated, for profiles.MultiProfileAssistant)
+        ats_connectors (list): ats.ATSConnector instances reading job boards through their JSON
+                               API (default: Greenhouse, Lever, Ashby and Workable; [] disables)
+        skip_unchanged_listings (bool): Skip the listing pages whose links did not change since
+                                        the previous crawl (False scans every listing again)
     """
-    def __init__(self, user_context_file, user_want_file, verbose=False, max_workers = None, skip_domains=[], output_dir = "./output_dir", query_limit = 5, date=''):
+    def __init__(self, user_context_file, user_want_file, verbose=False, max_workers = None, skip_domains=[], output_dir = "./output_dir", query_limit = 5, date='', latex_mode="render", summary_mode="chain", budget=None, priority_policy="heuristic", archive_dir="archive", description_compression="zlib", profile=None, evaluate_relevance=True, ats_connectors=None, skip_unchanged_listings=True):
         self.conn = sqlite3.connect('jobs.db')
         self.c = self.conn.cursor()
         self.c.execute('''CREATE TABLE IF NOT EXISTS jobs (
@@ -73,19 +127,41 @@ class JobSearchAssistant:
                         is_job_page INTEGER,
                         date TEXT
                     )''')
+        self.c.execute('''CREATE TABLE IF NOT EXISTS listing_pages (
+                        url TEXT PRIMARY KEY,
+                        fingerprint TEXT NOT NULL,
+                        links TEXT NOT NULL,
+                        next_page TEXT,
+                        date TEXT
+                    )''')
+        self.c.execute('''CREATE TABLE IF NOT EXISTS settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT
+                    )''')
+        known_links_columns = [row[1] for row in self.c.execute("PRAGMA table_info(known_links)")]
+        if "label" not in known_links_columns:
+            self.c.execute("ALTER TABLE known_links ADD COLUMN label TEXT")
+        jobs_columns = [row[1] for row in self.c.execute("PRAGMA table_info(jobs)")]
+        for column in ("relevance_hash", "score_hash"):
+            if column not in jobs_columns:
+                self.c.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
         self.conn.commit()
         load_dotenv()
-        scrape_api_key = os.getenv('SCRAPEOPS_API_KEY')
+        self.scrape_api_key = os.getenv('SCRAPEOPS_API_KEY')
         with open(user_context_file, "r", encoding="utf-8") as file:
             self.user_context = json.load(file)
         with open(user_want_file, "r", encoding="utf-8") as file:
             self.user_want = file.read()
         self.job_search_plan = []
         self.initial_links = []
-        self.scraper = Scraper(scrape_api_key)
         self.MAX_WORKERS = max_workers or os.cpu_count() / 2
         self.jobs_descriptions = set()
-        self.domain_of_interest = ""
+        self.profile = profile
+        self.evaluate_relevance = evaluate_relevance
+        self.ats_connectors = default_connectors() if ats_connectors is None else ats_connectors
+        self.ats_boards_seen = set()
+        self.skip_unchanged_listings = skip_unchanged_listings
+        self.domain_of_interest = self.get_setting(self._domain_setting, "")
         self.verbose = verbose
         self.skip_domains = skip_domains
         self.output_dir = output_dir
@@ -95,25 +171,120 @@ class JobSearchAssistant:
         assert len(date) == 10 and date.count('/') == 2
         self.date = date
         self.cost = 0
+        self.cost_lock = threading.Lock()
+        self.metrics = MetricsRegistry()
+        self._scraper = None
+        self._scraper_lock = threading.Lock()
+        if isinstance(budget, dict):
+            budget = BudgetGovernor(metrics=self.metrics, **budget)
+        self.budget = budget
+        self.router = ModelRouter(metrics=self.metrics, budget=self.budget)
+        self.run_state_path = "run_state.json"
+        self.next_initial_link = 0
+        self.latex = LatexBuilder()
+        assert latex_mode in ("render", "llm")
+        self.latex_mode = latex_mode
+        assert summary_mode in ("chain", "single")
+        self.summary_mode = summary_mode
+        self.summary_cache = SummaryStepCache('jobs.db')
+        self.profile_hash = profile_hash(self.user_context)
+        self.priority = make_policy(priority_policy, self.user_context, self.user_want)
+        self.archive_dir = archive_dir
+        self.codec = TextCodec('jobs.db', method=description_compression)
+
+    @property
+    def archive(self):
+        """Raw page archive shared by the assistants of the process, None if disabled"""
+        return open_archive(self.archive_dir) if self.archive_dir else None
+
+    @property
+    def scraper(self):
+        """Scraper, created on first use so that document generation does not load the HTTP stack"""
+        with self._scraper_lock:
+            if self._scraper is None:
+                from scraper import Scraper
+                self._scraper = Scraper(self.scrape_api_key, metrics=self.metrics, archive=self.archive)
+            return self._scraper
 
     def get_cost(self):
         """Return the total cost of LLM API calls made during execution."""
         return self.cost
 
-    def query_llm(self, prompt, model="gpt-4o-mini"):
+    def export_metrics(self, path_prefix="metrics"):
+        """
+        Write the run metrics to <path_prefix>.json and <path_prefix>.prom.
+
+        Args:
+            path_prefix: Output path without extension
+        """
+        self.metrics.export(path_prefix)
+        print(self.metrics.summary())
+        print(self.router.summary())
+        if self.budget is not None:
+            print(self.budget.summary())
+
+    def query_llm(self, prompt, model="gpt-4o-mini", system=None, stage="other", max_tokens=None, stop=None):
         """
-        Query the LLM with given prompt and model, tracking costs.
+        Query the LLM with given prompt and model, tracking costs and metrics.
         
         Args:
             prompt: The prompt to send to the LLM
             model: The model to use (default: gpt-4o-mini)
+            system: Optional static prefix shared across calls (cached by the provider)
+            stage: Pipeline stage issuing the call, used to aggregate metrics
+            max_tokens: Max output tokens (see llm.GENERATION_LIMITS)
+            stop: Stop sequences (see llm.GENERATION_LIMITS)
             
         Returns:
-            dict: The LLM response containing the generated text and metadata
+            dict: The LLM response containing the generated text and metadata, with the
+                  model that answered under "model" (cheaper than asked when the budget is tight)
+
+        Raises:
+            BudgetExceeded: The call would cross a ceiling of the run budget
+        """
+        reservation = response = None
+        if self.budget is not None:
+            model = self.budget.degrade(stage, model)
+            reservation = self.budget.reserve(stage, model, len(prompt) + len(system or ""), max_tokens)
+        try:
+            with self.metrics.time_call(stage, model) as call:
+                response = query_llm(prompt, model, system=system, max_tokens=max_tokens, stop=stop)
+                call["response"] = response
+        finally:
+            if reservation is not None:
+                self.budget.settle(reservation, response)
+        with self.cost_lock:
+            self.cost += response["cost"]
+        return dict(response, model=model)
+
+    def route_llm(self, prompt, task, quality="low", validate=None, system=None):
+        """
+        Query the cheapest model meeting the quality requirement of a task,
+        escalating to stronger models when the answer fails validation. The
+        task's generation limits (llm.GENERATION_LIMITS) are applied.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            task: Task name, used as metrics stage and for the routing stats
+            quality: "low", "medium" or "high" (see llm.QUALITY_LEVELS)
+            validate: Callable(response) -> bool, see llm.expect_tag
+            system: Optional static prefix shared across calls
+
+        Returns:
+            dict: The accepted LLM response, with the answering model under "model"
         """
-        response = query_llm(prompt, model)
-        self.cost += response["cost"]
-        return response
+        limits = GENERATION_LIMITS.get(task, {})
+        return self.router.route(lambda model: self.query_llm(prompt, model, system=system, stage=task, **limits),
+                                 task, quality, validate)
+
+    def candidate_system_prompt(self):
+        """
+        Build the static system prompt holding the user profile.
+
+        It is identical for every document generation call of a run, so the
+        provider can serve it from its prompt cache.
+        """
+        return CANDIDATE_PROFILE_SYSTEM_PROMPT.replace("{{user_info}}", json.dumps(self.user_context))
 
     def verbose_print(self, msg):
         """
@@ -158,6 +329,8 @@ class JobSearchAssistant:
         is_valid = job_details.get('is_valid')
         documents_path = job_details.get('documents_path')
         score = job_details.get('score')
+        relevance_hash = job_details.get('relevance_hash')
+        score_hash = job_details.get('score_hash')
         datenow = datetime.datetime.now().strftime("%Y/%m/%d %H:%M")
 
         if not url or not title or not description:
@@ -166,9 +339,9 @@ class JobSearchAssistant:
         if self.url_exists_jobs(url):
             print(f"The URL '{url}' already exists in the database.")
             return
-        self.c.execute('''INSERT INTO jobs (is_relevant, url, title, description, score, is_valid, documents_path, location, salary, company, date) 
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                            (is_relevant, url, title, description, score, is_valid, documents_path, location, salary, company, datenow))
+        self.c.execute('''INSERT INTO jobs (is_relevant, url, title, description, score, is_valid, documents_path, location, salary, company, date, relevance_hash, score_hash) 
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                            (is_relevant, url, title, self.codec.encode(description), score, is_valid, documents_path, location, salary, company, datenow, relevance_hash, score_hash))
         self.conn.commit()
         print("Job added to the database.")
 
@@ -180,11 +353,12 @@ class JobSearchAssistant:
             id: The job posting ID
             score: The new score value
         """
-        if not self.url_exists_jobs(id):
+        self.c.execute("SELECT COUNT(*) FROM jobs WHERE id = ?", (id,))
+        if self.c.fetchone()[0] == 0:
             print(f"The id '{id}' does not exist in the database.")
             return
 
-        self.c.execute('''UPDATE jobs SET score = ? WHERE id = ?''', (score, id))
+        self.c.execute('''UPDATE jobs SET score = ?, score_hash = ? WHERE id = ?''', (score, self.stage_hash("score"), id))
         self.conn.commit()
         print(f"Score for id '{id}' updated to {score}.")
 
@@ -200,6 +374,8 @@ class JobSearchAssistant:
             print(f"The URL '{url}' does not exist in the database.")
             return
 
+        if "description" in kwargs:
+            kwargs["description"] = self.codec.encode(kwargs["description"])
         set_values = ', '.join([f"{key} = ?" for key in kwargs.keys()])
         values = tuple(kwargs.values())
         
@@ -207,6 +383,34 @@ class JobSearchAssistant:
         self.c.execute(query, (*values, url))
         self.conn.commit()
 
+    def get_job_id(self, url):
+        """
+        Get the database ID of a job posting from its URL.
+
+        Args:
+            url: The job posting URL
+
+        Returns:
+            int|None: Job ID, None if the URL is not in the jobs table
+        """
+        self.c.execute("SELECT id FROM jobs WHERE url = ?", (url,))
+        row = self.c.fetchone()
+        return row[0] if row else None
+
+    @property
+    def _domain_setting(self):
+        return f"domain_of_interest:{self.profile}" if self.profile else "domain_of_interest"
+
+    def get_setting(self, key, default=None):
+        """Return a value of the settings table, default if unset"""
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_setting(self, key, value):
+        """Store a value in the settings table (kept across runs)"""
+        self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+        self.conn.commit()
+
     def url_exists_knowns_links(self, url):
         """
         Check if a URL exists in the known_links table.
@@ -238,20 +442,51 @@ class JobSearchAssistant:
         else:
             return None
 
-    def add_known_link(self, url, is_job_page):
+    def add_known_link(self, url, is_job_page, label=None):
         """
         Add a new URL to the known_links table.
         
         Args:
             url: The URL to add
             is_job_page: Boolean indicating if URL is a job posting
+            label: Text of the anchor pointing to the URL, if any
         """
         current_datetime = datetime.datetime.now().strftime("%Y/%m/%d %H:%M")
-        self.c.execute('''INSERT INTO known_links (url, is_job_page, date) VALUES (?, ?, ?)''', (url, is_job_page, current_datetime))
+        self.c.execute('''INSERT INTO known_links (url, is_job_page, date, label) VALUES (?, ?, ?, ?)''', (url, is_job_page, current_datetime, label))
         self.conn.commit()
         print("Link added to the database.")
 
 
+    def iter_rows(self, table, columns, where="1", params=(), chunk_size=500):
+        """
+        Iterate over the rows of a table, newest first, in bounded chunks.
+
+        Keyset pagination on the integer primary key: each chunk is a separate
+        query starting below the last id seen, so memory stays flat whatever
+        the table size, and the shared cursor is free between chunks.
+
+        Args:
+            table: Table name
+            columns: Columns to select; "id" is always included
+            where: SQL condition with ? placeholders
+            params: Values of the placeholders
+            chunk_size: Rows fetched per query
+
+        Yields:
+            dict: Column name -> value
+        """
+        columns = ["id"] + [c for c in columns if c != "id"]
+        query = (f"SELECT {', '.join(columns)} FROM {table} WHERE ({where}) AND id < ? "
+                 f"ORDER BY id DESC LIMIT ?")
+        last_id = float("inf")
+        while True:
+            rows = self.conn.execute(query, (*params, last_id, chunk_size)).fetchall()
+            for row in rows:
+                yield dict(zip(columns, row))
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
     def get_jobs_descriptions(self, date):
         """
         Get all job posting URLs from known_links after given date.
@@ -262,24 +497,116 @@ class JobSearchAssistant:
         Returns:
             list: URLs of job postings
         """
-        self.c.execute(f"SELECT url FROM known_links WHERE is_job_page = 1 AND date >= '{date}'")
-        rows = self.c.fetchall()
-        lst = [row[0] for row in rows]
-        lst.reverse()
-        return lst
+        return [row["url"] for row in self.iter_job_candidates(date)]
+
+    def iter_job_candidates(self, date):
+        """
+        Iterate over the job posting links found after given date, with what is known about them.
+
+        Args:
+            date: Date string in YYYY/MM/DD format
+
+        Yields:
+            dict: id, url, title (anchor text) and date, newest first
+        """
+        for row in self.iter_rows("known_links", ("url", "label", "date"), "is_job_page = 1 AND date >= ?", (date,)):
+            yield {"id": row["id"], "url": row["url"], "title": row["label"], "date": row["date"]}
+
+    def get_domain_yield(self):
+        """
+        Share of relevant jobs per domain among the stored jobs (Laplace smoothed).
+
+        Returns:
+            dict: domain -> share in ]0, 1[
+        """
+        counts = {}
+        for row in self.iter_rows("jobs", ("url", "is_relevant")):
+            domain = urlparse(row["url"]).netloc
+            relevant, total = counts.get(domain, (0, 0))
+            counts[domain] = (relevant + (1 if row["is_relevant"] else 0), total + 1)
+        return {domain: (relevant + 1) / (total + 2) for domain, (relevant, total) in counts.items()}
+
+    def _prioritized(self, items, keep):
+        """
+        Queue items with the priority policy, refreshed with the current domain yields.
+        Only the keys in keep are queued, the rest of each item is dropped once ranked.
+        """
+        self.priority.refresh(self.get_domain_yield())
+        queue = PriorityQueue(self.priority)
+        for item in items:
+            queue.push({key: item[key] for key in keep}, self.priority.priority(item))
+        return queue
+
+    def iter_jobs_to_score(self, rescore=True, columns=("url", "title", "description", "date"), description_limit=None):
+        """
+        Iterate over the relevant jobs that need scoring, newest first.
+        
+        Args:
+            rescore: Include jobs that already have a score
+            columns: Columns to select ("id" is always included)
+            description_limit: Only decompress the first characters of the descriptions
+
+        Yields:
+            dict: Column name -> value
+        """
+        where = "is_relevant = 1" if rescore else "is_relevant = 1 AND score IS NULL"
+        for row in self.iter_rows("jobs", columns, where):
+            if "description" in row:
+                row["description"] = self.codec.decode(row["description"], description_limit)
+            yield row
 
-    def get_jobs_to_score(self):
+    def get_jobs_to_score(self, rescore=True):
         """
         Get all relevant jobs that need scoring.
         
+        Args:
+            rescore: Include jobs that already have a score
+
         Returns:
-            list: Tuples of (url, description) for relevant jobs
+            list: Dicts with id, url, title, description and date of relevant jobs
         """
-        self.c.execute("SELECT url, description FROM jobs WHERE is_relevant = 1")
-        rows = self.c.fetchall()
-        lst = [(row[0], row[1]) for row in rows]
-        lst.reverse()
-        return lst
+        return list(self.iter_jobs_to_score(rescore))
+
+    def get_job_description(self, id: int, limit: int = None):
+        """Return the description of a job (its first limit characters if given), None if the id is unknown"""
+        row = self.conn.execute("SELECT description FROM jobs WHERE id = ?", (id,)).fetchone()
+        return self.codec.decode(row[0], limit) if row else None
+
+    def compress_descriptions(self, train=True, vacuum=True):
+        """
+        Migrate the stored descriptions to the current compression setting.
+
+        Rows are re-encoded in chunks: plain text rows are compressed, and rows
+        compressed with another method or dictionary are re-compressed (with
+        description_compression=None, every row is stored back as plain text).
+
+        Args:
+            train: First train a dictionary on a sample of the stored descriptions
+            vacuum: Rebuild the database file afterwards so that the freed pages are returned
+
+        Returns:
+            dict: Number of rows rewritten, description bytes before and after
+        """
+        size_query = "SELECT COALESCE(SUM(LENGTH(CAST(description AS BLOB))), 0) FROM jobs"
+        before = self.conn.execute(size_query).fetchone()[0]
+        if train and self.codec.method is not None:
+            samples = [self.codec.decode(row["description"]) for row, _ in
+                       zip(self.iter_rows("jobs", ("description",)), range(TRAINING_SAMPLES))]
+            self.codec.train(samples)
+        rows = 0
+        for row in self.iter_rows("jobs", ("description",)):
+            value = self.codec.encode(self.codec.decode(row["description"]))
+            if value != row["description"]:
+                self.conn.execute("UPDATE jobs SET description = ? WHERE id = ?", (value, row["id"]))
+                rows += 1
+                if rows % 500 == 0:
+                    self.conn.commit()
+        self.conn.commit()
+        if vacuum:
+            self.conn.execute("VACUUM")
+        after = self.conn.execute(size_query).fetchone()[0]
+        print(f"{rows} descriptions rewritten, {before} -> {after} bytes")
+        return {"rows": rows, "bytes_before": before, "bytes_after": after}
 
     # Create an agent that plans on what and where (which website) to search, given the user's context
     def plan_job_search(self):
@@ -295,9 +622,10 @@ class JobSearchAssistant:
             list: Search queries to use for job hunting
         """
         prompt = PLAN_JOB_SEARCH_PROMPT.replace("{{user_context}}", json.dumps(self.user_context))
-        response = self.query_llm(prompt, model="gpt-4o-mini")
+        response = self.route_llm(prompt, "plan", validate=expect_tags("query_list", "domain_of_interest"))
         self.verbose_print(f"plan job search response : {response}")
         self.domain_of_interest = search_for_tag(response, "domain_of_interest")
+        self.set_setting(self._domain_setting, self.domain_of_interest)
         res = search_for_tag(response, "query_list").replace('\n', '')
         query_list = []
         if res:
@@ -318,24 +646,43 @@ class JobSearchAssistant:
         Returns:
             str|None: URL of next page if found, None otherwise
         """
+        return self._find_next_page(url)[0]
+
+    def _find_next_page(self, url: str) -> tuple:
+        """
+        Find the "next page" link on a job listing page.
+
+        Returns:
+            tuple: (URL of next page or None, whether the answer is conclusive:
+                   False when pagination was skipped on the budget or the
+                   answer failed validation)
+        """
+        if self.budget is not None and self.budget.skip("next_page"):
+            self.verbose_print("budget is tight, skipping pagination")
+            return None, False
         prompt = NEXT_PAGE_FINDER_PROMPT
         prompt_copy = prompt.replace("{{URL}}", url)
         self.verbose_print(f"url scanned: {url}")
-        response = self.query_llm(prompt_copy, "sonnet")
+        validate = expect_tag(
+            "result", check=lambda value: value.strip().startswith("http") or "no \"next page\" link" in value.lower())
+        response = self.route_llm(prompt_copy, "next_page", validate=validate)
         self.verbose_print(response["response"])
-        res = search_for_tag(response, "result").strip()
-        if res == 'No "next page" link found on this page.' or res == url:
+        res = (search_for_tag(response, "result") or "").strip()
+        if not res.startswith("http") or res == url:
             res = None
-        return res
+        return res, validate(response)
 
-    def is_url_job_description(self, url:str) -> bool:
+    def is_url_job_description(self, url:str, content=None) -> bool:
         """
         Determine if a URL points to a job description page.
         
-        Checks database first, then uses LLM to analyze if not found.
+        Checks database first, then the page's structured data, then uses LLM
+        to analyze if not found.
         
         Args:
             url: URL to analyze
+            content: The page, if already fetched; a page holding exactly one
+                     schema.org JobPosting is a job description page
             
         Returns:
             bool: True if URL is a job description page
@@ -345,14 +692,19 @@ class JobSearchAssistant:
             val = self.get_is_job_page(url)
             self.verbose_print(f"value : {val}")
             return val
+        elif content and len(page_job_postings(content)) == 1:
+            self.verbose_print(f"JobPosting structured data found, adding url in db : {url}")
+            self.metrics.incr("structured_job_pages_total")
+            self.add_known_link(url, True)
+            return True
         else:
             self.verbose_print(f"url is not in db. analysing : {url}")
             prompt = IS_URL_JOB_DESCRIPTION_PROMPT
             prompt_copy = prompt.replace("{{URL}}", url)
-            response = self.query_llm(prompt_copy, "haiku")
+            response = self.route_llm(prompt_copy, "is_job_page",
+                                      validate=expect_tag("answer", ("job description", "job listing")))
             self.verbose_print(response["response"])
-            res = search_for_tag(response, "answer").replace("\n", "")
-            is_job_page = "Job Description" in res
+            is_job_page = normalize_answer(search_for_tag(response, "answer")) == "job description"
             self.verbose_print(f"adding url in db : {is_job_page}, {url}")
             self.add_known_link(url, is_job_page)
             return is_job_page
@@ -389,7 +741,19 @@ class JobSearchAssistant:
             link = url_src.split(domain)[0] + domain + link
         return link
 
-    def get_links(self, content:str, url_src: str):
+    def get_anchors(self, content, url_src: str):
+        """
+        Parse the links of a page.
+
+        Returns:
+            list: (anchor element, absolute URL) pairs, in page order
+        """
+        from bs4 import BeautifulSoup
+
+        parsed = BeautifulSoup(content, "html.parser")
+        return [(a, self.fix_url(a.attrs['href'], url_src)) for a in parsed.find_all('a', href=True)]
+
+    def get_links(self, content:str, url_src: str, anchors=None, seen=()):
         """
         Extract job posting links from HTML content.
         
@@ -399,19 +763,21 @@ class JobSearchAssistant:
         Args:
             content: HTML content to parse
             url_src: Source URL for fixing relative links
+            anchors: Links already parsed with get_anchors (content is then not parsed again)
+            seen: Normalized URLs found on the page at the previous crawl, not scanned again
             
         Returns:
             list: URLs that were identified as job postings
         """
-        parsed = BeautifulSoup(content, "html.parser")
+        if anchors is None:
+            anchors = self.get_anchors(content, url_src)
+        lst = [(a, url_fixed) for a, url_fixed in anchors if self.normalize_link(url_fixed) not in seen]
         links = []
-        print("scanning links...")
-        lst = parsed.find_all('a', href=True)
+        print(f"scanning links... ({len(anchors) - len(lst)} already seen on this page)")
         nb = len(lst)
-        for i, a in enumerate(lst):
+        for i, (a, url_fixed) in enumerate(lst):
             print(f"scanning {i}/{nb}")
             link = a.attrs['href']
-            url_fixed = self.fix_url(link, url_src)
             if self.url_exists_knowns_links(url_fixed):
                 self.verbose_print(f"url is in db : {url_fixed}")
                 val = self.get_is_job_page(url_fixed)
@@ -424,11 +790,10 @@ class JobSearchAssistant:
                 }
                 json_string = json.dumps(element_data)
                 prompt_copy = GET_LINKS_PROMPT.replace("{{json_string}}", json_string)
-                response = self.query_llm(prompt_copy)
+                response = self.route_llm(prompt_copy, "classify_link", validate=expect_tag("answer", ("yes", "no")))
                 self.verbose_print(response["response"])
-                res = search_for_tag(response, "answer")
-                is_job_page = res == "yes"
-                self.add_known_link(url_fixed, is_job_page)
+                is_job_page = normalize_answer(search_for_tag(response, "answer")) == "yes"
+                self.add_known_link(url_fixed, is_job_page, a.get_text(" ", strip=True)[:200] or None)
                 if (is_job_page):
                     links.append(link)
                 print(f"{i}/{nb} scanned")
@@ -440,26 +805,137 @@ class JobSearchAssistant:
             self.verbose_print(f"skipping as it is part of domain {domain} which is to skip : {url}")
             return
         self.verbose_print(f"start processing {url}")
-        if self.is_url_job_description(url):
+        if self.process_ats_url(url):
+            return
+        # an unknown page is fetched first, its structured data may answer the classification
+        content = None if self.url_exists_knowns_links(url) else self.scraper.retry_with_backoff(url)
+        if self.is_url_job_description(url, content):
             self.verbose_print(f"end processing {url} : description")
             self.jobs_descriptions.add(url)
-            self.process_job_description(url)
+            self.process_job_description(url, content)
         else :
             self.verbose_print(f"end processing {url} : list")
-            content = self.scraper.retry_with_backoff(url)
-            for link in self.get_links(content, url):
-                self.jobs_descriptions.add(link)
-            self.verbose_print("searching next page")
-            next_page_url = self.next_page_finder(url)
-            self.verbose_print("got answer")
+            if content is None:
+                content = self.scraper.retry_with_backoff(url)
+            next_page_url = self.process_listing_page(url, content)
             if next_page_url:
                 self.verbose_print("next page found")
                 self.process_url(next_page_url)
 
-    def process_initial_links(self):
-        for result in self.initial_links:
+    @staticmethod
+    def normalize_link(url: str) -> str:
+        """URL without fragment, tracking parameters and trailing slash, to compare links across crawls"""
+        parsed = urlparse(urldefrag(url)[0])
+        query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                 if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS]
+        return parsed._replace(path=parsed.path.rstrip("/") or "/", query=urlencode(sorted(query))).geturl()
+
+    def get_listing_page(self, url: str):
+        """
+        Return what the previous crawl recorded for a listing page.
+
+        Returns:
+            dict|None: fingerprint, links (set of normalized URLs), next_page and date
+        """
+        self.c.execute("SELECT fingerprint, links, next_page, date FROM listing_pages WHERE url = ?", (url,))
+        row = self.c.fetchone()
+        if row is None:
+            return None
+        return {"fingerprint": row[0], "links": set(json.loads(row[1])), "next_page": row[2], "date": row[3]}
+
+    def process_listing_page(self, url: str, content) -> str:
+        """
+        Scan the links of a listing page and find its next page, reusing the previous crawl.
+
+        The fingerprint of a page is the hash of its normalized link set, the
+        pagination link included. When it did not change, the page costs no
+        LLM call: its links are not scanned, and its recorded next page is
+        only followed if that page was never crawled (listings show new
+        postings first, so the pages after an unchanged page are unchanged
+        too). When it changed, only the links that appeared are scanned, and
+        the recorded next page is reused while its link is still on the page.
+
+        A page that could not be fetched leaves its record untouched. When the
+        next page lookup is inconclusive (skipped on the budget, invalid
+        answer), the record is saved without a fingerprint: the page counts as
+        changed at the next crawl and its next page is looked up again.
+
+        Args:
+            url: URL of the listing page
+            content: The fetched page
+
+        Returns:
+            str|None: URL of the next page to crawl
+        """
+        if not content:
+            previous = self.get_listing_page(url)
+            self.verbose_print(f"listing page could not be fetched: {url}")
+            return previous["next_page"] if previous else None
+        anchors = self.get_anchors(content, url)
+        links = sorted({self.normalize_link(url_fixed) for _, url_fixed in anchors})
+        fingerprint = hashlib.sha256("\n".join(links).encode("utf-8")).hexdigest()[:16]
+        previous = self.get_listing_page(url) if self.skip_unchanged_listings else None
+        if previous is not None and previous["fingerprint"] == fingerprint:
+            self.metrics.incr("listing_pages_total", state="unchanged")
+            self.verbose_print(f"listing unchanged since {previous['date']}: {url}")
+            next_page = previous["next_page"]
+            return next_page if next_page and self.get_listing_page(next_page) is None else None
+        self.metrics.incr("listing_pages_total", state="new" if previous is None else "changed")
+        for link in self.get_links(content, url, anchors=anchors, seen=previous["links"] if previous else ()):
+            self.jobs_descriptions.add(link)
+        if previous is not None and previous["next_page"] and self.normalize_link(previous["next_page"]) in links:
+            next_page = previous["next_page"]
+        else:
+            self.verbose_print("searching next page")
+            next_page, conclusive = self._find_next_page(url)
+            self.verbose_print("got answer")
+            if not conclusive:
+                fingerprint = ""
+        self.c.execute("INSERT OR REPLACE INTO listing_pages (url, fingerprint, links, next_page, date) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       (url, fingerprint, json.dumps(links), next_page,
+                        datetime.datetime.now().strftime("%Y/%m/%d %H:%M")))
+        self.conn.commit()
+        return next_page
+
+    def process_ats_url(self, url):
+        """
+        Store every job of the board when a URL is hosted on a known applicant
+        tracking system (see ats.py), with one request to the board's JSON API.
+
+        Returns:
+            bool: True if the board was read (now or earlier in the run), False
+                  if the URL is not on a known ATS or its API gave no job
+        """
+        found = find_board(url, self.ats_connectors)
+        if found is None:
+            return False
+        connector, board = found
+        if (connector.name, board) in self.ats_boards_seen:
+            self.verbose_print(f"{connector.name} board {board} already read: {url}")
+            return True
+        jobs = connector.fetch_jobs(board, self.scraper.fetch_api)
+        print(f"{connector.name} board {board}: {len(jobs)} jobs")
+        if not jobs:
+            return False
+        self.ats_boards_seen.add((connector.name, board))
+        self.metrics.incr("ats_boards_total", ats=connector.name)
+        for job in jobs:
+            self.jobs_descriptions.add(job["url"])
+            if not self.url_exists_knowns_links(job["url"]):
+                self.add_known_link(job["url"], True, label=job["title"][:200])
+            if self.url_exists_jobs(job["url"]):
+                continue
+            self.metrics.incr("ats_jobs_total", ats=connector.name)
+            self.add_job(self._evaluate_job(job))
+        return True
+
+    def process_initial_links(self, start=0):
+        for i, result in enumerate(self.initial_links[start:], start):
+            self.next_initial_link = i
             print(f'currently {len(self.jobs_descriptions)} jobs descriptions found.')
             self.process_url(result['link'])
+        self.next_initial_link = len(self.initial_links)
 #            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
 #                futures = [executor.submit(self.process_url, result['link']) for result in self.initial_links]
 #                for future in futures:
@@ -468,13 +944,15 @@ class JobSearchAssistant:
     def format_text_to_markdown(self, text):
         prompt = MARKDOWN_FORMATTER_PROMPT
         prompt_copy = prompt.replace("{{RAW_JOB_DESCRIPTION}}", text)
-        response = self.query_llm(prompt_copy, "haiku")
+        response = self.route_llm(prompt_copy, "format", quality="medium", validate=expect_tags(
+            "formatted_job_description", "job_title", "salary", "location", "company"))
         self.verbose_print(response["response"])
-        desc = search_for_tag(response, "formatted_job_description")
-        title = search_for_tag(response, "job_title")
-        salary = search_for_tag(response, "salary")
-        location = search_for_tag(response, "location")
-        company = search_for_tag(response, "company")
+        tags = search_for_tags(response, "formatted_job_description", "job_title", "salary", "location", "company")
+        desc = tags["formatted_job_description"]
+        title = tags["job_title"]
+        salary = tags["salary"]
+        location = tags["location"]
+        company = tags["company"]
         if "None" in (desc, title) :
             return None
         res = {
@@ -487,40 +965,135 @@ class JobSearchAssistant:
         return res
 
     def is_job_relevant(self, job:dict) -> bool:
-        prompt = JOB_RELEVANCE_PROMPT.replace("{{DOMAIN_OF_INTEREST}}", self.domain_of_interest)
-        prompt = prompt.replace("{{USER_WANT}}", json.dumps(self.user_want))
-        prompt = prompt.replace("{{USER_CONTEXT}}", json.dumps(self.user_context))
-        prompt = prompt.replace("{{JOB_DESCRIPTION}}", job["description"])
-        # vote to determine if job is relevant
+        system = JOB_RELEVANCE_SYSTEM_PROMPT.replace("{{DOMAIN_OF_INTEREST}}", self.domain_of_interest)
+        system = system.replace("{{USER_WANT}}", json.dumps(self.user_want))
+        system = system.replace("{{USER_CONTEXT}}", json.dumps(self.user_context))
+        prompt = JOB_RELEVANCE_PROMPT.replace("{{JOB_DESCRIPTION}}", job["description"])
+        # vote to determine if job is relevant: cheap votes first, the strong
+        # model only votes when they disagree or an answer is invalid
         all_res = []
-        models = ["sonnet", "sonnet", "sonnet", "gpt-4o-mini", "gpt-4o-mini", "gpt-4o-mini"]
-        for model in models:
-            response = self.query_llm(prompt, model=model)
-            self.verbose_print(response["response"])
-            res = search_for_tag(response, "answer")
-            all_res.append(1 if res == "relevant" else 0)
-        mean = np.mean(all_res)
+        valid = expect_tag("answer", ("relevant", "not relevant"))
+        escalated = False
+        for models in RELEVANCE_VOTERS:
+            for model in models:
+                response = self.query_llm(prompt, model=model, system=system, stage="relevance",
+                                          **GENERATION_LIMITS["relevance"])
+                self.verbose_print(response["response"])
+                escalated = escalated or not valid(response)
+                all_res.append(1 if normalize_answer(search_for_tag(response, "answer")) == "relevant" else 0)
+            if not escalated and len(set(all_res)) == 1:
+                break
+            escalated = True
+        self.router.record("relevance", models[0], 1 if escalated else 0)
+        mean = sum(all_res) / len(all_res)
         self.verbose_print(f"VOTE : mean: {mean}, lst: {all_res}")
-        return mean >= 0.5
+        return bool(mean >= 0.5)
         
 
     def score_description(self, desc):
-        prompt = JOB_SCORE_PROMPT.replace("{{DOMAIN_OF_COMPETENCE}}", self.domain_of_interest)
-        prompt = prompt.replace("{{USER_CONTEXT}}", json.dumps(self.user_context))
-        prompt = prompt.replace("{{JOB_DESCRIPTION}}", desc)
-        response = self.query_llm(prompt)
+        system = JOB_SCORE_SYSTEM_PROMPT.replace("{{DOMAIN_OF_COMPETENCE}}", self.domain_of_interest)
+        system = system.replace("{{USER_CONTEXT}}", json.dumps(self.user_context))
+        prompt = JOB_SCORE_PROMPT.replace("{{JOB_DESCRIPTION}}", desc)
+        response = self.route_llm(prompt, "score", system=system, validate=expect_tag(
+            "answer", check=lambda value: value.strip().isdigit() and 0 <= int(value) <= 10))
         self.verbose_print(response["response"])
         res = search_for_tag(response, "answer")
         return res
 
-    def score_jobs(self):
-        jobs = self.get_jobs_to_score()
+    def stage_hash(self, stage):
+        """
+        Hash of the prompts, models and run inputs the values of a stage depend on.
+
+        Args:
+            stage: "relevance" or "score"
+
+        Returns:
+            str: Hash stored with the values computed now (see invalidation.py)
+        """
+        inputs = {
+            "DOMAIN_OF_INTEREST": self.domain_of_interest,
+            "DOMAIN_OF_COMPETENCE": self.domain_of_interest,
+            "USER_WANT": json.dumps(self.user_want),
+            "USER_CONTEXT": json.dumps(self.user_context),
+        }
+        if stage == "relevance":
+            return stage_hash([JOB_RELEVANCE_SYSTEM_PROMPT, JOB_RELEVANCE_PROMPT], RELEVANCE_VOTERS,
+                              GENERATION_LIMITS["relevance"], inputs)
+        if stage == "score":
+            return stage_hash([JOB_SCORE_SYSTEM_PROMPT, JOB_SCORE_PROMPT], self.router.models_for("low"),
+                              GENERATION_LIMITS["score"], inputs)
+        raise ValueError(f"Unsupported stage: {stage}")
+
+    def stale_jobs(self, stage):
+        """Ids of the jobs whose value of a stage was computed from other inputs than the current ones"""
+        return [row["id"] for row in self.iter_rows("jobs", (), STALE_CONDITIONS[stage], (self.stage_hash(stage),))]
+
+    def refresh(self, stages=("relevance", "score"), max_workers=None, dry_run=False):
+        """
+        Recompute the relevance and scores that are stale after a change of
+        profile, wishes, prompts or models, and only those.
+
+        Relevance is refreshed first, so that jobs becoming relevant are
+        scored in the same call. Descriptions are read in the calling thread
+        and the LLM calls run concurrently.
+
+        Args:
+            stages: Stages to refresh, among "relevance" and "score"
+            max_workers: Jobs processed at the same time (default: MAX_WORKERS)
+            dry_run: Only count the stale jobs
+
+        Returns:
+            dict: stage -> number of stale jobs found
+        """
+        counts = {}
+        workers = int(max_workers or self.MAX_WORKERS) or 1
+        for stage in stages:
+            ids = self.stale_jobs(stage)
+            counts[stage] = len(ids)
+            print(f"{len(ids)} jobs with a stale {stage}")
+            if dry_run or not ids:
+                continue
+            current = self.stage_hash(stage)
+            if stage == "relevance":
+                compute = lambda description: self.is_job_relevant({"description": description})
+            else:
+                compute = self.score_description
+            stopped = None
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for start in range(0, len(ids), workers * 4):
+                    chunk = ids[start:start + workers * 4]
+                    futures = [executor.submit(compute, self.get_job_description(id)) for id in chunk]
+                    for id, future in zip(chunk, futures):
+                        try:
+                            value = future.result()
+                        except BudgetExceeded as e:
+                            stopped = e
+                            continue
+                        if stage == "relevance":
+                            self.c.execute("UPDATE jobs SET is_relevant = ?, relevance_hash = ? WHERE id = ?",
+                                           (value, current, id))
+                            self.conn.commit()
+                        else:
+                            self.update_score(id, value)
+                    if stopped:
+                        print(f"Stopping the {stage} refresh: {stopped}. Run refresh() again to continue")
+                        return counts
+        return counts
+
+    def score_jobs(self, rescore=True):
+        # rank while streaming, only the ids are kept until each job is scored
+        jobs = self._prioritized(self.iter_jobs_to_score(rescore, description_limit=DESCRIPTION_PREFIX), keep=("id",))
         l = len(jobs)
         print(f"will process {l} jobs descriptions to score")
-        for i, (id, desc) in enumerate(jobs):
+        for i in range(l):
+            job = jobs.pop()
             self.verbose_print(f'{i}/{l}')
-            score = self.score_description(desc)
-            self.update_score(id, score)
+            try:
+                score = self.score_description(self.get_job_description(job["id"]))
+            except BudgetExceeded as e:
+                print(f"Stopping after {i}/{l} jobs: {e}. Continue with score_jobs(rescore=False)")
+                return
+            self.update_score(job["id"], score)
 #            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
 #                futures = [executor.submit(self.process_job_description, url) for url in self.jobs_descriptions]
 #                for future in futures:
@@ -529,10 +1102,12 @@ class JobSearchAssistant:
 
     def _extract_job_content(self, content):
         """Extract clean text content from HTML, removing scripts and styles"""
-        if isinstance(content, list):
-            self.verbose_print("Content is list, cannot process")
+        if isinstance(content, list) or not content:
+            self.verbose_print("No content, cannot process")
             return None
             
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(content, 'html.parser')
         for element in soup(["script", "style"]):
             element.extract()
@@ -547,14 +1122,15 @@ class JobSearchAssistant:
             "is_relevant": False
         }
 
-    def process_job_description(self, url):
+    def process_job_description(self, url, content=None):
         """
         Process a job posting URL to extract and analyze its content.
         
         Steps:
         1. Check if job already exists in database
-        2. Fetch and clean HTML content
-        3. Extract job details and format as markdown
+        2. Fetch and clean HTML content (unless already fetched)
+        3. Extract job details from the page's JobPosting structured data, or
+           format it as markdown with the LLM
         4. Determine job relevance
         5. Save to database
         """
@@ -563,37 +1139,131 @@ class JobSearchAssistant:
             return
 
         # Fetch and process content
-        content = self.scraper.retry_with_backoff(url)
-        text = self._extract_job_content(content)
-        
-        if text is None:
-            res = self._create_empty_job_result(url)
+        if content is None:
+            content = self.scraper.retry_with_backoff(url)
+        self.add_job(self._analyze_job_content(url, content))
+
+    def _analyze_job_content(self, url, content):
+        """
+        Extract, format and vote on the relevance of a fetched job page, without database access.
+        The LLM formatter is only used when the page has no complete JobPosting structured data.
+
+        Returns:
+            dict: Job details for add_job / update_job
+        """
+        structured = extract_job_posting(content) if content and not isinstance(content, list) else None
+        if structured is not None:
+            source, res = structured
+            self.metrics.incr("structured_extractions_total", source=source)
+            self.verbose_print(f"Job details read from {source} structured data: {res['title']}")
         else:
+            text = self._extract_job_content(content)
+            if text is None:
+                return self._create_empty_job_result(url)
             res = self.format_text_to_markdown(text)
             if res is None:
-                res = self._create_empty_job_result(url)
-            else:
-                res["url"] = url
-                res["is_relevant"] = self.is_job_relevant(res)
-                self.verbose_print(f'Job relevance: {res["is_relevant"]}')
-        
-        self.add_job(res)
+                return self._create_empty_job_result(url)
+        res["url"] = url
+        return self._evaluate_job(res)
+
+    def _evaluate_job(self, res):
+        """Vote on the relevance of extracted job details (unless evaluate_relevance is off)"""
+        if self.evaluate_relevance:
+            res["is_relevant"] = self.is_job_relevant(res)
+            res["relevance_hash"] = self.stage_hash("relevance")
+            self.verbose_print(f'Job relevance: {res["is_relevant"]}')
+        return res
 
     def process_descriptions(self, date):
-        jobs = self.get_jobs_descriptions(date)
+        jobs = self._prioritized(self.iter_job_candidates(date), keep=("url",))
         l = len(jobs)
         print(f"will process {l} jobs descriptions")
-        for i, url in enumerate(jobs):
+        for i in range(l):
             self.verbose_print(f'{i}/{l}')
-            self.process_job_description(url)
+            self.process_job_description(jobs.pop()["url"])
 #            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
 #                futures = [executor.submit(self.process_job_description, url) for url in self.jobs_descriptions]
 #                for future in futures:
 #                    future.result()
         print(f"{l} jobs descriptions succesfully processed.")
 
+    def _reprocess_job(self, url, score):
+        """Analyze an archived page: None if it is not in the archive, False if extraction failed"""
+        content = self.archive.get(url)
+        if content is None:
+            return None
+        res = self._analyze_job_content(url, content)
+        if res == self._create_empty_job_result(url):
+            return False
+        if score:
+            relevant = res.get("is_relevant")
+            res["score"] = self.score_description(res["description"]) if relevant else None
+            res["score_hash"] = self.stage_hash("score") if relevant else None
+        return res
+
+    def reprocess(self, since=None, score=True, max_workers=None):
+        """
+        Re-run extraction, formatting, relevance and scoring of stored jobs from
+        the raw page archive, without fetching anything. Use it after a change
+        of prompts or extraction logic.
+
+        Pages are read and analyzed concurrently, a few chunks of max_workers
+        jobs at a time; the results are written to the database from the
+        calling thread. A job whose extraction or formatting fails keeps its
+        stored row.
+
+        Args:
+            since: Only jobs added since this date (YYYY/MM/DD), default: every job
+            score: Also score the jobs found relevant (irrelevant ones lose their score)
+            max_workers: Jobs analyzed at the same time (default: MAX_WORKERS)
+
+        Returns:
+            dict: Number of jobs "updated", "failed", "missing" from the archive and "skipped" on the budget
+        """
+        if self.archive is None:
+            raise ValueError("reprocess needs the raw page archive (archive_dir)")
+        where, params = ("date >= ?", (since,)) if since else ("1", ())
+        urls = [row["url"] for row in self.iter_rows("jobs", ("url",), where, params)]
+        print(f"will reprocess {len(urls)} jobs from the archive")
+        counts = {"updated": 0, "failed": 0, "missing": 0, "skipped": 0}
+        fields = ("title", "description", "salary", "location", "company", "is_relevant", "relevance_hash")
+        fields += ("score", "score_hash") if score else ()
+        workers = int(max_workers or self.MAX_WORKERS) or 1
+        stopped = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(urls), workers * 4):
+                chunk = urls[start:start + workers * 4]
+                futures = [executor.submit(self._reprocess_job, url, score) for url in chunk]
+                for url, future in zip(chunk, futures):
+                    try:
+                        res = future.result()
+                    except BudgetExceeded as e:
+                        stopped = e
+                        counts["skipped"] += 1
+                        continue
+                    except Exception as e:
+                        print(f"Could not reprocess {url}: {e}")
+                        res = False
+                    if res is None:
+                        self.verbose_print(f"Not in the archive: {url}")
+                        counts["missing"] += 1
+                    elif res is False:
+                        self.verbose_print(f"Extraction failed, keeping the stored job: {url}")
+                        counts["failed"] += 1
+                    else:
+                        self.update_job(url, **{key: res.get(key) for key in fields})
+                        counts["updated"] += 1
+                if stopped:
+                    counts["skipped"] += len(urls) - start - len(chunk)
+                    print(f"Stopping after {start + len(chunk)}/{len(urls)} jobs: {stopped}")
+                    break
+        print(f"{counts['updated']} jobs reprocessed, {counts['failed']} failed, "
+              f"{counts['missing']} not in the archive.")
+        return counts
+
     def apply_job_search_plan(self):
         if self.job_search_plan:
+            self.ats_boards_seen = set()
             all_res = []
             for query in self.job_search_plan:
                 res = search_serper(query, self.QUERY_LIMIT)
@@ -623,7 +1293,8 @@ class JobSearchAssistant:
             str: Formatted list of identified pain points
         """
         prompt = GET_PAIN_POINTS_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
-        response = self.query_llm(prompt, model="sonnet")
+        response = self.query_llm(prompt, model="sonnet", stage="documents",
+                                  **GENERATION_LIMITS["pain_points"])
         return search_for_tag(response, "pain_points")
 
     def _generate_hook(self, job_desc: dict) -> str:
@@ -642,8 +1313,8 @@ class JobSearchAssistant:
             str: Opening paragraph for cover letter
         """
         prompt = CONNECT_WITH_READER_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
-        response = self.query_llm(prompt, model="sonnet")
+        response = self.query_llm(prompt, model="sonnet", system=self.candidate_system_prompt(), stage="documents",
+                                  **GENERATION_LIMITS["hook"])
         hook = search_for_tag(response, "hook")
         self.verbose_print(f"Hook length: {len(hook.split(' '))} words")
         return hook
@@ -666,38 +1337,43 @@ class JobSearchAssistant:
             dict: Complete cover letter content
         """
         prompt = WRITE_COVER_LETTER_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
         prompt = prompt.replace("{{cover_letter}}", json.dumps(cover_letter))
-        response = self.query_llm(prompt, model="sonnet")
+        response = self.query_llm(prompt, model="sonnet", system=self.candidate_system_prompt(), stage="documents",
+                                  **GENERATION_LIMITS["cover_letter_body"])
         return json.loads(search_for_tag(response, "cover_letter"), strict=False)
 
-    def _generate_latex(self, cover_letter: dict, output_path: str) -> str:
+    def _read_template(self, name: str) -> str:
+        """Return the content of a LaTeX template shipped next to this module"""
+        with open(os.path.join(os.path.dirname(__file__), name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _generate_latex(self, cover_letter: dict, output_path: str, job_desc: dict = None) -> str:
         """
         Convert cover letter content to LaTeX format and save to file.
         
         Steps:
         1. Load LaTeX template
-        2. Format content for LaTeX
-        3. Generate complete document
-        4. Save to file
+        2. Fill it with the letter content and personal information, locally
+           (latex_mode="render") or with the LLM (latex_mode="llm")
+        3. Save to file
         
         Args:
             cover_letter: Dictionary with letter content
             output_path: Directory to save output
+            job_desc: Dictionary containing job details (recipient block)
             
         Returns:
             str: Path to generated LaTeX file
         """
-        prompt = LATEX_COVER_LETTER_PROMPT.replace("{{cover_letter}}", json.dumps(cover_letter))
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
-        
-        template_path = os.path.join(os.path.dirname(__file__), "cover_template.tex")
-        with open(template_path, "r", encoding="utf-8") as f:
-            cover_latex_template = f.read()
-        
-        prompt = prompt.replace("{{latex_template}}", cover_latex_template)
-        response = self.query_llm(prompt)
-        cl_tex = search_for_tag(response, "cover_latex")
+        cover_latex_template = self._read_template("cover_template.tex")
+        if self.latex_mode == "render":
+            cl_tex = render_cover_letter(cover_latex_template, self.user_context, cover_letter, job_desc)
+        else:
+            prompt = LATEX_COVER_LETTER_PROMPT.replace("{{cover_letter}}", json.dumps(cover_letter))
+            prompt = prompt.replace("{{latex_template}}", cover_latex_template)
+            response = self.query_llm(prompt, system=self.candidate_system_prompt(), stage="documents",
+                                      **GENERATION_LIMITS["cover_latex"])
+            cl_tex = search_for_tag(response, "cover_latex")
         
         cover_letter_tex_path = os.path.join(output_path, "cover_letter.tex")
         with open(cover_letter_tex_path, "w", encoding="utf-8") as f:
@@ -705,24 +1381,7 @@ class JobSearchAssistant:
             
         return cover_letter_tex_path
 
-    def _cleanup_latex_files(self, output_path: str):
-        """
-        Remove LaTeX auxiliary files after PDF generation.
-        
-        Removes common LaTeX temporary files:
-        - .aux (auxiliary data)
-        - .log (compilation log)
-        - .out (hyperref data)
-        
-        Args:
-            output_path: Directory containing LaTeX files
-        """
-        for ext in [".aux", ".log", ".out"]:
-            aux_file = os.path.join(output_path, f"cover_letter{ext}")
-            if os.path.exists(aux_file):
-                os.remove(aux_file)
-
-    def generate_cover_letter(self, job_desc: dict, output_path: str) -> str:
+    def generate_cover_letter(self, job_desc: dict, output_path: str, pain_points: str = None) -> str:
         """
         Generate a customized cover letter for a job application.
         
@@ -735,13 +1394,16 @@ class JobSearchAssistant:
         Args:
             job_desc: Dictionary containing job details
             output_path: Directory to save output files
+            pain_points: Pain points already extracted from the job description
+                         (extracted here if None)
             
         Returns:
             Path to generated PDF file
         """
         # Extract pain points
-        pain_points = self._identify_pain_points(job_desc)
-        job_desc['challengesAndPainPoints'] = pain_points
+        if pain_points is None:
+            pain_points = self._identify_pain_points(job_desc)
+        job_desc = dict(job_desc, challengesAndPainPoints=pain_points)
         
         # Generate hook and initial structure
         hook = self._generate_hook(job_desc)
@@ -752,11 +1414,8 @@ class JobSearchAssistant:
         self.verbose_print(f"Body length: {len(cover_letter['body'].split(' '))} words")
         
         # Convert to LaTeX and PDF
-        tex_path = self._generate_latex(cover_letter, output_path)
-        os.system(f"pdflatex -output-directory={output_path} {tex_path}")
-        self._cleanup_latex_files(output_path)
-        
-        return os.path.join(output_path, "cover_letter.pdf")
+        tex_path = self._generate_latex(cover_letter, output_path, job_desc)
+        return self.latex.compile(tex_path)["pdf_path"]
 
     def _generate_summary_step(self, step_num: int, job_desc: dict, previous_result: dict = None) -> dict:
         """
@@ -778,12 +1437,12 @@ class JobSearchAssistant:
         """
         prompt_var = f"GENERATE_PROFESSIONAL_SUMMARY_STEP{step_num}_PROMPT"
         prompt = globals()[prompt_var].replace("{{job_desc}}", json.dumps(job_desc))
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
         
         if previous_result:
             prompt = prompt.replace("{{previous_step}}", json.dumps(previous_result))
             
-        response = self.query_llm(prompt, model="sonnet")
+        response = self.query_llm(prompt, model="sonnet", system=self.candidate_system_prompt(), stage="documents",
+                                  **GENERATION_LIMITS["summary_step"])
         result = json.loads(search_for_tag(response, "output"))
         self.verbose_print(f"Step {step_num} result: {json.dumps(result)}")
         return result
@@ -803,7 +1462,26 @@ class JobSearchAssistant:
         with open(summary_file_path, "w", encoding="utf-8") as f:
             f.write(summary)
 
-    def generate_resume(self, job_desc: dict, output_path: str):
+    def _generate_summary_single(self, job_desc: dict, fixed_steps: dict = None) -> tuple:
+        """
+        Generate every step of the professional summary in one structured LLM call.
+
+        Args:
+            job_desc: Dictionary containing job details
+            fixed_steps: Steps to reuse as they are (e.g. cached adjective and title)
+
+        Returns:
+            tuple: (steps dict, professional summary)
+        """
+        prompt = GENERATE_PROFESSIONAL_SUMMARY_SINGLE_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
+        prompt = prompt.replace("{{fixed_steps}}", json.dumps(fixed_steps) if fixed_steps else "")
+        response = self.query_llm(prompt, model="sonnet", system=self.candidate_system_prompt(), stage="documents",
+                                  **GENERATION_LIMITS["summary_single"])
+        steps = json.loads(search_for_tag(response, "output"))
+        self.verbose_print(f"Summary steps: {json.dumps(steps)}")
+        return steps, search_for_tag(response, "professional_summary")
+
+    def generate_resume(self, job_desc: dict, output_path: str) -> str:
         """
         Generate a professional resume summary through a multi-step LLM process.
         
@@ -813,22 +1491,43 @@ class JobSearchAssistant:
         3. Generate experience statement
         4. Generate specialties
         5. Combine into final summary
+        6. Build the resume PDF around the summary
+
+        Steps 1-2 are reused from the summary cache for jobs with a similar
+        title. With summary_mode="single", steps 1-5 are done in one call.
+
+        Returns:
+            str: Path to generated PDF file
         """
-        # Generate each component
-        step1_result = self._generate_summary_step(1, job_desc)
-        step2_result = self._generate_summary_step(2, job_desc, step1_result)
-        step3_result = self._generate_summary_step(3, job_desc, step2_result)
-        step4_result = self._generate_summary_step(4, job_desc, step3_result)
-
-        # Generate final summary
-        prompt = GENERATE_PROFESSIONAL_SUMMARY_FINAL_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
-        prompt = prompt.replace("{{previous_steps}}", json.dumps(step4_result))
-        response = self.query_llm(prompt, model="sonnet")
-        professional_summary = search_for_tag(response, "professional_summary")
+        cluster = title_cluster(job_desc.get("title", ""), job_desc.get("description", ""))
+        cached_steps = self.summary_cache.get(cluster, self.profile_hash)
+        if cached_steps:
+            self.verbose_print(f"Reusing summary steps 1-2 for '{cluster}': {json.dumps(cached_steps)}")
+
+        if self.summary_mode == "single":
+            step4_result, professional_summary = self._generate_summary_single(job_desc, cached_steps)
+        else:
+            # Generate each component
+            step2_result = cached_steps
+            if step2_result is None:
+                step1_result = self._generate_summary_step(1, job_desc)
+                step2_result = self._generate_summary_step(2, job_desc, step1_result)
+            step3_result = self._generate_summary_step(3, job_desc, step2_result)
+            step4_result = self._generate_summary_step(4, job_desc, step3_result)
+
+            # Generate final summary
+            prompt = GENERATE_PROFESSIONAL_SUMMARY_FINAL_PROMPT.replace("{{job_desc}}", json.dumps(job_desc))
+            prompt = prompt.replace("{{previous_steps}}", json.dumps(step4_result))
+            response = self.query_llm(prompt, model="sonnet", system=self.candidate_system_prompt(), stage="documents",
+                                      **GENERATION_LIMITS["summary_final"])
+            professional_summary = search_for_tag(response, "professional_summary")
+
+        if cached_steps is None:
+            self.summary_cache.put(cluster, self.profile_hash, step4_result)
         
         self.verbose_print(f"Generated professional summary:\n{professional_summary}")
         self._save_professional_summary(professional_summary, output_path)
+        return self.generate_resume_latex(professional_summary, job_desc, output_path)
 
     def generate_resume_latex(self, professional_summary: str, job_desc: dict, output_path: str) -> str:
         """
@@ -836,10 +1535,9 @@ class JobSearchAssistant:
         
         Steps:
         1. Load resume template
-        2. Format content for LaTeX
-        3. Generate complete document
-        4. Compile to PDF
-        5. Clean up auxiliary files
+        2. Fill it with the summary and the user profile, locally
+           (latex_mode="render") or with the LLM (latex_mode="llm")
+        3. Compile to PDF (auxiliary files are cleaned up by the LaTeX builder)
         
         Args:
             professional_summary: Generated summary text
@@ -849,15 +1547,17 @@ class JobSearchAssistant:
         Returns:
             str: Path to generated PDF file
         """
-        prompt = LATEX_RESUME_PROMPT.replace("{{professional_summary}}", professional_summary)
-        prompt = prompt.replace("{{user_info}}", json.dumps(self.user_context))
-        prompt = prompt.replace("{{job_desc}}", json.dumps(job_desc))
-        with open(os.path.join(os.path.dirname(__file__), "resume_template.tex"), "r", encoding="utf-8") as f:
-            resume_latex_template = f.read()
-        resume_latex_template = resume_latex_template.replace("{{professional_summary}}", professional_summary)
-        prompt = prompt.replace("{{latex_template}}", resume_latex_template)
-        response = self.query_llm(prompt)
-        resume_tex = search_for_tag(response, "resume_latex")
+        resume_latex_template = self._read_template("resume_template.tex")
+        if self.latex_mode == "render":
+            resume_tex = render_resume(resume_latex_template, self.user_context, professional_summary, job_desc)
+        else:
+            prompt = LATEX_RESUME_PROMPT.replace("{{professional_summary}}", professional_summary)
+            prompt = prompt.replace("{{job_desc}}", json.dumps(job_desc))
+            resume_latex_template = resume_latex_template.replace("{{professional_summary}}", professional_summary)
+            prompt = prompt.replace("{{latex_template}}", resume_latex_template)
+            response = self.query_llm(prompt, system=self.candidate_system_prompt(), stage="documents",
+                                      **GENERATION_LIMITS["resume_latex"])
+            resume_tex = search_for_tag(response, "resume_latex")
 
         # Save LaTeX file
         resume_tex_path = os.path.join(output_path, "resume.tex")
@@ -865,23 +1565,20 @@ class JobSearchAssistant:
             f.write(resume_tex)
 
         # Convert LaTeX to PDF
-        os.system(f"pdflatex -output-directory={output_path} {resume_tex_path}")
-
-        # Clean up auxiliary files
-        for ext in [".aux", ".log", ".out"]:
-            aux_file = os.path.join(output_path, f"resume{ext}")
-            if os.path.exists(aux_file):
-                os.remove(aux_file)
-
-        return os.path.join(output_path, "resume.pdf")
+        return self.latex.compile(resume_tex_path)["pdf_path"]
 
     def create_resume_cover_letter(self, job_desc: dict, dir_name: str) -> str:
         """
         Create complete application package with resume and cover letter.
         
+        The resume and cover letter branches are independent, so the resume
+        chain runs in a worker thread while the cover letter is written in the
+        calling thread. Pain point extraction, the first cover letter step,
+        overlaps with the resume chain as well.
+
         Steps:
         1. Create output directory
-        2. Generate resume content
+        2. Generate resume content and extract pain points (concurrently)
         3. Generate cover letter
         4. Create PDF versions
         
@@ -897,46 +1594,100 @@ class JobSearchAssistant:
         os.makedirs(output_path, exist_ok=True)
 
         # Generate resume and cover letter
-        resume_content = self.generate_resume(job_desc, output_path)
-        cover_letter_content = self.generate_cover_letter(job_desc, output_path)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pain_points = executor.submit(self._identify_pain_points, job_desc)
+            resume = executor.submit(self.generate_resume, job_desc, output_path)
+            self.generate_cover_letter(job_desc, output_path, pain_points.result())
+            resume.result()
 
-        # Save the resume and cover letter as PDF
-        resume_file = os.path.join(output_path, "resume.pdf")
-        cover_letter_file = os.path.join(output_path, "cover_letter.pdf")
         return output_path
 
-    def run(self):
-        self.plan_job_search()
-        self.apply_job_search_plan()
+    def run(self, resume=False):
+        """
+        Complete job search workflow: plan, search, crawl and process job pages.
 
+        When the budget runs out, the plan, the search results and the crawl
+        position are saved to run_state.json; job pages already processed
+        are in the database.
 
-    def create_outputs_from_db(self, id: int):
+        Args:
+            resume: Continue the run saved in run_state.json instead of planning a new one
+
+        Returns:
+            bool: True if the run completed, False if it stopped on the budget
         """
-        Generate application documents from database job entry.
-        
-        Steps:
-        1. Fetch job details from database
-        2. Create output directory
-        3. Generate resume and cover letter
-        
+        try:
+            if resume and self.load_run_state():
+                if not self.job_search_plan:
+                    print("Resuming run: the search was not planned yet")
+                    self.plan_job_search()
+                    self.apply_job_search_plan()
+                elif not self.initial_links:
+                    print("Resuming run: the planned queries were not searched yet")
+                    self.apply_job_search_plan()
+                else:
+                    print(f"Resuming run at initial link {self.next_initial_link}/{len(self.initial_links)}")
+                    self.process_initial_links(self.next_initial_link)
+                    self.process_descriptions(self.date)
+            else:
+                # a budget stop during planning must not save the previous run's plan
+                self.job_search_plan, self.initial_links, self.next_initial_link = [], [], 0
+                self.plan_job_search()
+                self.apply_job_search_plan()
+        except BudgetExceeded as e:
+            self.save_run_state()
+            print(f"Stopping: {e}. Progress saved to {self.run_state_path}, continue with run(resume=True)")
+            return False
+        if os.path.exists(self.run_state_path):
+            os.remove(self.run_state_path)
+        return True
+
+    def save_run_state(self):
+        """Save the plan, search results and crawl position of the current run"""
+        state = {
+            "date": self.date,
+            "job_search_plan": self.job_search_plan,
+            "domain_of_interest": self.domain_of_interest,
+            "initial_links": self.initial_links,
+            "next_initial_link": self.next_initial_link,
+        }
+        with open(self.run_state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+
+    def load_run_state(self) -> bool:
+        """Restore the run saved by save_run_state, returns False if there is none"""
+        if not os.path.exists(self.run_state_path):
+            return False
+        with open(self.run_state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.date = state["date"]
+        self.job_search_plan = state["job_search_plan"]
+        self.domain_of_interest = state["domain_of_interest"]
+        self.initial_links = state["initial_links"]
+        self.next_initial_link = state["next_initial_link"]
+        return True
+
+
+    def get_job(self, id: int):
+        """
+        Fetch a job posting from the database.
+
         Args:
             id: Database ID of job posting
+
+        Returns:
+            dict|None: All columns of the job, None if not found
         """
-        # Fetch job details from the database
         self.c.execute("SELECT * FROM jobs WHERE id = ?", (id,))
         job = self.c.fetchone()
-        
         if job is None:
-            print(f"No job found with id {id}")
-            return
-        
-        # Create a JSON object with all job information
-        job_json = {
+            return None
+        return {
             "id": job[0],
             "is_relevant": bool(job[1]),
             "url": job[2],
             "title": job[3],
-            "description": job[4],
+            "description": self.codec.decode(job[4]),
             "score": job[5],
             "is_valid": bool(job[6]),
             "documents_path": job[7],
@@ -945,27 +1696,86 @@ class JobSearchAssistant:
             "company": job[10],
             "date": job[11]
         }
+
+    def create_outputs_from_db(self, id: int):
+        """
+        Generate application documents from database job entry.
+        
+        Steps:
+        1. Fetch job details from database
+        2. Create output directory
+        3. Generate resume and cover letter
+        
+        Args:
+            id: Database ID of job posting
+        """
+        # Fetch job details from the database
+        job_json = self.get_job(id)
+        
+        if job_json is None:
+            print(f"No job found with id {id}")
+            return
+        
+        self._create_outputs_for_job(job_json)
+
+    def _create_outputs_for_job(self, job_json: dict) -> str:
+        """Generate documents for a job fetched with get_job, returns the output directory"""
         # Create a directory for outputs
-        dir_name = f"{id}_{job_json['title']}_{job_json['company']}"
+        dir_name = f"{job_json['id']}_{job_json['title']}_{job_json['company']}"
         dir_name = dir_name.replace(' ', '_')
         
-        self.create_resume_cover_letter(job_json, dir_name)
+        output_path = self.create_resume_cover_letter(job_json, dir_name)
         
-        print(f"Outputs created for job {id} in directory {dir_name}")
+        print(f"Outputs created for job {job_json['id']} in directory {dir_name}")
+        return output_path
+
+    def create_outputs_for_jobs(self, ids: list, max_workers: int = None) -> dict:
+        """
+        Generate application documents for many database jobs at once.
+
+        Jobs are read from the database in the calling thread, then their
+        documents are generated concurrently with bounded parallelism.
+
+        Args:
+            ids: Database IDs of the job postings
+            max_workers: Max jobs processed at the same time (default: MAX_WORKERS)
 
-    def create_outputs_from_params(self, title: str, company: str, description: str) -> str:
+        Returns:
+            dict: job id -> output directory, or the raised exception for failed jobs
+        """
+        jobs = []
+        for id in ids:
+            job_json = self.get_job(id)
+            if job_json is None:
+                print(f"No job found with id {id}")
+            else:
+                jobs.append(job_json)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=int(max_workers or self.MAX_WORKERS) or 1) as executor:
+            futures = {job["id"]: executor.submit(self._create_outputs_for_job, job) for job in jobs}
+            for id, future in futures.items():
+                try:
+                    results[id] = future.result()
+                except Exception as e:
+                    print(f"Failed to create outputs for job {id}: {e}")
+                    results[id] = e
+        return results
+
+    def create_outputs_from_params(self, title: str, company: str, description: str, open_folder: bool = True) -> str:
         """
         Generate application documents from manual input.
         
         Steps:
         1. Create job details dictionary
         2. Generate documents in named directory
-        3. Open output directory
+        3. Open output directory (Windows only)
         
         Args:
             title: Job title
             company: Company name
             description: Job description text
+            open_folder: Open the output directory in the file explorer
             
         Returns:
             str: Path to output directory
@@ -985,15 +1795,16 @@ class JobSearchAssistant:
         
         print(f"Outputs created for job '{title}' at '{company}' in directory {dir_name}")
         
-        print(f"Opening file explorer at: {output_path}")
-        os.startfile(output_path)
+        if open_folder and hasattr(os, "startfile"):
+            print(f"Opening file explorer at: {output_path}")
+            os.startfile(output_path)
         return output_path
 
 USER_CONTEXT_FILE = os.path.join(os.path.dirname(__file__), "user_context.json")
 USER_WANT_FILE = os.path.join(os.path.dirname(__file__), "user_want.md")
 
-assistant = JobSearchAssistant(USER_CONTEXT_FILE, USER_WANT_FILE, verbose=True, max_workers=1, skip_domains=[], date='2024/07/30')
 if __name__ == "__main__":
+    assistant = JobSearchAssistant(USER_CONTEXT_FILE, USER_WANT_FILE, verbose=True, max_workers=1, skip_domains=[], date='2024/07/30')
     try:
         # Example 1: Complete job search workflow
         # Searches for jobs, processes descriptions, and scores matches
@@ -1022,3 +1833,4 @@ if __name__ == "__main__":
         assistant.process_descriptions('2024/07/30')
     finally:
         print(f"Total API cost: {assistant.get_cost()} $USD")
+        assistant.export_metrics()
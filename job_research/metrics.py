@@ -0,0 +1,227 @@
+"""
+Metrics Module
+
+In-process telemetry for the job search pipeline. Every LLM call is recorded
+per pipeline stage (plan, classify_link, is_job_page, next_page, format,
+relevance, score, documents) and per model with:
+- call count, retries and failures
+- latency histogram
+- input / output / cached tokens
+- cost in USD
+
+Free-form counters (aborted downloads, skipped pages, ...) can be recorded
+alongside. At the end of a run the registry can be exported as JSON or in the
+Prometheus text exposition format.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+METRIC_PREFIX = "job_research"
+
+
+def _new_series(n_buckets: int) -> dict:
+    return {
+        "calls": 0,
+        "failures": 0,
+        "retries": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_creation_tokens": 0,
+        "cache_read_tokens": 0,
+        "cache_hits": 0,
+        "cost": 0.0,
+        "latency_sum": 0.0,
+        "latency_buckets": [0] * n_buckets,
+    }
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of per-stage, per-model LLM metrics and named counters.
+
+    Args:
+        buckets: Upper bounds of the latency histogram buckets, in seconds
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.counters = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+    def record_call(self, stage: str, model: str, latency: float, response: dict = None, failed: bool = False):
+        """
+        Record a single LLM call.
+
+        Args:
+            stage: Pipeline stage that issued the call
+            model: Model identifier from MODEL_NAMES
+            latency: Wall-clock duration of the call in seconds
+            response: Dict returned by query_llm (None if the call failed)
+            failed: Whether the call raised an error
+        """
+        response = response or {}
+        with self.lock:
+            series = self.series.setdefault((stage, model), _new_series(len(self.buckets)))
+            series["calls"] += 1
+            series["failures"] += 1 if failed else 0
+            series["retries"] += response.get("retries", 0)
+            for key in ("input_tokens", "output_tokens", "cache_creation_tokens", "cache_read_tokens"):
+                series[key] += response.get(key, 0) or 0
+            series["cache_hits"] += 1 if response.get("cache_read_tokens") else 0
+            series["cost"] += response.get("cost", 0) or 0
+            series["latency_sum"] += latency
+            for i, bound in enumerate(self.buckets):
+                if latency <= bound:
+                    series["latency_buckets"][i] += 1
+                    break
+
+    @contextmanager
+    def time_call(self, stage: str, model: str):
+        """
+        Context manager timing an LLM call. The yielded dict must be filled
+        with the response under the "response" key; exceptions count as failures.
+        """
+        call = {}
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            self.record_call(stage, model, time.perf_counter() - start, failed=True)
+            raise
+        self.record_call(stage, model, time.perf_counter() - start, call.get("response"))
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """Increment a named counter, optionally qualified by labels"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Return the current value of a named counter"""
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def total_cost(self) -> float:
+        """Return the summed cost of every recorded call"""
+        return sum(series["cost"] for series in self.series.values())
+
+    def to_dict(self) -> dict:
+        """
+        Snapshot the registry as plain data.
+
+        Returns:
+            dict with "stages" (stage -> model -> series), "totals" per stage and "counters"
+        """
+        with self.lock:
+            stages = {}
+            totals = {}
+            for (stage, model), series in sorted(self.series.items()):
+                snapshot = dict(series)
+                snapshot["latency_buckets"] = {
+                    ("+Inf" if math.isinf(bound) else str(bound)): count
+                    for bound, count in zip(self.buckets, series["latency_buckets"])
+                }
+                snapshot["latency_avg"] = series["latency_sum"] / series["calls"] if series["calls"] else 0.0
+                stages.setdefault(stage, {})[model] = snapshot
+                total = totals.setdefault(stage, {"calls": 0, "cost": 0.0, "latency_sum": 0.0,
+                                                  "input_tokens": 0, "output_tokens": 0})
+                for key in total:
+                    total[key] += series[key]
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+        return {
+            "started_at": self.started_at,
+            "duration": time.time() - self.started_at,
+            "total_cost": sum(t["cost"] for t in totals.values()),
+            "totals": totals,
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def to_json(self, indent: int = 2) -> str:
+        """Export the registry as a JSON document"""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Export the registry in the Prometheus text exposition format"""
+        p = METRIC_PREFIX
+        lines = []
+        simple = [
+            ("llm_calls_total", "calls", "counter", "LLM calls"),
+            ("llm_failures_total", "failures", "counter", "LLM calls that raised an error"),
+            ("llm_retries_total", "retries", "counter", "LLM call retries"),
+            ("llm_input_tokens_total", "input_tokens", "counter", "Uncached input tokens"),
+            ("llm_output_tokens_total", "output_tokens", "counter", "Output tokens"),
+            ("llm_cache_creation_tokens_total", "cache_creation_tokens", "counter", "Input tokens written to the prompt cache"),
+            ("llm_cache_read_tokens_total", "cache_read_tokens", "counter", "Input tokens read from the prompt cache"),
+            ("llm_cache_hits_total", "cache_hits", "counter", "LLM calls served partly from the prompt cache"),
+            ("llm_cost_usd_total", "cost", "counter", "LLM cost in USD"),
+        ]
+        with self.lock:
+            items = sorted(self.series.items())
+            for metric, key, kind, help_text in simple:
+                lines.append(f"# HELP {p}_{metric} {help_text}")
+                lines.append(f"# TYPE {p}_{metric} {kind}")
+                for (stage, model), series in items:
+                    lines.append(f"{p}_{metric}{_format_labels({'stage': stage, 'model': model})} {series[key]}")
+
+            lines.append(f"# HELP {p}_llm_latency_seconds LLM call latency")
+            lines.append(f"# TYPE {p}_llm_latency_seconds histogram")
+            for (stage, model), series in items:
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["latency_buckets"]):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else str(bound)
+                    labels = _format_labels({"stage": stage, "model": model, "le": le})
+                    lines.append(f"{p}_llm_latency_seconds_bucket{labels} {cumulative}")
+                labels = _format_labels({"stage": stage, "model": model})
+                lines.append(f"{p}_llm_latency_seconds_sum{labels} {series['latency_sum']}")
+                lines.append(f"{p}_llm_latency_seconds_count{labels} {series['calls']}")
+
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE {p}_{name} counter")
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{p}_{name}{_format_labels(dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path_prefix: str):
+        """
+        Write the registry to <path_prefix>.json and <path_prefix>.prom.
+
+        Args:
+            path_prefix: Output path without extension
+        """
+        with open(f"{path_prefix}.json", "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        with open(f"{path_prefix}.prom", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+    def summary(self) -> str:
+        """Return a short human readable per-stage summary"""
+        data = self.to_dict()
+        lines = [f"{'stage':<16}{'calls':>8}{'tokens in':>12}{'tokens out':>12}{'avg s':>8}{'cost $':>10}"]
+        for stage, total in data["totals"].items():
+            avg = total["latency_sum"] / total["calls"] if total["calls"] else 0.0
+            lines.append(f"{stage:<16}{total['calls']:>8}{total['input_tokens']:>12}"
+                         f"{total['output_tokens']:>12}{avg:>8.2f}{total['cost']:>10.4f}")
+        lines.append(f"total cost: {data['total_cost']:.4f} $USD")
+        return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""
+Job Priority Queue
+
+Orders the work of process_descriptions (job pages to fetch, format and
+vote on) and score_jobs (relevant jobs to score) so that the most promising
+jobs come first, which matters when a run is cut short by its budget or time.
+
+Priorities come from a pluggable policy computing a cheap prior, without any
+LLM call:
+- FifoPolicy: keeps the order of the database query (newest first)
+- HeuristicPolicy: weighted sum of
+  - title match: share of the job title words found in the target role keywords
+    (targetJob, jobPreferences, main skills, past titles)
+  - similarity: overlap between the job text (title, URL and the start of
+    the description) and the whole profile (user context and user_want)
+  - domain yield: share of relevant jobs among those already stored for the
+    domain (Laplace smoothed, unknown domains get 0.5)
+  - freshness: exponential decay with the age of the link
+
+Items are dicts with any of: url, title, description, date ("YYYY/MM/DD HH:MM").
+"""
+
+import datetime
+import heapq
+import itertools
+import math
+import re
+import threading
+from urllib.parse import urlparse
+
+# Words carrying no signal about a role
+STOPWORDS = {
+    "the", "and", "for", "with", "you", "your", "our", "are", "will", "this", "that", "from", "have", "has",
+    "des", "les", "une", "pour", "avec", "dans", "sur", "vous", "nous", "est", "par", "aux", "qui", "que",
+    "job", "jobs", "emploi", "offre", "offres", "www", "http", "https", "com", "html", "php", "fr", "en",
+    "example", "describe", "year", "years", "etc",
+}
+
+# Characters of a description read by the prior
+DESCRIPTION_PREFIX = 2000
+
+_WORD_RE = re.compile(r"[a-zà-ÿ0-9+#]{2,}")
+
+
+def words(text) -> set:
+    """Lowercase words of a text (or of a JSON-like structure), without stopwords"""
+    if isinstance(text, dict):
+        text = " ".join(str(v) for v in text.values())
+    elif isinstance(text, (list, tuple)):
+        text = " ".join(str(v) for v in text)
+    return {w for w in _WORD_RE.findall(str(text or "").lower()) if w not in STOPWORDS and not w.isdigit()}
+
+
+def _url_words(url: str) -> set:
+    parsed = urlparse(url or "")
+    return words(re.sub(r"[-_/.?=&]", " ", parsed.path + " " + parsed.query))
+
+
+class PriorityPolicy:
+    """Base class of the ordering policies: higher priorities are processed first"""
+    def refresh(self, domain_yield: dict):
+        """Receive the current share of relevant jobs per domain"""
+
+    def priority(self, item: dict) -> float:
+        raise NotImplementedError
+
+
+class FifoPolicy(PriorityPolicy):
+    """Keep the order in which items are queued"""
+    def priority(self, item: dict) -> float:
+        return 0.0
+
+
+class HeuristicPolicy(PriorityPolicy):
+    """
+    Cheap prior from title keywords, profile similarity, domain yield and freshness.
+
+    Args:
+        user_context: Parsed user_context.json
+        user_want: Content of user_want.md
+        weights: Weights of "title", "similarity", "domain", "freshness"
+        freshness_half_life: Days after which the freshness term halves
+    """
+    DEFAULT_WEIGHTS = {"title": 0.4, "similarity": 0.3, "domain": 0.2, "freshness": 0.1}
+
+    def __init__(self, user_context: dict, user_want: str = "", weights: dict = None, freshness_half_life: float = 7):
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+        self.freshness_half_life = freshness_half_life
+        self.domain_yield = {}
+        experience_titles = [exp.get("title", "") for exp in user_context.get("experience", [])]
+        self.target_words = words([user_context.get("targetJob", ""), user_context.get("jobPreferences", {}),
+                                   user_context.get("mainSkills", []), experience_titles,
+                                   user_context.get("personalInfo", {}).get("tagline", "")])
+        self.profile_words = self.target_words | words(user_want) | words([
+            user_context.get("summary", ""), user_context.get("skills", []),
+            [p.get("description", "") for p in user_context.get("projects", [])]])
+        self.now = datetime.datetime.now()
+
+    def refresh(self, domain_yield: dict):
+        self.domain_yield = dict(domain_yield)
+        self.now = datetime.datetime.now()
+
+    def _freshness(self, date: str) -> float:
+        try:
+            created = datetime.datetime.strptime(date[:16], "%Y/%m/%d %H:%M")
+        except (TypeError, ValueError):
+            try:
+                created = datetime.datetime.strptime(date[:10], "%Y/%m/%d")
+            except (TypeError, ValueError):
+                return 0.5
+        age_days = max((self.now - created).total_seconds() / 86400, 0)
+        return math.pow(0.5, age_days / self.freshness_half_life)
+
+    def priority(self, item: dict) -> float:
+        title_words = words(item.get("title")) or _url_words(item.get("url"))
+        description = (item.get("description") or "")[:DESCRIPTION_PREFIX]
+        text_words = title_words | words(description) | _url_words(item.get("url"))
+        title = len(title_words & self.target_words) / len(title_words) if title_words else 0.0
+        similarity = len(text_words & self.profile_words) / len(text_words) if text_words else 0.0
+        domain = self.domain_yield.get(urlparse(item.get("url") or "").netloc, 0.5)
+        freshness = self._freshness(item.get("date"))
+        return (self.weights["title"] * title + self.weights["similarity"] * similarity
+                + self.weights["domain"] * domain + self.weights["freshness"] * freshness)
+
+
+def make_policy(policy, user_context: dict, user_want: str = "") -> PriorityPolicy:
+    """Build a policy from its name ("fifo" or "heuristic"), or return the given PriorityPolicy"""
+    if isinstance(policy, PriorityPolicy):
+        return policy
+    if policy == "fifo":
+        return FifoPolicy()
+    if policy == "heuristic":
+        return HeuristicPolicy(user_context, user_want)
+    raise ValueError(f"Unsupported priority policy: {policy}")
+
+
+class PriorityQueue:
+    """
+    Thread-safe max-priority queue; items of equal priority keep their queuing order.
+
+    Args:
+        policy: PriorityPolicy computing the priority of pushed items
+    """
+    def __init__(self, policy: PriorityPolicy):
+        self.policy = policy
+        self.heap = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def push(self, item: dict, priority: float = None):
+        """Queue an item, with the policy's priority unless one is given"""
+        if priority is None:
+            priority = self.policy.priority(item)
+        with self.lock:
+            heapq.heappush(self.heap, (-priority, next(self.counter), item))
+
+    def pop(self) -> dict:
+        """Remove and return the item with the highest priority (IndexError if empty)"""
+        with self.lock:
+            return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        with self.lock:
+            return len(self.heap)
@@ -0,0 +1,218 @@
+"""
+Multi-Profile Mode
+
+Runs the job search for several candidates over one shared corpus, so that
+searching, crawling and formatting job pages is paid once whatever the
+number of profiles:
+- shared: search (union of the queries planned for each profile), crawl of
+  the job boards, fetching and formatting of job pages (jobs, known_links
+  and the raw page archive)
+- per profile: relevance votes, scores and application documents, stored in
+  the profile_jobs table; documents are written to <output_dir>/<profile>
+
+evaluate() reads each job needing work once and evaluates it against every
+profile in the same pass. Values carry the input hashes of the profile
+(see invalidation.py), so a profile edit only re-evaluates that profile.
+
+Profiles file (JSON):
+    {"alice": {"context": "alice_context.json", "want": "alice_want.md"},
+     "bob": {"context": "bob_context.json", "want": "bob_want.md"}}
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from main import JobSearchAssistant
+from budget import BudgetGovernor, BudgetExceeded
+
+
+def load_profiles(path: str) -> dict:
+    """
+    Read a profiles file; relative paths are resolved from the file's directory.
+
+    Returns:
+        dict: profile name -> {"context": path, "want": path}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        profiles = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    return {name: {key: os.path.join(base, profile[key]) for key in ("context", "want")}
+            for name, profile in profiles.items()}
+
+
+class MultiProfileAssistant:
+    """
+    Shared crawl and extraction, per-profile evaluation and documents.
+
+    Args:
+        profiles: profile name -> {"context": user context file, "want": user want file}
+        output_dir: Parent directory of the profiles' document directories
+        budget: BudgetGovernor or BudgetGovernor keyword arguments, shared by all profiles
+        **kwargs: Other JobSearchAssistant arguments, applied to every assistant
+    """
+    def __init__(self, profiles: dict, output_dir="./output_dir", budget=None, **kwargs):
+        if not profiles:
+            raise ValueError("At least one profile is needed")
+        if isinstance(budget, dict):
+            budget = BudgetGovernor(**budget)
+        self.assistants = {
+            name: JobSearchAssistant(profile["context"], profile["want"], output_dir=os.path.join(output_dir, name),
+                                     budget=budget, profile=name, **kwargs)
+            for name, profile in profiles.items()
+        }
+        # crawls and formats job pages for everyone, its profile only orders the fetch queue
+        first = next(iter(profiles.values()))
+        self.crawler = JobSearchAssistant(first["context"], first["want"], output_dir=output_dir, budget=budget,
+                                          evaluate_relevance=False, **kwargs)
+        if budget is not None and budget.metrics is None:
+            # budget_*_total counters of the shared governor go with the crawl metrics
+            budget.metrics = self.crawler.metrics
+        self.conn = self.crawler.conn
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS profile_jobs (
+                                profile TEXT NOT NULL,
+                                job_id INTEGER NOT NULL,
+                                is_relevant INTEGER,
+                                score INTEGER,
+                                relevance_hash TEXT,
+                                score_hash TEXT,
+                                documents_path TEXT,
+                                PRIMARY KEY (profile, job_id)
+                            )''')
+        self.conn.commit()
+
+    def get_cost(self):
+        """Return the total cost of LLM API calls of the crawl and of every profile"""
+        return self.crawler.get_cost() + sum(assistant.get_cost() for assistant in self.assistants.values())
+
+    def export_metrics(self, path_prefix="metrics"):
+        """Export the metrics of the crawl and of each profile (path_prefix_<profile>)"""
+        self.crawler.export_metrics(f"{path_prefix}_crawl")
+        for name, assistant in self.assistants.items():
+            assistant.export_metrics(f"{path_prefix}_{name}")
+
+    def run(self, max_workers=None) -> bool:
+        """
+        Plan for every profile, crawl once, then evaluate the new jobs for every profile.
+
+        Returns:
+            bool: True if the run completed, False if it stopped on the budget
+        """
+        try:
+            queries = []
+            for assistant in self.assistants.values():
+                queries += [query for query in assistant.plan_job_search() if query not in queries]
+            print(f"{len(queries)} search queries for {len(self.assistants)} profiles")
+            self.crawler.job_search_plan = queries
+            self.crawler.apply_job_search_plan()
+        except BudgetExceeded as e:
+            print(f"Stopping the crawl: {e}")
+            return False
+        return self.evaluate(max_workers=max_workers)
+
+    def _stale(self, name: str) -> tuple:
+        """Ids of the jobs whose relevance, and whose score, are stale for a profile"""
+        assistant = self.assistants[name]
+        relevance_hash, score_hash = assistant.stage_hash("relevance"), assistant.stage_hash("score")
+        fresh = {row[0] for row in self.conn.execute(
+            "SELECT job_id FROM profile_jobs WHERE profile = ? AND relevance_hash = ?", (name, relevance_hash))}
+        relevance = {row["id"] for row in self.crawler.iter_rows("jobs", (), "title != 'No title'")} - fresh
+        score = {row[0] for row in self.conn.execute(
+            "SELECT job_id FROM profile_jobs WHERE profile = ? AND is_relevant = 1 "
+            "AND (score_hash IS NULL OR score_hash != ?)", (name, score_hash))}
+        return relevance, score - relevance
+
+    @staticmethod
+    def _evaluate_job(assistant, description: str, relevance: bool) -> dict:
+        """Relevance (if stale) and score of a job for one profile, without database access"""
+        values = {}
+        if relevance:
+            values["is_relevant"] = assistant.is_job_relevant({"description": description})
+            values["relevance_hash"] = assistant.stage_hash("relevance")
+        if values.get("is_relevant", True):
+            values["score"] = assistant.score_description(description)
+            values["score_hash"] = assistant.stage_hash("score")
+        elif relevance:
+            values["score"] = values["score_hash"] = None
+        return values
+
+    def _save(self, name: str, job_id: int, values: dict):
+        columns = ", ".join(values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values)
+        self.conn.execute(f"INSERT INTO profile_jobs (profile, job_id, {columns}) "
+                          f"VALUES (?, ?, {', '.join('?' * len(values))}) "
+                          f"ON CONFLICT (profile, job_id) DO UPDATE SET {updates}",
+                          (name, job_id, *values.values()))
+
+    def evaluate(self, max_workers=None) -> bool:
+        """
+        Evaluate the jobs that are new or stale for at least one profile, in one pass.
+
+        Each description is read once; its relevance and score are computed
+        concurrently for the profiles needing them, and written from the
+        calling thread.
+
+        Args:
+            max_workers: Evaluations running at the same time (default: the assistants' MAX_WORKERS)
+
+        Returns:
+            bool: True if every job was evaluated, False if it stopped on the budget
+        """
+        work = {}
+        for name in self.assistants:
+            relevance, score = self._stale(name)
+            print(f"{name}: {len(relevance)} jobs to evaluate, {len(score)} to score")
+            for job_id in relevance:
+                work.setdefault(job_id, []).append((name, True))
+            for job_id in score:
+                work.setdefault(job_id, []).append((name, False))
+        ids = sorted(work, reverse=True)
+        workers = int(max_workers or self.crawler.MAX_WORKERS) or 1
+        stopped = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(ids), workers):
+                chunk = ids[start:start + workers]
+                futures = []
+                for job_id in chunk:
+                    description = self.crawler.get_job_description(job_id)
+                    futures += [(name, job_id, executor.submit(self._evaluate_job, self.assistants[name],
+                                                               description, relevance))
+                                for name, relevance in work[job_id]]
+                for name, job_id, future in futures:
+                    try:
+                        self._save(name, job_id, future.result())
+                    except BudgetExceeded as e:
+                        stopped = e
+                self.conn.commit()
+                if stopped:
+                    print(f"Stopping after {start}/{len(ids)} jobs: {stopped}. Run evaluate() again to continue")
+                    return False
+        print(f"{len(ids)} jobs evaluated for {len(self.assistants)} profiles")
+        return True
+
+    def top_jobs(self, name: str, limit: int = 10) -> list:
+        """
+        Best scored relevant jobs of a profile.
+
+        Returns:
+            list: Dicts with id, title, company, url and score
+        """
+        rows = self.conn.execute(
+            "SELECT jobs.id, jobs.title, jobs.company, jobs.url, profile_jobs.score FROM profile_jobs "
+            "JOIN jobs ON jobs.id = profile_jobs.job_id WHERE profile_jobs.profile = ? AND profile_jobs.is_relevant = 1 "
+            "ORDER BY CAST(profile_jobs.score AS INTEGER) DESC, jobs.id DESC LIMIT ?", (name, limit)).fetchall()
+        return [dict(zip(("id", "title", "company", "url", "score"), row)) for row in rows]
+
+    def create_outputs(self, name: str, ids: list, max_workers: int = None) -> dict:
+        """
+        Generate a profile's application documents for database jobs.
+
+        Returns:
+            dict: job id -> output directory, or the raised exception for failed jobs
+        """
+        results = self.assistants[name].create_outputs_for_jobs(ids, max_workers=max_workers)
+        for job_id, result in results.items():
+            if not isinstance(result, Exception):
+                self._save(name, job_id, {"documents_path": result})
+        self.conn.commit()
+        return results
@@ -32,6 +32,16 @@ Here are the steps to follow:
 Remember, do not actually perform any searches or provide job listing results. Your task is simply to generate potential queries based on understanding the user's background and interests from the provided context.
 """
 
+# Static prefix shared by every document generation prompt. Keeping the user
+# profile out of the per-job prompts lets providers reuse the cached prefix.
+CANDIDATE_PROFILE_SYSTEM_PROMPT = """
+You are assisting a candidate with their job applications. Everything you know about the candidate is given below, inside the <user_informations> tag. Never make up information that is not in it.
+
+<user_informations>
+{{user_info}}
+</user_informations>
+"""
+
 GENERATE_PROFESSIONAL_SUMMARY_STEP1_PROMPT = """
 You are an experienced HR professional tasked with choosing a relevant, industry-specific adjective for a professional summary.
 
@@ -47,10 +57,6 @@ You are an experienced HR professional tasked with choosing a relevant, industry
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 # EXAMPLES:
 Relevant adjectives could include: passionate, highly motivated, seasoned, ambitious, diligent, thoughtful, proactive, caring, decisive, creative, reliable, solution-oriented
 
@@ -77,10 +83,6 @@ You are an experienced HR professional tasked with stating the job title or prof
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <previous_step>
 {{previous_step}}
 </previous_step>
@@ -119,10 +121,6 @@ You are an experienced HR professional tasked with stating the number of years o
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <previous_step>
 {{previous_step}}
 </previous_step>
@@ -163,10 +161,6 @@ You are an experienced HR professional tasked with listing key specialties or sk
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <previous_step>
 {{previous_step}}
 </previous_step>
@@ -210,10 +204,6 @@ You are an experienced HR professional tasked with combining the previous steps
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <previous_steps>
 {{previous_steps}}
 </previous_steps>
@@ -229,6 +219,51 @@ Your professional summary goes here, using this structure : adjective + title +
 </professional_summary>
 """
 
+GENERATE_PROFESSIONAL_SUMMARY_SINGLE_PROMPT = """
+You are an experienced HR professional tasked with writing a professional summary in a single pass, using the structure: adjective + title + experience + specialties.
+
+# RULES AND GUIDELINES:
+1. adjective: choose an adjective that is really relevant in the user's industry, avoid being too jargony (e.g. passionate, seasoned, diligent, proactive, creative, reliable, solution-oriented)
+2. title: use the job title or describe what the user does. If new to the industry or returning after a break, use "[industry] professional"
+3. experience: include the number of years of experience in the relevant domain (personal projects count), calculated from the <user_informations> tag. Optionally add "with a background in [insert background]"
+4. specialties: comma separated keywords from the job description that are compatible with the user's experience, focused on what the candidate can do for the company
+5. professional summary: combine the 4 previous steps, around 2-3 sentences or 50-75 words
+- Do not mention looking for experience
+- Do not talk about what the user wants (companies want to know what the user will do for them)
+- Do not use personal pronouns (I, me, my)
+- Do not make any information up
+- keep the language used in the job_description
+- If the <fixed_steps> tag is not empty, use its values as they are for the corresponding steps
+
+# CONTEXT:
+<job_description>
+{{job_desc}}
+</job_description>
+
+<fixed_steps>
+{{fixed_steps}}
+</fixed_steps>
+
+# EXAMPLE:
+Développeur logiciel curieux avec 4+ ans d'expérience en backend. Spécialités : intelligence artificielle, algorithmes et structures de données, recherche opérationnelle, tests automatisés, déploiement continu, base de données, microservices, bonne communication.
+
+# OUTPUT:
+Please provide the steps in the following JSON format, then the professional summary:
+
+<output>
+{
+    "adjective": "Your chosen adjective",
+    "title": "Your chosen job title or professional field",
+    "experience": "Your experience statement",
+    "specialties": "Your list of specialties"
+}
+</output>
+
+<professional_summary>
+Your professional summary goes here.
+</professional_summary>
+"""
+
 LATEX_RESUME_PROMPT = """
 You are an experienced HR professional tasked with creating a LaTeX resume based on a given template and user information.
 
@@ -253,10 +288,6 @@ You are an experienced HR professional tasked with creating a LaTeX resume based
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <professional_summary>
 {{professional_summary}}
 </professional_summary>
@@ -340,6 +371,8 @@ Based on your analysis, determine whether the provided URL is a job description
 <answer>
 [Job Description/Job Listing]
 </answer>
+
+If the URL does not allow you to tell, answer "Unsure" instead.
 """
 
 GET_LINKS_PROMPT = """
@@ -362,17 +395,18 @@ Some things to consider:
 - Be cautious of URLs that look like search result pages, job listing pages.
 
 <Examples>
-{"attrs": {"data-gnav-element-name": "About", "class": ["icl-GlobalFooter-link"], "href": "https://ca.indeed.com/about"}} : <answer>no<answer>
-{"attrs": {"data-testid": "relatedQuery", "href": "/q-machine-learning-l-montr%c3%a9al,-qc-jobs.html", "class": ["jobsearch-RelatedQueries-queryItem", "css-bmc2da", "eu4oa1w0"]}} : <answer>no<answer>
-{"attrs": {"id": "job_6156853c8bd089f7", "data-mobtk": "1htomgp8pip8p83q", "data-jk": "6156853c8bd089f7", "data-hiring-event": "false", "data-hide-spinner": "true", "role": "button", "aria-label": "full details of Research Scientist, Computer Vision - Embodied AI (FAIR) | Chercheur en vision artificielle, IA incarn\\xc3\\xa9e (FAIR)", "class": ["jcs-JobTitle", "css-jspxzf", "eu4oa1w0"], "href": "/rc/clk?jk=6156853c8bd089f7&bb=cbRRkUImU_5DE74Jx4Ucc1wg84F_uOcnC1EMXMz6BlzGEyyAKkWBMKvbvbGjD-GRApbjgMgGKzN46yffoM73Usm3VlKBAFts8BcMMmA_LvPQUnmqLrXYlw%3D%3D&xkcb=SoBz67M3B4lM8ExSQB0GbzkdCdPP&fccid=ba07516c418dda52&vjs=3"}} : <answer>yes<answer>
-{"attrs": {"class": ["col", "pt-2", "pb-3"], "href": "/job/205080-titleist-golfer-insights-research-analyst/", "title": "View details for this job"}} : <answer>yes<answer>
-{"attrs": {"href": "/jobs-in-karnataka/bengaluru/"}} : <answer>no<answer>
+{"attrs": {"data-gnav-element-name": "About", "class": ["icl-GlobalFooter-link"], "href": "https://ca.indeed.com/about"}} : <answer>no</answer>
+{"attrs": {"data-testid": "relatedQuery", "href": "/q-machine-learning-l-montr%c3%a9al,-qc-jobs.html", "class": ["jobsearch-RelatedQueries-queryItem", "css-bmc2da", "eu4oa1w0"]}} : <answer>no</answer>
+{"attrs": {"id": "job_6156853c8bd089f7", "data-mobtk": "1htomgp8pip8p83q", "data-jk": "6156853c8bd089f7", "data-hiring-event": "false", "data-hide-spinner": "true", "role": "button", "aria-label": "full details of Research Scientist, Computer Vision - Embodied AI (FAIR) | Chercheur en vision artificielle, IA incarn\\xc3\\xa9e (FAIR)", "class": ["jcs-JobTitle", "css-jspxzf", "eu4oa1w0"], "href": "/rc/clk?jk=6156853c8bd089f7&bb=cbRRkUImU_5DE74Jx4Ucc1wg84F_uOcnC1EMXMz6BlzGEyyAKkWBMKvbvbGjD-GRApbjgMgGKzN46yffoM73Usm3VlKBAFts8BcMMmA_LvPQUnmqLrXYlw%3D%3D&xkcb=SoBz67M3B4lM8ExSQB0GbzkdCdPP&fccid=ba07516c418dda52&vjs=3"}} : <answer>yes</answer>
+{"attrs": {"class": ["col", "pt-2", "pb-3"], "href": "/job/205080-titleist-golfer-insights-research-analyst/", "title": "View details for this job"}} : <answer>yes</answer>
+{"attrs": {"href": "/jobs-in-karnataka/bengaluru/"}} : <answer>no</answer>
 </Examples>
 
 Write your reasoning to find out if this link does or does not go to a job description page inside <reasoning> tags.
 Then provide the answer in the <answer> tag.
 
 Based on analyzing the "href" attribute and URL structure, do you believe this "a" element most likely links to a job details page? Provide your reasoning and then give a yes or no answer inside <answer> tags.
+If the attributes do not allow you to tell, answer "unsure" instead.
 </Instructions>
 """
 
@@ -430,7 +464,7 @@ This is an example of what a salary comparison might look like :
 </example_salary_comparison>
 """
 
-JOB_RELEVANCE_PROMPT = """
+JOB_RELEVANCE_SYSTEM_PROMPT = """
 You will be acting as an experienced HR professional specializing in the following domains:
 
 <DOMAIN_OF_INTEREST>
@@ -450,11 +484,7 @@ This is the user description in markdown (including who he is, what he is lookin
 {{USER_CONTEXT}}
 </USER_CONTEXT>
 
-The job description will be provided in markdown format, similar to what you might find on job search websites like Indeed:
-
-<JOB_DESCRIPTION>
-{{JOB_DESCRIPTION}}
-</JOB_DESCRIPTION>
+The job description will be provided in markdown format, similar to what you might find on job search websites like Indeed, inside <JOB_DESCRIPTION> tags.
 
 To determine the relevance of the job, use <thinking> tags to compare the day-to-day responsibilities of the job with what the user is looking for. Also, compare the experiences and qualifications required for the job with the user's existing experiences and qualifications.
 
@@ -500,8 +530,16 @@ OR
 <answer>not relevant</answer>
 """
 
+JOB_RELEVANCE_PROMPT = """
+<JOB_DESCRIPTION>
+{{JOB_DESCRIPTION}}
+</JOB_DESCRIPTION>
+
+Is this job relevant for the user? Provide your final answer inside <answer> tags, using only "relevant" or "not relevant".
+"""
+
 #todo améliorer les examples en montrant le cv, l'envie, la description du job, comment réfléchir et quel score donner
-JOB_SCORE_PROMPT = """
+JOB_SCORE_SYSTEM_PROMPT = """
 You are an experience HR.
 Your goal is to score the fitting of a job for the user based on what he wants to do, his experiences, and the job description.
 
@@ -545,11 +583,7 @@ This is the user description in markdown (including who he is, what he is lookin
 {{USER_CONTEXT}}
 </USER_CONTEXT>
 
-The job description will be provided in markdown format, similar to what you might find on job search websites like Indeed:
-
-<JOB_DESCRIPTION>
-{{JOB_DESCRIPTION}}
-</JOB_DESCRIPTION>
+The job description will be provided in markdown format, similar to what you might find on job search websites like Indeed, inside <JOB_DESCRIPTION> tags.
 
 ## ANSWER EXAMPLES
 
@@ -560,7 +594,14 @@ Based on your analysis, provide your final answer inside <answer> tags, using on
 <thinking>
 <answer>0</answer>
 </ANSWER_EXAMPLE1>
+"""
+
+JOB_SCORE_PROMPT = """
+<JOB_DESCRIPTION>
+{{JOB_DESCRIPTION}}
+</JOB_DESCRIPTION>
 
+Score this job for the user. Provide your final answer inside <answer> tags, using only the score.
 """
 
 JOB_SCORE_PROMPT2 = """
@@ -655,13 +696,9 @@ Please carefully read through the job description and identify the key pain poin
 
 CONNECT_WITH_READER_PROMPT = """
 Roleplay as the user. You are applying for a new job.
-Write an attention-grabbing hook for your cover letter that highlights your experience and qualifications in a way that shows you empathize and can successfully take on the challenges and pain points of the {{job_title}} role
+Write an attention-grabbing hook for your cover letter that highlights your experience and qualifications in a way that shows you empathize and can successfully take on the challenges and pain points of the role described in the job description
 Consider incorporating specific examples of how you've tackled these challenges and pain points in your past work, and explore creative ways to express your enthusiasm for the opportunity. Keep your hook within 100 words.
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <job_description>
 {{job_desc}}
 </job_description>
@@ -694,10 +731,6 @@ You are an experienced HR professional tasked with writing a cover letter for a
 {{job_desc}}
 </job_description>
 
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <current_cover_letter>
 {{cover_letter}}
 </current_cover_letter>
@@ -721,10 +754,6 @@ You are an experienced HR professional tasked with writing a cover letter for a
 - use the data given in CONTEXT to fill up the template
 
 # CONTEXT
-<user_informations>
-{{user_info}}
-</user_informations>
-
 <cover_letter>
 {{cover_letter}}
 </cover_letter>
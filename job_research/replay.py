@@ -0,0 +1,358 @@
+"""
+Record / Replay Module
+
+Offline stand-ins for every paid or networked dependency of the pipeline:
+- LLM calls (llm.query_llm)
+- Serper searches (serper_tool.search_serper)
+- HTTP fetches (Scraper.process_request)
+
+Modes:
+- off: calls go straight to the real services (default)
+- record: calls go to the real services and each request/response pair is
+  saved to a fixture store (one JSON file per request, grouped by kind)
+- replay: responses are served from the fixture store without any network
+  access, with configurable simulated latency and error rates
+
+The mode is read from the environment (JOB_RESEARCH_REPLAY_MODE,
+JOB_RESEARCH_FIXTURES, JOB_RESEARCH_REPLAY_KINDS, JOB_RESEARCH_REPLAY_LATENCY,
+JOB_RESEARCH_REPLAY_ERROR_RATE, JOB_RESEARCH_REPLAY_SEED) or set
+programmatically with configure(). Restricting the kinds (e.g. "llm,serper")
+lets the other calls go to the real services.
+
+A StubServer is also provided: a local HTTP server serving recorded or
+synthetic pages, so the real scraping code path can be exercised against
+localhost.
+"""
+
+import base64
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+MODES = ("off", "record", "replay")
+KINDS = ("llm", "serper", "http")
+
+# Query parameters never written to fixtures (ScrapeOps proxy URLs carry the API key)
+SECRET_PARAMS = ("api_key",)
+
+
+class ReplayError(Exception):
+    """Raised for simulated failures and for requests missing from the fixture store"""
+
+
+class FixtureNotFound(ReplayError):
+    """Raised in replay mode when no fixture matches a request"""
+
+
+def strip_secrets(url: str) -> str:
+    """Remove secret query parameters from a URL"""
+    parsed = urlparse(url)
+    if not parsed.query:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in SECRET_PARAMS]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def fixture_key(request: dict) -> str:
+    """Stable hash of a request description"""
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """
+    Directory of recorded request/response pairs.
+
+    Layout: <directory>/<kind>/<sha256 of request>.json, each file holding
+    {"request": ..., "response": ...}.
+
+    Args:
+        directory: Root directory of the store
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def save(self, kind: str, request: dict, response):
+        """Save a response for the given request, replacing any previous one"""
+        path = self._path(kind, fixture_key(request))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"request": request, "response": response}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def load(self, kind: str, request: dict):
+        """Return the recorded response for a request, raising FixtureNotFound if absent"""
+        path = self._path(kind, fixture_key(request))
+        if not os.path.exists(path):
+            raise FixtureNotFound(f"No {kind} fixture for request {request}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["response"]
+
+    def entries(self, kind: str):
+        """Iterate over the (request, response) pairs recorded for a kind"""
+        kind_dir = os.path.join(self.directory, kind)
+        if not os.path.isdir(kind_dir):
+            return
+        for name in sorted(os.listdir(kind_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(kind_dir, name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                yield data["request"], data["response"]
+
+
+def _parse_float_env(name: str, default: float = 0.0) -> float:
+    value = os.environ.get(name, "")
+    return float(value) if value else default
+
+
+def _config_from_env() -> dict:
+    return {
+        "mode": os.environ.get("JOB_RESEARCH_REPLAY_MODE", "off"),
+        "kinds": tuple(k for k in os.environ.get("JOB_RESEARCH_REPLAY_KINDS", ",".join(KINDS)).split(",") if k),
+        "store": FixtureStore(os.environ.get("JOB_RESEARCH_FIXTURES", "fixtures")),
+        "latency": _parse_float_env("JOB_RESEARCH_REPLAY_LATENCY"),
+        "error_rate": _parse_float_env("JOB_RESEARCH_REPLAY_ERROR_RATE"),
+        "responders": {},
+        "rng": random.Random(os.environ.get("JOB_RESEARCH_REPLAY_SEED")),
+    }
+
+
+_config = _config_from_env()
+_rng_lock = threading.Lock()
+
+
+def configure(mode: str = None, directory: str = None, latency=None, error_rate=None,
+              responders: dict = None, seed=None, kinds=None):
+    """
+    Change the record/replay configuration for the current process.
+
+    Args:
+        mode: "off", "record" or "replay"
+        directory: Fixture store directory
+        latency: Simulated latency in seconds for replayed calls. Either a number,
+                 a (min, max) tuple, or a dict mapping kind ("llm", "serper",
+                 "http") to one of those
+        error_rate: Probability of a simulated failure per replayed call, as a
+                    number or a dict mapping kind to a number
+        responders: Dict mapping kind to a callable(request) -> response used in
+                    replay mode when no fixture matches (synthetic services)
+        seed: Seed for the latency/error random generator
+        kinds: Kinds of calls routed through the layer (default all of KINDS);
+               the other kinds always go to the real services
+    """
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unsupported replay mode: {mode}")
+        _config["mode"] = mode
+    if directory is not None:
+        _config["store"] = FixtureStore(directory)
+    if latency is not None:
+        _config["latency"] = latency
+    if error_rate is not None:
+        _config["error_rate"] = error_rate
+    if responders is not None:
+        _config["responders"] = dict(responders)
+    if seed is not None:
+        _config["rng"] = random.Random(seed)
+    if kinds is not None:
+        _config["kinds"] = tuple(kinds)
+
+
+def get_mode() -> str:
+    """Return the current record/replay mode"""
+    return _config["mode"]
+
+
+def _for_kind(setting, kind: str):
+    return setting.get(kind, 0) if isinstance(setting, dict) else setting
+
+
+def simulate_latency(kind: str, latency=None):
+    """Sleep for the configured latency of a kind of call"""
+    value = _for_kind(_config["latency"] if latency is None else latency, kind)
+    if isinstance(value, (tuple, list)):
+        with _rng_lock:
+            value = _config["rng"].uniform(*value)
+    if value:
+        time.sleep(value)
+
+
+def should_fail(kind: str, error_rate=None) -> bool:
+    """Draw whether a replayed call of the given kind should fail"""
+    rate = _for_kind(_config["error_rate"] if error_rate is None else error_rate, kind)
+    if not rate:
+        return False
+    with _rng_lock:
+        return _config["rng"].random() < rate
+
+
+def replayable(kind: str, request_fn, encode=None, decode=None, error_response=None):
+    """
+    Decorator routing a function through the record/replay layer.
+
+    Args:
+        kind: Fixture group name ("llm", "serper", "http")
+        request_fn: Callable taking the wrapped function's arguments and returning
+                    a JSON-serializable description of the request (the fixture key)
+        encode: Optional callable turning the response into JSON-serializable data
+        decode: Optional callable turning stored data back into a response
+        error_response: Optional callable(request) returning the response of a
+                        simulated failure. If None, simulated failures raise ReplayError
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = _config["mode"]
+            if mode == "off" or kind not in _config["kinds"]:
+                return fn(*args, **kwargs)
+            request = request_fn(*args, **kwargs)
+            if mode == "record":
+                response = fn(*args, **kwargs)
+                _config["store"].save(kind, request, encode(response) if encode else response)
+                return response
+
+            simulate_latency(kind)
+            if should_fail(kind):
+                if error_response is None:
+                    raise ReplayError(f"Simulated {kind} failure for request {request}")
+                return error_response(request)
+            try:
+                data = _config["store"].load(kind, request)
+            except FixtureNotFound:
+                responder = _config["responders"].get(kind)
+                if responder is None:
+                    raise
+                return responder(request)
+            return decode(data) if decode else data
+        return wrapper
+    return decorator
+
+
+def encode_http(response: tuple) -> dict:
+    """Serialize a (status, content) tuple returned by Scraper.process_request"""
+    status, content = response
+    if isinstance(content, bytes):
+        return {"status": status, "content_b64": base64.b64encode(content).decode("ascii")}
+    return {"status": status, "content": content}
+
+
+def decode_http(data: dict) -> tuple:
+    """Deserialize a stored Scraper.process_request response"""
+    if "content_b64" in data:
+        return data["status"], base64.b64decode(data["content_b64"])
+    return data["status"], data["content"]
+
+
+class StubServer:
+    """
+    Local HTTP server serving fixed pages, for offline scraping runs.
+
+    Pages are registered by path (including the query string). Unknown paths
+    return 404. Simulated latency and error rates apply to every request.
+
+    Args:
+        host: Interface to bind (default localhost)
+        port: Port to bind (0 picks a free port)
+        latency: Simulated latency in seconds (number or (min, max) tuple)
+        error_rate: Probability of answering 500 instead of the page
+        seed: Seed for the latency/error random generator
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=None):
+        self.pages = {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, path: str) -> str:
+        """Return the absolute URL of a registered path"""
+        return self.base_url + (path if path.startswith("/") else "/" + path)
+
+    def add_page(self, path: str, body, status: int = 200, content_type: str = "text/html; charset=utf-8",
+                 headers: dict = None):
+        """Register the response served for a path"""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        path = path if path.startswith("/") else "/" + path
+        self.pages[path] = (status, body, content_type, headers or {})
+
+    def add_fixtures(self, store: FixtureStore):
+        """Register every recorded HTTP fixture under the path of its original URL"""
+        for request, response in store.entries("http"):
+            status, content = decode_http(response)
+            parsed = urlparse(request["url"])
+            path = parsed.path or "/"
+            if parsed.query:
+                path += "?" + parsed.query
+            self.add_page(path, content if isinstance(content, bytes) else b"", status)
+
+    def _handle(self, handler):
+        with self.lock:
+            self.request_count += 1
+            delay = self.rng.uniform(*self.latency) if isinstance(self.latency, (tuple, list)) else self.latency
+            fail = self.error_rate and self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            status, body, content_type, headers = 500, b"simulated error", "text/plain", {}
+        else:
+            status, body, content_type, headers = self.pages.get(
+                handler.path, (404, b"not found", "text/plain", {}))
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        try:
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client aborted the download (e.g. body too large)
+            pass
+
+    def start(self):
+        """Serve requests in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -9,29 +9,60 @@ from dotenv import load_dotenv
 import os
 
 import requests
-from fake_useragent import UserAgent
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+from replay import replayable, strip_secrets, encode_http, decode_http
+from fetch_strategy import FetchStrategyLearner, DIRECT
+from block_detector import classify_page, OK, EMPTY
+from user_agents import random_user_agent
 
 
 """
 A robust web scraping utility that implements a multi-tiered approach to handle protected websites:
-1. First attempts normal scraping with rotating user agents
-2. Falls back to ScrapeOps proxy service if normal scraping fails
-3. Tracks per-domain difficulty levels to optimize ScrapeOps token usage
-4. Implements exponential backoff for retries
+1. Normal scraping with rotating user agents (bundled pool, see user_agents)
+2. ScrapeOps proxy service, with protection levels 0-3
+3. Per-domain strategy learning to optimize ScrapeOps token usage
+4. Exponential backoff between free retries
+5. Streaming downloads with connect/read timeouts, a maximum body size,
+   early abort on non HTML content types and compressed transfers
+6. Optional raw page archive (see archive.PageArchive) keeping every fetched
+   page for offline reprocessing
 
 The strategy minimizes paid API calls by:
-- Attempting free scraping methods first
-- Remembering which domains need higher protection levels
-- Using appropriate protection level immediately for known difficult sites
+- Recording, per domain and strategy, success rate, latency and credits spent (with time decay)
+- Starting with the cheapest strategy likely to succeed: free scraping for
+  unknown or easy domains, the known working level for difficult sites
+- Escalating to the next level on failure, including 200 responses that are
+  bot challenges, captchas or empty pages (see block_detector), and probing cheaper strategies
+  again from time to time so that domains de-escalate when a site relaxes
+
+Aborted downloads answer 413 (body too large) or 415 (unsupported content
+type) and are not retried.
 
 Database:
-- Maintains a SQLite database (webdomains.db) to track domain difficulty levels
+- Maintains a SQLite database (webdomains.db) with per-domain strategy stats
+  (fetch_stats) and the last working ScrapeOps level of each domain (webdomains)
 - Levels 0-3 correspond to increasing ScrapeOps protection strengths
 """
 
 
+def _http_request(scraper, url: str, headers: dict = None, proxies: dict = None, max_body_size: int = None) -> dict:
+    """Describe a fetch for the record/replay fixture store (API keys stripped from the URL)"""
+    return {"url": strip_secrets(url)}
+
+
+# Content types worth downloading (anything else is aborted after the headers)
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml",
+                         "application/json", "application/ld+json")
+
+# Statuses that are a final answer for a URL, never retried with another strategy
+DEFINITIVE_STATUS_CODES = (404, 413, 415)
+
+
 class Scraper:
-    def __init__(self, api_key, max_retries=1, initial_delay=2, backoff_factor=2, handled_status_codes=None):
+    def __init__(self, api_key, max_retries=1, initial_delay=2, backoff_factor=2, handled_status_codes=None, metrics=None,
+                 connect_timeout=10, read_timeout=30, max_body_size=5_000_000, max_api_body_size=100_000_000,
+                 archive=None):
         """
         Initialize scraper with retry strategy and database connection.
         
@@ -41,24 +72,43 @@ class Scraper:
             initial_delay: Starting delay between retries in seconds
             backoff_factor: Multiplier for exponential backoff
             handled_status_codes: HTTP status codes that trigger retries
+            metrics: Optional MetricsRegistry counting rejected responses and aborted downloads
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Max seconds between two received bytes
+            max_body_size: Max decoded body size in bytes, larger downloads are aborted
+            max_api_body_size: Max decoded body size of JSON API responses (see fetch_api), which
+                               hold every job of a board
+            archive: Optional PageArchive storing every successfully fetched page
         """
-        self.conn = sqlite3.connect('webdomains.db')
+        self.conn = sqlite3.connect('webdomains.db', check_same_thread=False)
         self.c = self.conn.cursor()
         self.c.execute('''CREATE TABLE IF NOT EXISTS webdomains
                           (domain TEXT PRIMARY KEY, level INTEGER)''')
-        self.ua = UserAgent()
         self.proxies = []
         self.max_retries = max_retries
         self.initial_delay = initial_delay
         self.backoff_factor = backoff_factor
         self.handled_status_codes = handled_status_codes or [403, 404, 429, 500]
         self.api_key = api_key
+        self.strategy = FetchStrategyLearner('webdomains.db')
+        self.metrics = metrics
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_body_size = max_body_size
+        self.max_api_body_size = max_api_body_size
+        self.archive = archive
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = DEFAULT_ACCEPT_ENCODING
         logging.basicConfig(filename='scraper.log', level=logging.INFO,
                             format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
 
     def __del__(self):
         self.conn.close()
 
+    def _count_abort(self, reason: str):
+        logging.warning(f"Download aborted: {reason}")
+        if self.metrics is not None:
+            self.metrics.incr("fetch_aborted_total", reason=reason)
+
     def insert_or_update(self, domain, level):
         """Update domain's difficulty level in database, creating entry if needed"""
         try:
@@ -95,68 +145,178 @@ class Scraper:
         proxy_url = 'https://proxy.scrapeops.io/v1/?' + urlencode(payload)
         return proxy_url
 
-    def process_request(self, url: str, headers: dict = None, proxies: dict = None):
+    @replayable("http", _http_request, encode=encode_http, decode=decode_http,
+                error_response=lambda request: (500, []))
+    def process_request(self, url: str, headers: dict = None, proxies: dict = None, max_body_size: int = None):
         """
         Make HTTP request and handle response.
+        The body is streamed: non HTML content types and bodies larger than
+        max_body_size (default: the scraper's) are aborted (status 415 / 413).
         Returns tuple of (status_code, content or empty list if failed)
         """
-        response = requests.get(url, headers=headers, proxies=proxies)
-        status = response.status_code
+        max_body_size = max_body_size or self.max_body_size
+        try:
+            response = self.session.get(url, headers=headers, proxies=proxies, timeout=self.timeout, stream=True)
+        except requests.Timeout:
+            self._count_abort("timeout")
+            raise
+        with response:
+            status = response.status_code
+            if status in self.handled_status_codes:
+                print("status: ", status)
+                return (status, [])
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in ALLOWED_CONTENT_TYPES:
+                self._count_abort("content_type")
+                print(f"Skipping {content_type} content: {strip_secrets(url)}")
+                return (415, [])
+            if int(response.headers.get("Content-Length") or 0) > max_body_size:
+                self._count_abort("too_large")
+                return (413, [])
+            chunks = []
+            size = 0
+            try:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > max_body_size:
+                        self._count_abort("too_large")
+                        return (413, [])
+                    chunks.append(chunk)
+            except requests.Timeout:
+                self._count_abort("timeout")
+                raise
+            logging.info(f"Successfully scraped URL: {strip_secrets(url)}")
+            return (status, b"".join(chunks))
+
+    def check_response(self, status: int, data, strategy: int = DIRECT) -> bool:
+        """
+        Whether a response is a usable answer for the strategy that fetched it.
+
+        Error statuses and block pages (captcha, bot challenge) are failures.
+        Empty pages are failures for free requests only: a proxy returning an
+        empty page means the page is empty. DEFINITIVE_STATUS_CODES (not
+        found, aborted downloads) are final answers.
+        """
+        if status in DEFINITIVE_STATUS_CODES:
+            return True
         if status in self.handled_status_codes:
-            print("status: ", status)
-            return (status, [])
-        else:
-            logging.info(f"Successfully scraped URL: {url}")
-            return (status, response.content)
+            return False
+        verdict, reason = classify_page(data, status)
+        if verdict == OK or (verdict == EMPTY and strategy != DIRECT):
+            return True
+        logging.warning(f"Response classified as {verdict} ({reason})")
+        print(f"Response classified as {verdict} ({reason})")
+        if self.metrics is not None:
+            self.metrics.incr("fetch_rejected_total", verdict=verdict)
+        return False
 
-    def retry_with_scrapeops(self, url: str) -> Iterator[dict]:
+    def _fetch_with(self, url: str, strategy: int) -> tuple:
+        """
+        Fetch a URL with a single strategy. Free requests are retried with
+        exponential backoff up to max_retries times.
+        Returns tuple of (status_code, content or empty list if failed, whether
+        the response passed check_response)
+        """
+        if strategy != DIRECT:
+            status, data = self.process_request(self.get_scrapeops_url(url, strategy))
+            return status, data, self.check_response(status, data, strategy)
+        delay = self.initial_delay
+        status, data, success = 0, [], False
+        for retry_count in range(self.max_retries):
+            if retry_count:
+                print(f"Error {status} occurred for URL: {url}, retrying in {delay}s ...")
+                time.sleep(delay)
+                delay *= self.backoff_factor
+            headers = {'User-Agent': random_user_agent()}
+            status, data = self.process_request(url, headers=headers, proxies=self.get_random_proxy())
+            success = self.check_response(status, data)
+            if success:
+                break
+            logging.warning(f"Error {status} occurred for URL: {url}")
+        return status, data, success
+
+    def fetch(self, url: str, allow_direct: bool = True):
         """
-        Fallback method using ScrapeOps proxy service.
-        Incrementally tries higher protection levels if needed.
-        Remembers successful level for future requests to same domain.
+        Fetch a URL with the strategies planned for its domain, escalating on
+        failure and recording every outcome.
+
+        Args:
+            url: URL to fetch
+            allow_direct: Allow the free request (False to go through ScrapeOps only)
+
+        Returns:
+            Page content, or "" if every strategy failed
         """
         domain = self.get_domain_name(url)
-        lvl = self.get_level(domain) or 0
-        if lvl > 3:
-            print(f"lvl: {lvl} has reach max for url {url}")
-            return ""
-        proxy_url = self.get_scrapeops_url(url, lvl)
-        status, data = self.process_request(proxy_url)
-        if status == 500:
-            self.insert_or_update(domain, lvl + 1)
-            return self.retry_with_scrapeops(url)
-        logging.info(f"Successfully scraped URL: {url} with level {lvl}")
-        print(f"Successfully scraped URL: {url} with level {lvl}")
-        return "" if status in self.handled_status_codes else data
-
-    def retry_with_backoff(self, url: str, retry_count: int = 0, delay: int = None) -> Iterator[dict]:
-        """
-        Main entry point for scraping. Implements exponential backoff retry strategy.
-        First attempts normal scraping with rotating user agents and optional proxies.
-        Falls back to ScrapeOps if max retries exceeded.
-        """
-        delay = delay or self.initial_delay
-        if retry_count >= self.max_retries:
-            logging.error(f"Maximum retries reached for URL: {url}. Retrying using ScrapeOps.")
-            print(f"Maximum retries reached for URL: {url}. Retrying using ScrapeOps.")
-            time.sleep(delay)
-            return self.retry_with_scrapeops(url)
+        if not self.strategy.known(domain):
+            level = self.get_level(domain)
+            if level is not None:
+                self.strategy.seed(domain, min(level, 3))
+        strategies = self.strategy.plan(domain, allow_direct)
+        if not self.api_key:
+            strategies = [DIRECT] if allow_direct else []
+        for strategy in strategies:
+            start = time.perf_counter()
+            try:
+                status, data, success = self._fetch_with(url, strategy)
+            except Exception as e:
+                logging.error(f"An error occurred for URL: {url} with strategy {strategy}, Error: {e}")
+                print(f"An error occurred for URL: {url}, Error: {e}")
+                status, data, success = 0, [], False
+            self.strategy.record(domain, strategy, success, time.perf_counter() - start)
+            if success:
+                if strategy != DIRECT:
+                    self.insert_or_update(domain, strategy)
+                    logging.info(f"Successfully scraped URL: {url} with level {strategy}")
+                if not data or status in self.handled_status_codes:
+                    return ""
+                if self.archive is not None:
+                    self.archive.put(url, data)
+                return data
+            logging.warning(f"Strategy {strategy} failed for URL: {url} (status {status}), escalating")
+        print(f"Every strategy failed for URL: {url}")
+        return ""
+
+    def fetch_api(self, url: str):
+        """
+        Fetch a public JSON API with a single free request. The response is
+        not classified as a page and the outcome is not recorded by the
+        strategy learner: a short JSON body is not an empty page, and an API
+        error must not push the domain's web pages to ScrapeOps.
 
+        Returns:
+            Response body, or "" if the request failed
+        """
+        headers = {"User-Agent": random_user_agent(), "Accept": "application/json"}
         try:
-            headers = {'User-Agent': self.ua.random}
-            proxy = self.get_random_proxy()
-            status, data = self.process_request(url, headers=headers, proxies=proxy)
-            if status in self.handled_status_codes:
-                logging.warning(f"Error {status} occurred for URL: {url}, retrying...")
-                print(f"Error {status} occurred for URL: {url}, retrying in {delay}s ...")
-                time.sleep(delay)
-                return self.retry_with_backoff(url, retry_count + 1, delay * self.backoff_factor)
-            return data
-        except Exception as e:
-            logging.error(f"An error occurred for URL: {url}, Error: {e}")
-            print(f"An error occurred for URL: {url}, Error: {e}")
-            time.sleep(delay)
-            return self.retry_with_backoff(url, retry_count + 1, delay * self.backoff_factor)
+            status, data = self.process_request(url, headers=headers, max_body_size=self.max_api_body_size)
+        except requests.RequestException as e:
+            logging.error(f"An error occurred for API URL: {strip_secrets(url)}, Error: {e}")
+            print(f"An error occurred for API URL: {strip_secrets(url)}, Error: {e}")
+            return ""
+        if status == 413:
+            logging.warning(f"API response larger than {self.max_api_body_size} bytes, cut off: {strip_secrets(url)}")
+            print(f"API response larger than {self.max_api_body_size} bytes, cut off: {strip_secrets(url)}")
+            return ""
+        if not 200 <= status < 300 or not data:
+            logging.warning(f"Error {status} occurred for API URL: {strip_secrets(url)}")
+            return ""
+        return data
+
+    def retry_with_scrapeops(self, url: str) -> Iterator[dict]:
+        """
+        Fetch through the ScrapeOps proxy service only, starting at the level
+        learned for the domain and escalating if needed.
+        """
+        return self.fetch(url, allow_direct=False)
+
+    def retry_with_backoff(self, url: str) -> Iterator[dict]:
+        """
+        Main entry point for scraping. Starts with the cheapest strategy likely
+        to succeed for the domain (free request with rotating user agents and
+        optional proxies, or ScrapeOps) and escalates on failure.
+        """
+        return self.fetch(url)
 
     def save_to_csv(self, data: Iterator[dict], filename: str) -> None:
         """Save scraped data to CSV file with UTF-8 encoding"""
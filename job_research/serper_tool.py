@@ -1,6 +1,6 @@
 import json
 import os
-import requests
+from replay import replayable
 
 
 """
@@ -15,6 +15,16 @@ The tool:
 """
 
 
+# (connect, read) timeouts of the Serper API call, in seconds
+SERPER_TIMEOUT = (5, 30)
+
+
+def _serper_request(search_query, limit=10):
+    """Describe a Serper search for the record/replay fixture store"""
+    return {"q": search_query, "num": limit}
+
+
+@replayable("serper", _serper_request)
 def search_serper(search_query, limit=10):
     """
     Perform a Google search via Serper API and return formatted results.
@@ -29,13 +39,15 @@ def search_serper(search_query, limit=10):
             - query: Original search query
         Or raw API response if no organic results found
     """
+    import requests
+
     search_url: str = "https://google.serper.dev/search"
     payload = json.dumps({"q": search_query, "num":limit})
     headers = {
         'X-API-KEY': os.environ['SERPER_API_KEY'],
         'content-type': 'application/json'
     }
-    response = requests.request("POST", search_url, headers=headers, data=payload)
+    response = requests.request("POST", search_url, headers=headers, data=payload, timeout=SERPER_TIMEOUT)
     results = response.json()
 
     if 'organic' in results:
@@ -0,0 +1,239 @@
+"""
+Structured Job Data Extraction
+
+Many job pages embed a schema.org JobPosting, as JSON-LD
+(<script type="application/ld+json">) or as microdata (itemtype/itemprop
+attributes). When a page holds exactly one complete posting (a title and a
+description of at least MIN_DESCRIPTION_CHARS), it is mapped to the jobs
+columns locally:
+- title: title
+- company: hiringOrganization.name
+- location: jobLocation address (locality, region, country), "Remote" for
+  jobLocationType TELECOMMUTE
+- salary: baseSalary (min-max or value, currency and unit)
+- description: HTML description converted to markdown
+
+and the LLM formatter is not needed. Pages with several postings are
+listings; pages without a complete posting go through the LLM as before.
+
+Pages are only parsed when they contain the word JobPosting.
+"""
+
+import html
+import json
+import re
+
+# Shortest description accepted without the LLM formatter
+MIN_DESCRIPTION_CHARS = 200
+
+_JOB_POSTING_RE = re.compile(r"schema\.org/JobPosting$", re.IGNORECASE)
+_BLOCK_TAGS = {"p", "div", "section", "article", "header", "footer", "table", "tr", "blockquote", "pre"}
+
+
+def _has_job_posting_marker(content) -> bool:
+    if isinstance(content, bytes):
+        return b"JobPosting" in content
+    return isinstance(content, str) and "JobPosting" in content
+
+
+def _is_job_posting(node) -> bool:
+    types = node.get("@type") if isinstance(node, dict) else None
+    types = types if isinstance(types, list) else [types]
+    return any(isinstance(t, str) and t.split("/")[-1] == "JobPosting" for t in types)
+
+
+def _walk_json_ld(node, found: list):
+    if isinstance(node, list):
+        for item in node:
+            _walk_json_ld(item, found)
+    elif isinstance(node, dict):
+        if _is_job_posting(node):
+            found.append(node)
+        else:
+            for key in ("@graph", "itemListElement", "item", "mainEntity"):
+                if key in node:
+                    _walk_json_ld(node[key], found)
+
+
+def _microdata_value(element, name: str):
+    if element.name == "meta":
+        return element.get("content", "")
+    if element.name in ("a", "link"):
+        return element.get("href", "")
+    if element.name == "time":
+        return element.get("datetime") or element.get_text(" ", strip=True)
+    if name == "description":
+        return element.decode_contents()
+    return element.get("content") or element.get_text(" ", strip=True)
+
+
+def _microdata_item(element) -> dict:
+    """Properties of a microdata item, nested items as dicts"""
+    data = {}
+    for prop in element.find_all(attrs={"itemprop": True}):
+        if prop.find_parent(attrs={"itemscope": True}) is not element:
+            continue
+        value = _microdata_item(prop) if prop.has_attr("itemscope") else _microdata_value(prop, prop["itemprop"])
+        for name in prop["itemprop"].split():
+            data.setdefault(name, value)
+    return data
+
+
+def find_job_postings(soup) -> list:
+    """
+    JobPosting objects of a parsed page, from JSON-LD then microdata.
+
+    Returns:
+        list: (source, posting dict) with source "json-ld" or "microdata"
+    """
+    postings = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "", strict=False)
+        except ValueError:
+            continue
+        found = []
+        _walk_json_ld(data, found)
+        postings += [("json-ld", posting) for posting in found]
+    if not postings:
+        for element in soup.find_all(attrs={"itemtype": _JOB_POSTING_RE}):
+            postings.append(("microdata", _microdata_item(element)))
+    return postings
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get("name", "")
+    return html.unescape(str(value)).strip() if value is not None else ""
+
+
+def _location(posting: dict) -> str:
+    places = posting.get("jobLocation") or []
+    places = places if isinstance(places, list) else [places]
+    locations = []
+    for place in places:
+        address = place.get("address", place) if isinstance(place, dict) else place
+        if isinstance(address, dict):
+            parts = [_text(address.get(key)) for key in ("addressLocality", "addressRegion", "addressCountry")]
+            location = ", ".join(part for part in parts if part)
+        else:
+            location = _text(address)
+        if location and location not in locations:
+            locations.append(location)
+    if "TELECOMMUTE" in str(posting.get("jobLocationType", "")).upper():
+        locations.append("Remote")
+    return "; ".join(locations)
+
+
+def _number(value) -> str:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return _text(value)
+    return f"{number:,.0f}" if number == int(number) else f"{number:,.2f}"
+
+
+def _salary(posting: dict) -> str:
+    salary = posting.get("baseSalary") or posting.get("estimatedSalary")
+    if isinstance(salary, list):
+        salary = salary[0] if salary else None
+    if not isinstance(salary, dict):
+        return _text(salary)
+    value = salary.get("value", salary)
+    unit = ""
+    if isinstance(value, dict):
+        unit = _text(value.get("unitText"))
+        if value.get("minValue") is not None and value.get("maxValue") is not None:
+            amount = f"{_number(value['minValue'])} - {_number(value['maxValue'])}"
+        else:
+            amount = _number(value.get("value", value.get("minValue", value.get("maxValue"))))
+    else:
+        amount = _number(value)
+    if not amount:
+        return ""
+    currency = _text(salary.get("currency"))
+    return " ".join(part for part in (amount, currency) if part) + (f" / {unit.lower()}" if unit else "")
+
+
+def _markdown(node) -> str:
+    from bs4 import Comment, NavigableString
+
+    if isinstance(node, Comment):
+        return ""
+    if isinstance(node, NavigableString):
+        return re.sub(r"\s+", " ", str(node))
+    name = node.name
+    if name in ("script", "style", "noscript"):
+        return ""
+    if name == "br":
+        return "\n"
+    inner = "".join(_markdown(child) for child in node.children)
+    if re.fullmatch(r"h[1-6]", name):
+        return f"\n\n{'#' * int(name[1])} {inner.strip()}\n\n"
+    if name == "li":
+        marker = "1." if node.parent is not None and node.parent.name == "ol" else "-"
+        return f"\n{marker} {inner.strip()}"
+    if name in ("ul", "ol"):
+        return f"\n{inner}\n\n"
+    if name in ("strong", "b") and inner.strip():
+        return f"**{inner.strip()}**"
+    if name in ("em", "i") and inner.strip():
+        return f"*{inner.strip()}*"
+    if name in _BLOCK_TAGS:
+        return f"\n\n{inner.strip()}\n\n"
+    return inner
+
+
+def html_to_markdown(text: str) -> str:
+    """Convert an HTML fragment (headings, paragraphs, lists, emphasis) to markdown"""
+    from bs4 import BeautifulSoup
+
+    markdown = _markdown(BeautifulSoup(text, "html.parser"))
+    lines = [line.strip() for line in markdown.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def posting_to_job(posting: dict) -> dict:
+    """Map a JobPosting to the jobs columns (title, company, location, salary, description)"""
+    description = posting.get("description") or ""
+    if isinstance(description, list):
+        description = " ".join(str(part) for part in description)
+    return {
+        "title": _text(posting.get("title") or posting.get("name")),
+        "company": _text(posting.get("hiringOrganization")),
+        "location": _location(posting),
+        "salary": _salary(posting),
+        "description": html_to_markdown(html.unescape(str(description))),
+    }
+
+
+def extract_job_posting(content):
+    """
+    Job details of a page holding exactly one complete JobPosting.
+
+    Args:
+        content: Raw page (bytes or str)
+
+    Returns:
+        tuple|None: (source, job dict with title, company, location, salary and
+                    description), None when the LLM formatter is needed
+    """
+    postings = page_job_postings(content)
+    if len(postings) != 1:
+        return None
+    source, posting = postings[0]
+    job = posting_to_job(posting)
+    if not job["title"] or len(job["description"]) < MIN_DESCRIPTION_CHARS:
+        return None
+    return source, job
+
+
+def page_job_postings(content) -> list:
+    """JobPosting objects of a raw page (see find_job_postings), without parsing pages that have none"""
+    if not _has_job_posting_marker(content):
+        return []
+    from bs4 import BeautifulSoup
+
+    return find_job_postings(BeautifulSoup(content, "html.parser"))
@@ -0,0 +1,103 @@
+"""
+Professional Summary Step Cache
+
+Steps 1-2 of the professional summary (adjective and job title) only depend on
+the kind of role and on the candidate, so they are reused across jobs with a
+similar title. Entries are stored in the summary_steps table of jobs.db, keyed
+by:
+- title cluster: language of the description + normalized job title
+  (lowercase, no accents, no gender/contract markers or numbers, sorted words)
+- profile hash: hash of the user context
+
+The cache has its own connection guarded by a lock, so it can be used from the
+document generation worker threads.
+"""
+
+import datetime
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+
+from latex_renderer import detect_language
+
+# Title words that do not change the role (gender markers, contract types, work mode)
+TITLE_NOISE_WORDS = {
+    "h", "f", "m", "w", "d", "x", "hf", "fh", "mf", "fm", "e",
+    "cdi", "cdd", "stage", "alternance", "interim", "freelance", "internship", "contract",
+    "remote", "teletravail", "hybrid", "hybride", "full", "time", "part",
+}
+
+# Keys of the cached steps
+CACHED_STEPS = ("adjective", "title")
+
+
+def title_cluster(title: str, description: str = "") -> str:
+    """
+    Normalize a job title so that similar roles share the same cache entry.
+
+    Args:
+        title: Job title
+        description: Job description, used to detect the language
+
+    Returns:
+        str: "<language>:<sorted title words>"
+    """
+    title = unicodedata.normalize("NFKD", (title or "").lower())
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = re.sub(r"\(.*?\)|\[.*?\]", " ", title)
+    words = sorted({w for w in re.findall(r"[a-z0-9+#]+", title) if w not in TITLE_NOISE_WORDS and not w.isdigit()})
+    return f"{detect_language(description)}:{' '.join(words)}"
+
+
+def profile_hash(user_context: dict) -> str:
+    """Stable hash of the user profile"""
+    canonical = json.dumps(user_context, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class SummaryStepCache:
+    """
+    SQLite cache of professional summary steps 1-2.
+
+    Args:
+        db_path: SQLite database holding the summary_steps table
+    """
+    def __init__(self, db_path="jobs.db"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS summary_steps (
+                                    title_cluster TEXT NOT NULL,
+                                    profile_hash TEXT NOT NULL,
+                                    steps TEXT NOT NULL,
+                                    date TEXT,
+                                    PRIMARY KEY (title_cluster, profile_hash)
+                                )''')
+            self.conn.commit()
+
+    def get(self, cluster: str, profile: str):
+        """Return the cached steps as a dict, None if absent"""
+        with self.lock:
+            row = self.conn.execute("SELECT steps FROM summary_steps WHERE title_cluster = ? AND profile_hash = ?",
+                                    (cluster, profile)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, cluster: str, profile: str, steps: dict):
+        """Store the cacheable steps of a summary, ignoring incomplete results"""
+        steps = {key: steps.get(key) for key in CACHED_STEPS}
+        if not all(steps.values()):
+            return
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO summary_steps VALUES (?, ?, ?, ?)",
+                              (cluster, profile, json.dumps(steps, ensure_ascii=False),
+                               datetime.datetime.now().strftime('%Y/%m/%d')))
+            self.conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self.lock:
+            self.conn.execute("DELETE FROM summary_steps")
+            self.conn.commit()
@@ -0,0 +1,213 @@
+"""
+Job Description Compression
+
+Transparent compression of long text columns (jobs.description). Encoded
+values are stored as BLOBs:
+- byte 0: method (1 = zlib, 2 = zstd)
+- bytes 1-2: id of the dictionary in the text_dictionaries table (0 = none)
+- rest: compressed UTF-8 text
+
+Texts shorter than min_size, and every value written before compression was
+enabled, stay plain TEXT; decode() returns them unchanged, so both kinds of
+rows can live in the same column and be migrated at any time.
+
+Dictionaries are trained on a sample of stored descriptions (recurring
+headings, lines and phrases of job posts) and improve the ratio of short
+texts a lot. zlib is always available; zstd needs the optional zstandard
+package.
+
+decode() can stop after the first characters of a text, so code that only
+looks at the start of descriptions does not decompress them entirely.
+"""
+
+import collections
+import datetime
+import re
+import sqlite3
+import threading
+import zlib
+
+ZLIB, ZSTD = 1, 2
+METHODS = {"zlib": ZLIB, "zstd": ZSTD}
+
+# zlib only uses the last 32KB of a preset dictionary
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 64 * 1024
+
+# Descriptions sampled to train a dictionary
+TRAINING_SAMPLES = 1000
+
+# Bytes read per decoded character when decoding a prefix (UTF-8 worst case)
+MAX_BYTES_PER_CHAR = 4
+
+
+def _phrases(text: str) -> set:
+    """Lines and word trigrams of a text, the units a dictionary is built from"""
+    phrases = {line.strip() for line in text.splitlines() if len(line.strip()) >= 8}
+    words = re.findall(r"\S+", text)
+    phrases.update(" ".join(words[i:i + 3]) for i in range(len(words) - 2))
+    return phrases
+
+
+def train_zlib_dictionary(samples: list, size: int = ZLIB_DICT_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample texts.
+
+    Phrases found in several samples are kept, the most valuable (documents x
+    length) at the end of the dictionary, where zlib references are cheapest.
+    """
+    counts = collections.Counter()
+    for text in samples:
+        counts.update(_phrases(text))
+    ranked = sorted(((count - 1) * len(phrase), phrase) for phrase, count in counts.items() if count > 1)
+    chosen, used = [], 0
+    for _, phrase in reversed(ranked):
+        data = phrase.encode("utf-8") + b"\n"
+        if used + len(data) > size:
+            continue
+        chosen.append(data)
+        used += len(data)
+    return b"".join(reversed(chosen))
+
+
+class TextCodec:
+    """
+    Encoder/decoder of compressed text columns, with dictionaries stored in SQLite.
+
+    Args:
+        db_path: SQLite database holding the text_dictionaries table
+        method: "zlib", "zstd" or None (encode() keeps texts as they are)
+        level: Compression level
+        min_size: Texts shorter than this (in bytes) are not compressed
+    """
+    def __init__(self, db_path="jobs.db", method="zlib", level=6, min_size=256):
+        if method is not None and method not in METHODS:
+            raise ValueError(f"Unsupported compression method: {method}")
+        self.method = method
+        self.level = level
+        self.min_size = min_size
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.dictionaries = {}
+        self.compressors = {}
+        with self.lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS text_dictionaries (
+                                    id INTEGER PRIMARY KEY,
+                                    method TEXT NOT NULL,
+                                    data BLOB NOT NULL,
+                                    date TEXT
+                                )''')
+            self.conn.commit()
+        self.dictionary_id = self._load()
+
+    def _load(self) -> int:
+        """Load the stored dictionaries, return the id of the newest one for the method (0: none)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT id, method, data FROM text_dictionaries ORDER BY id").fetchall()
+        current = 0
+        for id, method, data in rows:
+            self.dictionaries[id] = bytes(data)
+            if method == self.method:
+                current = id
+        return current
+
+    def _zstd_dictionary(self, dictionary_id: int):
+        import zstandard
+
+        return zstandard.ZstdCompressionDict(self.dictionaries[dictionary_id]) if dictionary_id else None
+
+    def train(self, samples: list) -> int:
+        """
+        Train a dictionary for the codec's method and use it for new values.
+
+        Args:
+            samples: Sample texts (e.g. stored descriptions)
+
+        Returns:
+            int: Dictionary id, 0 if the samples were too few to train one
+        """
+        samples = [text for text in samples if text]
+        if self.method is None or len(samples) < 2:
+            return 0
+        if self.method == "zstd":
+            import zstandard
+
+            try:
+                data = zstandard.train_dictionary(ZSTD_DICT_SIZE, [t.encode("utf-8") for t in samples]).as_bytes()
+            except zstandard.ZstdError:
+                return 0
+        else:
+            data = train_zlib_dictionary(samples)
+        if not data:
+            return 0
+        with self.lock:
+            cursor = self.conn.execute("INSERT INTO text_dictionaries (method, data, date) VALUES (?, ?, ?)",
+                                       (self.method, data, datetime.datetime.now().strftime("%Y/%m/%d %H:%M")))
+            self.conn.commit()
+            self.dictionaries[cursor.lastrowid] = data
+            self.dictionary_id = cursor.lastrowid
+        return self.dictionary_id
+
+    def encode(self, text):
+        """Return the value to store for a text: compressed bytes, or the text itself"""
+        if self.method is None or not isinstance(text, str):
+            return text
+        data = text.encode("utf-8")
+        if len(data) < self.min_size:
+            return text
+        dictionary_id = self.dictionary_id
+        if self.method == "zstd":
+            import zstandard
+
+            compressor = self.compressors.get(dictionary_id)
+            if compressor is None:
+                compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dictionary(dictionary_id))
+                self.compressors[dictionary_id] = compressor
+            payload = compressor.compress(data)
+        elif dictionary_id:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionaries[dictionary_id])
+            payload = compressor.compress(data) + compressor.flush()
+        else:
+            payload = zlib.compress(data, self.level)
+        if len(payload) + 3 >= len(data):
+            return text
+        return bytes((METHODS[self.method],)) + dictionary_id.to_bytes(2, "big") + payload
+
+    def decode(self, value, limit: int = None):
+        """
+        Return the text of a stored value.
+
+        Args:
+            value: Stored value (compressed bytes, or plain text)
+            limit: Only decode the first limit characters
+
+        Returns:
+            str: The text (or its first limit characters); None stays None
+        """
+        if not isinstance(value, (bytes, memoryview)):
+            return value if limit is None or value is None else value[:limit]
+        value = bytes(value)
+        method, dictionary_id, payload = value[0], int.from_bytes(value[1:3], "big"), value[3:]
+        if dictionary_id and dictionary_id not in self.dictionaries:
+            self._load()
+        max_length = limit * MAX_BYTES_PER_CHAR if limit is not None else None
+        if method == ZSTD:
+            import zstandard
+
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._zstd_dictionary(dictionary_id))
+            with decompressor.stream_reader(payload) as reader:
+                data = reader.read(max_length) if max_length is not None else reader.readall()
+        elif method == ZLIB:
+            if dictionary_id:
+                decompressor = zlib.decompressobj(zdict=self.dictionaries[dictionary_id])
+            else:
+                decompressor = zlib.decompressobj()
+            data = decompressor.decompress(payload, max_length or 0)
+        else:
+            raise ValueError(f"Unknown compressed text method: {method}")
+        text = data.decode("utf-8", errors="ignore" if limit is not None else "strict")
+        return text if limit is None else text[:limit]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()